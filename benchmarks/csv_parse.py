@@ -0,0 +1,94 @@
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from io import StringIO
+from typing import Callable, Dict, List
+from modules.data.constants import DATE_FORMAT
+from modules.data.formats import (
+    _decode_csv_arrow,
+    _decode_csv_pandas,
+    decode_chunk,
+    encode_chunk,
+)
+
+
+def make_chunk(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    1m OHLCV chunk as the pipelines store it
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=rows, freq="1min", tz="UTC", name="date")
+    close = 100 + rng.standard_normal(rows).cumsum()
+    return pd.DataFrame(
+        {
+            "open": close + rng.random(rows),
+            "high": close + 1 + rng.random(rows),
+            "low": close - 1 - rng.random(rows),
+            "close": close,
+            "volume": rng.integers(0, 100000, rows),
+        },
+        index=index,
+    )
+
+
+def legacy_decode(content: bytes) -> pd.DataFrame:
+    """
+    Previous csv read path: text decode + StringIO, parse_dates, a second pass
+    with DATE_FORMAT, then tz handling
+    """
+    df = pd.read_csv(StringIO(content.decode("utf-8")), parse_dates=["date"])
+    df["date"] = pd.to_datetime(df["date"], format=DATE_FORMAT, errors="coerce")
+    df.set_index("date", inplace=True)
+    df = df[~df.index.isna()]
+    if df.index.tz is None:
+        df.index = df.index.tz_localize("UTC")
+    else:
+        df.index = df.index.tz_convert("UTC")
+    return df
+
+
+def measure(decode: Callable[[bytes], pd.DataFrame], content: bytes, repeat: int) -> float:
+    """
+    Best per-chunk parse time in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(content)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Per-chunk csv parse time")
+    parser.add_argument("--rows", type=int, default=10000, help="rows per chunk")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    content = encode_chunk(make_chunk(args.rows), "csv")
+    expected = legacy_decode(content)
+
+    decoders: Dict[str, Callable[[bytes], pd.DataFrame]] = {
+        "legacy (StringIO, parse twice)": legacy_decode,
+        "pandas typed": _decode_csv_pandas,
+        "pyarrow typed": _decode_csv_arrow,
+        "decode_chunk": lambda c: decode_chunk(c, "csv"),
+    }
+
+    print(f"{args.rows} rows, {len(content) / 1024:.0f} KiB per chunk")
+    baseline = None
+    for name, decode in decoders.items():
+        result = decode(content)
+        if result is None:
+            print(f"{name:32s} unavailable")
+            continue
+        pd.testing.assert_frame_equal(result, expected, check_freq=False)
+        elapsed = measure(decode, content, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:32s} {elapsed:8.2f} ms  x{baseline / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,111 @@
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+DEFAULT_BUFFER_SECONDS = 300.0
+
+
+class WriteBuffer:
+    """
+    In-memory write-behind buffer of new rows for one pipeline.
+
+    Rows stay here until a flush persists them. Readers of the pipeline merge
+    the buffered rows into their results, so buffering is invisible to them.
+    A flush is due once max_rows rows are buffered or the oldest buffered row
+    has waited max_seconds.
+    merge(buffered, new) combines rows on equal timestamps (default: new wins).
+    """
+
+    def __init__(
+        self,
+        max_rows: int,
+        max_seconds: float = DEFAULT_BUFFER_SECONDS,
+        merge: Optional[Callable[[pd.DataFrame, pd.DataFrame], pd.DataFrame]] = None,
+    ):
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.merge = merge
+        self._data = pd.DataFrame()
+        self._since: Optional[float] = None  # 가장 오래된 row 가 들어온 시각
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.batches = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def add(self, data: pd.DataFrame):
+        if data.empty:
+            return
+        if self._data.empty:
+            combined = data[~data.index.duplicated(keep="last")].sort_index()
+        elif self.merge is not None:
+            combined = self.merge(self._data, data)
+        else:
+            combined = pd.concat([self._data, data])
+            combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+        self._data = combined
+        self.batches += 1
+        if self._since is None:
+            self._since = time.monotonic()
+
+    def is_due(self) -> bool:
+        if self._data.empty:
+            return False
+        if len(self._data) >= self.max_rows:
+            return True
+        return time.monotonic() - self._since >= self.max_seconds
+
+    def snapshot(self) -> pd.DataFrame:
+        return self._data.copy()
+
+    def discard(self, flushed: pd.DataFrame):
+        """
+        Drop rows that were persisted. Rows added while the flush was running
+        stay buffered.
+        """
+        persisted = self._data.index.isin(flushed.index)
+        remaining = self._data[~persisted]
+        current = self._data[persisted]
+        if not current.empty:
+            before = flushed.reindex(index=current.index, columns=current.columns)
+            same = (current == before) | (current.isna() & before.isna())
+            changed = current[~same.all(axis=1)]
+            if not changed.empty:
+                remaining = pd.concat([remaining, changed]).sort_index()
+        self._data = remaining
+        self.flushes += 1
+        self.flushed_rows += len(flushed)
+        self._since = None if self._data.empty else time.monotonic()
+
+    def view(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        data = self._data
+        if data.empty:
+            return pd.DataFrame()
+        if start is not None:
+            data = data[data.index >= start]
+        if end is not None:
+            data = data[data.index <= end]
+        return data.copy()
+
+    def latest_timestamp(self) -> Optional[pd.Timestamp]:
+        return self._data.index.max() if not self._data.empty else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self._data),
+            "batches": self.batches,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "max_rows": self.max_rows,
+            "max_seconds": self.max_seconds,
+        }
@@ -0,0 +1,97 @@
+import threading
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024  # 256 MB
+
+
+class ChunkCache:
+    """
+    Size bounded (bytes) LRU cache of decoded chunk DataFrames.
+
+    Entries are keyed by object path and a version token (mtime/size for local
+    files, generation for GCS objects), so a changed file never hits a stale
+    entry. Writers call invalidate() to free the old entry right away.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Hashable, pd.DataFrame, int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _frame_size(df: pd.DataFrame) -> int:
+        return int(df.memory_usage(index=True, deep=True).sum())
+
+    def get(self, key: str, version: Hashable) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # 호출한 쪽에서 수정해도 캐시가 오염되지 않도록 복사본을 돌려준다.
+            return entry[1].copy()
+
+    def put(self, key: str, version: Hashable, df: pd.DataFrame):
+        size = self._frame_size(df)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (version, df.copy(), size)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def resize(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            key, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            logger.debug(f"Evicted {key} from chunk cache ({size} bytes)")
+
+
+# 프로세스 내 모든 DataPipeline 이 공유하는 캐시
+shared_chunk_cache = ChunkCache()
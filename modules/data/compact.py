@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+from typing import Dict
+from modules.data.core import DEFAULT_TARGET_CHUNK_BYTES
+from modules.data.utils import create_panel_store, create_pipelines, read_config
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+async def compact_config(
+    config_path: str, target_bytes: int = DEFAULT_TARGET_CHUNK_BYTES
+) -> Dict[str, int]:
+    """
+    Compact every symbol directory (and the panel store) of a pipeline config
+    """
+    config = await read_config(config_path)
+    panel_store = await create_panel_store(config)
+    pipelines = await create_pipelines(config, panel_store=panel_store)
+    stores = pipelines + ([panel_store] if panel_store is not None else [])
+
+    totals: Dict[str, int] = {}
+    try:
+        for store in stores:
+            stats = await store.compact(target_bytes)
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+    finally:
+        await asyncio.gather(
+            *[store.close() for store in stores], return_exceptions=True
+        )
+
+    logger.info(f"Compacted {len(stores)} stores: {totals}")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge small chunks, split large ones and fold deltas"
+    )
+    parser.add_argument("config", help="data pipeline config (yaml)")
+    parser.add_argument(
+        "--target-bytes",
+        type=int,
+        default=DEFAULT_TARGET_CHUNK_BYTES,
+        help="target size of a chunk file",
+    )
+    args = parser.parse_args()
+
+    totals = asyncio.run(compact_config(args.config, target_bytes=args.target_bytes))
+    print(
+        f"{totals.get('chunks_before', 0)} -> {totals.get('chunks_after', 0)} chunks, "
+        f"{totals.get('duplicates', 0)} duplicate rows dropped, "
+        f"{totals.get('orphans', 0)} orphan files removed"
+    )
+
+
+if __name__ == "__main__":
+    main()
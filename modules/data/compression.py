@@ -0,0 +1,86 @@
+import zlib
+from typing import Optional
+
+try:
+    import pyarrow as pa
+except ImportError:  # zstd 압축을 쓸 때만 필요
+    pa = None
+
+
+# chunk object 전체를 압축하는 방식 (parquet/feather 내부 compression 과는 별개)
+OBJECT_COMPRESSIONS = ("gzip", "zstd")
+
+# 압축된 object 는 frame 의 magic bytes 로 알아본다. csv("date,..."), json("{"),
+# parquet("PAR1"), feather("ARROW1") 과 겹치지 않으므로 압축 전 object 도 그대로 읽힌다.
+MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+COMPRESSED_CONTENT_TYPES = {
+    "gzip": "application/gzip",
+    "zstd": "application/zstd",
+}
+
+# 한 번에 풀어내는 최대 크기
+DECODE_PIECE_BYTES = 1024 * 1024
+
+
+def validate_object_compression(compression: Optional[str]) -> Optional[str]:
+    if compression is None:
+        return None
+    if compression not in OBJECT_COMPRESSIONS:
+        raise ValueError(
+            f"Unsupported object compression: {compression}. "
+            f"Choose one of {list(OBJECT_COMPRESSIONS)} or None"
+        )
+    if compression == "zstd" and pa is None:
+        raise ImportError("pyarrow is required for zstd object compression")
+    return compression
+
+
+def detect_compression(content: bytes) -> Optional[str]:
+    for compression, magic in MAGIC.items():
+        if content[: len(magic)] == magic:
+            return compression
+    return None
+
+
+def compress_object(content: bytes, compression: Optional[str]) -> bytes:
+    if compression is None:
+        return content
+    if compression == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip header
+        return compressor.compress(content) + compressor.flush()
+    buffer = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(buffer, compression) as stream:
+        stream.write(content)
+    return buffer.getvalue().to_pybytes()
+
+
+def decode_object(content: bytes) -> bytes:
+    """
+    Compressed object -> original bytes, decompressed piece by piece.
+    Objects written before compression was enabled are returned as they are.
+    """
+    compression = detect_compression(content)
+    if compression is None:
+        return content
+
+    decoded = bytearray()
+    if compression == "gzip":
+        decompressor = zlib.decompressobj(47)  # 47: gzip/zlib header 자동 인식
+        view = memoryview(content)
+        for start in range(0, len(view), DECODE_PIECE_BYTES):
+            decoded += decompressor.decompress(view[start : start + DECODE_PIECE_BYTES])
+        decoded += decompressor.flush()
+        return bytes(decoded)
+
+    if pa is None:
+        raise ImportError("pyarrow is required to read zstd compressed objects")
+    stream = pa.CompressedInputStream(pa.BufferReader(content), compression)
+    while True:
+        piece = stream.read(DECODE_PIECE_BYTES)
+        if not piece:
+            return bytes(decoded)
+        decoded += piece
@@ -1,23 +1,97 @@
 import os
+import math
 import aiofiles
 import asyncio
 import pytz
-import glob
+import numpy as np
 import pandas as pd
-from aiofiles.os import path as aiopath
-from typing import Optional, Dict, Any
+from typing import (
+    Optional,
+    Dict,
+    Any,
+    List,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from abc import ABCMeta, abstractmethod
 from contextlib import asynccontextmanager
-from io import StringIO
-from google.cloud import storage
-from modules.data.filelock import AsyncFileLock
-from modules.data.constants import DATE_FORMAT
+from modules.data.buffer import DEFAULT_BUFFER_SECONDS, WriteBuffer
+from modules.data.cache import ChunkCache, shared_chunk_cache
+from modules.data.compression import decode_object, detect_compression
+from modules.data.disk_cache import DEFAULT_DISK_CACHE_BYTES
+from modules.data.filelock import AsyncFileLock, file_lock_registry
+from modules.data.frames import compact_frame
+from modules.data.gcs_client import PreconditionFailedError
+from modules.data.formats import (
+    CONTENT_TYPES,
+    DEFAULT_COMPRESSION,
+    decode_chunk,
+    encode_chunk,
+    file_extension,
+    format_from_path,
+    validate_file_format,
+)
+from modules.data.manifest import (
+    MANIFEST_FILE,
+    ChunkManifest,
+    StaleManifestError,
+    chunk_number_from_name,
+    delta_number_from_name,
+    generation_from_name,
+)
+from modules.data.market_calendar import ExchangeCalendar, get_calendar
+from modules.data.partition import (
+    expired_prefix,
+    partition_bounds,
+    partition_from_name,
+    partition_keys,
+    partition_name,
+    partitions_between,
+    validate_partition,
+)
+from modules.data.rate_limit import RateLimiter, rate_limiter
+from modules.data.rollup import (
+    ROLLUP_DIR,
+    aggregate,
+    bucket_end,
+    bucket_start,
+    validate_rollups,
+)
+from modules.data.sqlite_store import SQLITE_FILE, SQLiteStore
+from modules.data.storage import (
+    LocalStorage,
+    StorageBackend,
+    create_storage,
+    validate_storage_type,
+)
 from modules.logger import get_logger
 
 
 logger = get_logger(__name__)
 
+# chunk decode (csv/parquet parsing) 전용 worker pool
+PARSE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="chunk-parse"
+)
+
+# 읽는 도중 writer 가 파일을 교체한 경우 새 manifest 로 다시 읽는 횟수
+SNAPSHOT_RETRIES = 3
+# 다른 host 의 writer 가 manifest 를 먼저 교체한 경우 변경을 다시 적용하는 횟수
+MANIFEST_RETRIES = 5
+
+T = TypeVar("T")
+
+# compaction 이 맞추려는 chunk 파일 크기, 이 비율보다 작은 chunk 는 이웃과 합친다.
+DEFAULT_TARGET_CHUNK_BYTES = 4 * 1024 * 1024  # 4 MB
+UNDERSIZED_RATIO = 0.5
+
 
 class DataProvider(metaclass=ABCMeta):
     def __init__(
@@ -42,6 +116,13 @@ class DataProvider(metaclass=ABCMeta):
     def end_date(self, end_date: datetime):
         self._end_date = end_date
 
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        Limiter shared by every provider of this class in the process
+        """
+        return rate_limiter(type(self).__name__)
+
     @staticmethod
     def _format_date(dt: Optional[datetime]) -> Optional[str]:
         return dt.date().isoformat() if dt else None
@@ -69,26 +150,91 @@ class DataPipeline(metaclass=ABCMeta):
         chunk_size: int = 10000,  # Default Chunk Size
         use_file_lock: bool = True,
         cache_days: int = 7,
-        storage_type: str = "local",  # 'local' or 'gcs'
+        storage_type: str = "local",  # 'local', 'gcs', 'memory' or 'sqlite'
         bucket_name: Optional[str] = None,
+        file_format: str = "csv",  # 'csv', 'parquet' or 'feather'
+        compression: Optional[str] = None,
+        max_deltas: int = 32,
+        chunk_cache: Optional[ChunkCache] = shared_chunk_cache,
+        max_concurrent_reads: int = 8,
+        partition: Optional[str] = None,  # None(row chunks), 'year', 'month', 'day'
+        write_buffer_rows: int = 0,  # 0 이면 buffer 없이 바로 저장
+        write_buffer_seconds: float = DEFAULT_BUFFER_SECONDS,
+        rollups: Optional[List[str]] = None,  # e.g. ["5min", "1h", "1D"]
+        storage: Optional[StorageBackend] = None,  # storage_type 대신 쓸 backend
+        database_path: Optional[str] = None,  # sqlite (기본값: 상위 경로/ohlcv.sqlite)
+        disk_cache_dir: Optional[str] = None,  # gcs 를 읽을 때 쓰는 host 공용 disk cache
+        disk_cache_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+        object_compression: Optional[str] = None,  # chunk object 압축: 'zstd', 'gzip'
     ):
         self.data_provider = data_provider
         self.base_path = base_path
         self.chunk_size = chunk_size
         self.use_file_lock = use_file_lock
         self.cache_days = cache_days
-        self.storage_type = storage_type
+        self.storage_type = validate_storage_type(storage_type)
         self.bucket_name = bucket_name
-
-        if self.storage_type == "local":
-            os.makedirs(base_path, exist_ok=True)
-        elif self.storage_type == "gcs":
-            if not bucket_name:
-                raise ValueError("Bucket name must be provided for GCS storage")
-            self.storage_client = storage.Client()
-            self.bucket = self.storage_client.bucket(bucket_name)
+        self.file_format = validate_file_format(file_format)
+        self.compression = compression or DEFAULT_COMPRESSION[self.file_format]
+        self.max_deltas = max_deltas
+        self.chunk_cache = chunk_cache  # None 이면 캐시를 사용하지 않음
+        self.max_concurrent_reads = max_concurrent_reads
+        self.partition = validate_partition(partition)
+        self.write_buffer = (
+            WriteBuffer(write_buffer_rows, write_buffer_seconds, merge=self._merge_rows)
+            if write_buffer_rows > 0
+            else None
+        )
+        self._flush_lock = asyncio.Lock()
+        self._manifest_lock = asyncio.Lock()
+
+        # sqlite 는 chunk 파일 없이 (symbol, ts) 로 row 를 저장한다.
+        self.table: Optional[SQLiteStore] = None
+        self._owns_storage = storage is None
+        if self.storage_type == "sqlite":
+            base_dir = os.path.abspath(base_path)
+            database_path = database_path or os.path.join(
+                os.path.dirname(base_dir), SQLITE_FILE
+            )
+            # database 파일 위치 기준 상대 경로가 key ("AAPL", "AAPL/_rollup/5min")
+            key = os.path.relpath(base_dir, os.path.dirname(os.path.abspath(database_path)))
+            self.table = SQLiteStore(database_path, key.replace(os.sep, "/"))
+            # 경로 계산에만 사용
+            self.storage = storage or LocalStorage()
         else:
-            raise ValueError(f"Unsupported storage type: {storage_type}")
+            self.storage = storage or create_storage(
+                self.storage_type,
+                bucket_name,
+                disk_cache_dir,
+                disk_cache_bytes,
+                object_compression,
+            )
+            self.storage.prepare(base_path)
+        self.database_path = self.table.database_path if self.table else None
+        self.disk_cache_dir = disk_cache_dir
+        self.object_compression = getattr(self.storage, "compression", None)
+
+        # 저장된 row 로부터 갱신되는 상위 주기 OHLCV 저장소
+        self.rollups = validate_rollups(rollups)
+        self._rollup_stores: Dict[str, "DataPipeline"] = {
+            freq: RollupPipeline(
+                data_provider=None,
+                base_path=self._join_path(f"{ROLLUP_DIR}/{freq}"),
+                chunk_size=chunk_size,
+                use_file_lock=use_file_lock,
+                storage_type=storage_type,
+                bucket_name=bucket_name,
+                file_format=file_format,
+                compression=compression,
+                max_deltas=max_deltas,
+                chunk_cache=chunk_cache,
+                max_concurrent_reads=max_concurrent_reads,
+                partition=partition,
+                storage=self.storage,
+                database_path=self.database_path,
+            )
+            for freq in self.rollups
+        }
 
     def get_params(self) -> Dict[str, Any]:
         return {
@@ -98,19 +244,77 @@ class DataPipeline(metaclass=ABCMeta):
             "cache_days": self.cache_days,
             "storage_type": self.storage_type,
             "bucket_name": self.bucket_name,
+            "file_format": self.file_format,
+            "compression": self.compression,
+            "max_deltas": self.max_deltas,
+            "max_concurrent_reads": self.max_concurrent_reads,
+            "partition": self.partition,
+            "write_buffer_rows": self.write_buffer.max_rows if self.write_buffer else 0,
+            "rollups": self.rollups,
+            "database_path": self.database_path,
+            "disk_cache_dir": self.disk_cache_dir,
+            "object_compression": self.object_compression,
         }
 
-    def _get_file_path(self, chunk_num: int = 0) -> str:
+    @property
+    def calendar(self) -> Optional[ExchangeCalendar]:
+        """
+        Exchange calendar of the provider's market, None if unknown.
+        Daily and longer rollups are grouped by its session dates.
+        """
+        return get_calendar(getattr(self.data_provider, "market", None))
+
+    def _join_path(self, file_name: str) -> str:
+        return self.storage.join(self.base_path, file_name)
+
+    def _file_name(self, file_path: str) -> str:
+        """
+        Path relative to base_path, as recorded in the manifest
+        """
+        prefix = self._join_path("")
+        if file_path.startswith(prefix):
+            return file_path[len(prefix) :]
+        return os.path.basename(file_path)
+
+    def _chunk_stem(self, chunk_num: int) -> str:
+        if self.partition:
+            return partition_name(chunk_num, self.partition)
+        return f"chunk{chunk_num}"
+
+    def _get_file_path(
+        self,
+        chunk_num: int = 0,
+        file_format: Optional[str] = None,
+        generation: Optional[int] = None,
+    ) -> str:
+        """
+        chunk{N}.csv is the legacy name. New writes include the manifest generation
+        (chunk{N}.g{G}.parquet) so a published file is never overwritten.
+        Time partitioned pipelines use the partition as name (2024/01.g{G}.parquet).
+        """
         logger.debug(f"Getting file path for chunk {self.base_path}/{chunk_num}")
-        if self.storage_type == "local":
-            return os.path.join(self.base_path, f"chunk{chunk_num}.csv")
-        elif self.storage_type == "gcs":
-            return f"{self.base_path}/chunk{chunk_num}.csv"
+        extension = file_extension(file_format or self.file_format)
+        suffix = f".g{generation}" if generation is not None else ""
+        return self._join_path(f"{self._chunk_stem(chunk_num)}{suffix}{extension}")
+
+    def _get_delta_path(self, manifest: ChunkManifest, chunk_num: int) -> str:
+        extension = file_extension(self.file_format)
+        generation = manifest.generation + 1
+        delta_num = manifest.next_delta_number(chunk_num)
+        return self._join_path(
+            f"{self._chunk_stem(chunk_num)}.g{generation}.delta{delta_num}{extension}"
+        )
+
+    def _get_manifest_path(self) -> str:
+        return self._join_path(MANIFEST_FILE)
+
+    def _chunk_path(self, manifest: ChunkManifest, chunk_num: int) -> str:
+        return self._join_path(manifest.entry(chunk_num)["file"])
 
     @asynccontextmanager
-    async def _file_lock(self, file_path: str):
-        if self.storage_type == "local" and self.use_file_lock:
-            lock = AsyncFileLock(file_path + ".lock")
+    async def _file_lock(self, file_path: str, shared: bool = False):
+        if self.storage.supports_file_lock and self.use_file_lock:
+            lock = AsyncFileLock(file_path + ".lock", shared=shared)
             async with lock.acquire():
                 yield
         else:
@@ -129,293 +333,1163 @@ class DataPipeline(metaclass=ABCMeta):
         start_date = end_date - timedelta(days=self.cache_days)
         return await self._load_date_range(start_date, end_date)
 
+    @staticmethod
+    def _to_utc_timestamp(value: Optional[datetime]) -> Optional[pd.Timestamp]:
+        if value is None:
+            return None
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is None:
+            return ts.tz_localize(pytz.UTC)
+        return ts.tz_convert(pytz.UTC)
+
+    @staticmethod
+    def _slice_range(
+        data: pd.DataFrame,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+    ) -> pd.DataFrame:
+        """
+        Binary search on the sorted index instead of a boolean mask over every row
+        """
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        left = 0 if start_ts is None else data.index.searchsorted(start_ts, "left")
+        right = (
+            len(data) if end_ts is None else data.index.searchsorted(end_ts, "right")
+        )
+        return data.iloc[left:right]
+
     async def _load_date_range(
-        self, start_date: datetime, end_date: datetime
+        self,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Stored rows in [start_date, end_date]. columns are projected per chunk,
+        so unused columns are never concatenated.
+        """
+        start_ts = self._to_utc_timestamp(start_date)
+        end_ts = self._to_utc_timestamp(end_date)
+        if self.table is not None:
+            return await self.table.query(start_ts, end_ts, columns)
+
+        async def read(manifest: ChunkManifest) -> pd.DataFrame:
+            chunk_numbers = self._select_chunks(manifest, start_ts, end_ts)
+            chunks = await self._read_chunk_entries(manifest, chunk_numbers)
+
+            all_data = []
+            for chunk_num, data in zip(chunk_numbers, chunks):
+                logger.debug(
+                    f"Loaded chunk {chunk_num} from {self.base_path} / {data.shape}"
+                )
+                if data.empty:
+                    continue
+
+                data = self._clip_chunk(manifest, chunk_num, data, start_ts, end_ts)
+                if columns is not None:
+                    data = self._project(data, columns)
+                if not data.empty:
+                    all_data.append(data)
+
+            return pd.concat(all_data) if all_data else pd.DataFrame()
+
+        return await self._read_snapshot(read)
+
+    @staticmethod
+    def _select_chunks(
+        manifest: ChunkManifest,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+    ) -> List[int]:
+        if manifest.partition:
+            # 시간 partition 은 범위에서 바로 partition key 를 구한다.
+            return partitions_between(
+                start_ts, end_ts, manifest.chunk_numbers(), manifest.partition
+            )
+        # manifest 의 min/max 로 범위 밖의 chunk 는 읽지 않는다.
+        return manifest.overlapping(start_ts, end_ts)
+
+    async def _read_snapshot(self, read: Callable[[ChunkManifest], Awaitable[T]]) -> T:
+        """
+        Run a read against one manifest snapshot without taking any lock.
+        If a writer retired a file of that snapshot meanwhile, retry on the new one.
+        """
+        for attempt in range(SNAPSHOT_RETRIES):
+            manifest = await self._load_manifest()
+            try:
+                return await read(manifest)
+            except StaleManifestError as e:
+                logger.info(f"Snapshot of {self.base_path} changed while reading: {e}")
+        manifest = await self._load_manifest()
+        return await read(manifest)
+
+    def _clip_chunk(
+        self,
+        manifest: ChunkManifest,
+        chunk_num: int,
+        data: pd.DataFrame,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
     ) -> pd.DataFrame:
-        all_data = []
+        fully_covered = (
+            start_ts is None or manifest.min_timestamp(chunk_num) >= start_ts
+        ) and (end_ts is None or manifest.max_timestamp(chunk_num) <= end_ts)
+        if fully_covered:
+            return data
+        return self._slice_range(data, start_ts, end_ts)
+
+    async def _file_exists(self, file_path: str) -> bool:
+        return await self.storage.exists(file_path)
+
+    async def _read_bytes(
+        self,
+        file_path: str,
+        generation: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """
+        Object content, None if it does not exist. Compressed objects are
+        decoded, whether or not this pipeline writes with object_compression.
+        generation (GCS) pins the download when it is already known.
+        size limits the read to the bytes published in the manifest, so rows
+        appended in place after the snapshot are not visible.
+        """
+        if not self.storage.supports_append:
+            size = None
+        content = await self.storage.read_bytes(file_path, generation, size)
+        if content is None or detect_compression(content) is None:
+            return content
+        if size is not None:
+            # 압축된 object 는 in-place append 되지 않으므로 전체를 읽는다.
+            content = await self.storage.read_bytes(file_path, generation)
+        return await asyncio.to_thread(decode_object, content)
+
+    async def _is_compressed(self, file_path: str) -> bool:
+        head = await self.storage.read_bytes(file_path, size=4)
+        return head is not None and detect_compression(head) is not None
+
+    async def _object_version(self, file_path: str) -> Optional[str]:
+        """
+        Cheap version token of an object: mtime/size locally, generation on GCS.
+        None if the object does not exist.
+        """
+        return await self.storage.version(file_path)
+
+    def _cache_key(self, file_path: str) -> str:
+        return self.storage.cache_key(file_path)
+
+    def _invalidate_cache(self, file_path: str):
+        if self.chunk_cache is not None:
+            self.chunk_cache.invalidate(self._cache_key(file_path))
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self.chunk_cache.stats() if self.chunk_cache is not None else {}
+
+    def get_disk_cache_stats(self) -> Dict[str, Any]:
+        disk_cache = getattr(self.storage, "disk_cache", None)
+        return disk_cache.stats() if disk_cache is not None else {}
+
+    async def _write_bytes(self, file_path: str, content: bytes, content_type: str):
+        self._invalidate_cache(file_path)
+        await self.storage.write_bytes(file_path, content, content_type)
+
+    async def _write_object(
+        self,
+        manifest: ChunkManifest,
+        file_path: str,
+        content: bytes,
+        content_type: str,
+    ):
+        """
+        Write a chunk/delta object of a manifest update. With conditional
+        writes (GCS) the name must still be free unless this update wrote it:
+        a writer on another host that picked the same generation name fails
+        instead of replacing the file its manifest points to.
+        """
+        file_name = self._file_name(file_path)
+        if file_name in manifest.written or not self.storage.supports_conditional_write:
+            await self._write_bytes(file_path, content, content_type)
+            return
+        self._invalidate_cache(file_path)
+        await self.storage.write_bytes_if(file_path, content, content_type, "0")
+        manifest.written.append(file_name)
+
+    async def _read_versioned(
+        self, file_path: str
+    ) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Object content (decoded like _read_bytes) with the version it was read at
+        """
+        content, version = await self.storage.read_versioned(file_path)
+        if content is not None and detect_compression(content) is not None:
+            content = await asyncio.to_thread(decode_object, content)
+        return content, version
+
+    async def _load_manifest(self) -> ChunkManifest:
+        content, version = await self._read_versioned(self._get_manifest_path())
+        if content is None:
+            return await self._rebuild_manifest()
+        try:
+            manifest = ChunkManifest.from_bytes(content)
+        except ValueError as e:
+            logger.error(f"Broken manifest in {self.base_path}: {e}. Rebuilding")
+            return await self._rebuild_manifest(version)
+        manifest.object_version = version
+        return manifest
+
+    async def _store_manifest(self, manifest: ChunkManifest):
+        manifest.generation += 1
+        file_path = self._get_manifest_path()
+        if not self.storage.supports_conditional_write:
+            await self._write_bytes(file_path, manifest.to_bytes(), "application/json")
+            return
+        # 읽은 뒤 다른 host 가 manifest 를 교체했으면 PreconditionFailedError
+        self._invalidate_cache(file_path)
+        manifest.object_version = await self.storage.write_bytes_if(
+            file_path,
+            manifest.to_bytes(),
+            "application/json",
+            manifest.object_version or "0",
+        )
+
+    async def _rebuild_manifest(self, version: Optional[str] = None) -> ChunkManifest:
+        """
+        Build the manifest from the stored files. version is the object version
+        of the broken manifest being replaced, if there is one.
+        """
+        logger.info(f"No manifest found in {self.base_path}, scanning chunk files")
+        if self.partition:
+            manifest = await self._scan_partition_files()
+        else:
+            manifest = await self._scan_chunk_files()
+        manifest.object_version = version
+        if manifest.is_empty():
+            return manifest
+        try:
+            await self._store_manifest(manifest)
+        except PreconditionFailedError:
+            # 다른 host 가 먼저 manifest 를 만들었다.
+            return await self._load_manifest()
+        logger.info(
+            f"Manifest created with {len(manifest.chunks)} chunks in {self.base_path}"
+        )
+        return manifest
+
+    async def _scan_chunk_files(self) -> ChunkManifest:
+        """
+        Manifest of legacy chunk files (chunk0, chunk1, ... until one is missing)
+        """
+        manifest = ChunkManifest()
         chunk_num = 0
         while True:
             file_path = self._get_file_path(chunk_num)
-            if not await self._file_exists(file_path):
+            content = await self._read_bytes(file_path)
+            if content is None:
                 break
-            data = await self._read_csv(file_path)
-            logger.debug(f"Loaded chunk {chunk_num} from {file_path} / {data.shape}")
-            filtered_data = data[(data.index >= start_date) & (data.index <= end_date)]
-            if not filtered_data.empty:
-                all_data.append(filtered_data)
+            data = await asyncio.to_thread(decode_chunk, content, self.file_format)
+            manifest.update(
+                chunk_num,
+                ChunkManifest.describe(self._file_name(file_path), data, content),
+            )
             chunk_num += 1
+        return manifest
 
-        return pd.concat(all_data) if all_data else pd.DataFrame()
+    async def _scan_partition_files(self) -> ChunkManifest:
+        """
+        Manifest of a time partitioned layout, from a listing of its files.
+        Per partition the newest generation wins, together with the delta
+        objects written after it.
+        """
+        manifest = ChunkManifest(partition=self.partition)
+        bases: Dict[int, Any] = {}
+        deltas: Dict[int, List[Any]] = {}
+        for file_name in await self._list_files():
+            parsed = partition_from_name(file_name, self.partition)
+            if parsed is None or format_from_path(file_name) is None:
+                continue
+            key, generation, delta_num = parsed
+            if delta_num is None:
+                if key not in bases or generation > bases[key][0]:
+                    bases[key] = (generation, file_name)
+            else:
+                deltas.setdefault(key, []).append((generation, delta_num, file_name))
+
+        for key, (generation, file_name) in sorted(bases.items()):
+            entry = await self._describe_file(file_name)
+            manifest.update(key, entry)
+            for delta in sorted(deltas.get(key, [])):
+                if delta[0] > generation:
+                    manifest.add_delta(key, await self._describe_file(delta[2]))
+        return manifest
+
+    async def _describe_file(self, file_name: str) -> Dict[str, Any]:
+        content = await self._read_bytes(self._join_path(file_name))
+        data = await asyncio.to_thread(
+            decode_chunk, content, format_from_path(file_name)
+        )
+        return ChunkManifest.describe(file_name, data, content)
 
-    async def _file_exists(self, file_path: str) -> bool:
-        if self.storage_type == "local":
-            return await asyncio.to_thread(os.path.exists, file_path)
-        elif self.storage_type == "gcs":
-            blob = self.bucket.blob(file_path)
-            return await asyncio.to_thread(blob.exists)
-
-    async def _read_csv(self, file_path: str) -> pd.DataFrame:
-        logger.info(f"Attempting to read CSV file from {file_path}")
-        try:
-            async with self._file_lock(file_path):
-                if self.storage_type == "local":
-                    file_exists = await aiopath.exists(file_path)
-                    if not file_exists:
-                        logger.warning(f"CSV file does not exist: {file_path}")
-                        return pd.DataFrame()
-                    async with aiofiles.open(file_path, mode="r") as f:
-                        content = await f.read()
-                elif self.storage_type == "gcs":
-                    blob = self.bucket.blob(file_path)
-                    file_exists = await asyncio.to_thread(blob.exists)
-                    if not file_exists:
-                        logger.warning(f"CSV file does not exist: {file_path}")
-                        return pd.DataFrame()
-                    content = await asyncio.to_thread(blob.download_as_text)
-                else:
-                    raise ValueError(f"Unsupported storage type: {self.storage_type}")
+    async def _list_files(self) -> List[str]:
+        """
+        Every object below base_path, relative to it ("2024/01.g3.parquet")
+        """
+        return await self.storage.list_files(self.base_path)
 
-            try:
-                df = pd.read_csv(StringIO(content), parse_dates=["date"])
-                if "date" in df.columns:
-                    df["date"] = pd.to_datetime(
-                        df["date"], format=DATE_FORMAT, errors="coerce"
+    @asynccontextmanager
+    async def _manifest_update(self, check_layout: bool = True, attempt: int = 0):
+        """
+        Read-modify-write of the manifest, serialised between writers of this
+        host. Chunk files are written under new names first, the manifest is
+        swapped last, and only then are the retired files deleted.
+        Writers on other hosts are detected by the conditional writes of GCS
+        (PreconditionFailedError), see _update_manifest().
+        """
+        async with self._manifest_lock:
+            async with self._file_lock(self._get_manifest_path()):
+                manifest = await self._load_manifest()
+                if manifest.is_empty():
+                    manifest.partition = self.partition
+                elif manifest.partition != self.partition and check_layout:
+                    raise ValueError(
+                        f"{self.base_path} is stored with "
+                        f"partition={manifest.partition}, pipeline uses "
+                        f"partition={self.partition}. Run repartition() first"
                     )
-                    df.set_index("date", inplace=True)
-                else:
-                    logger.error("No 'date' column found in the CSV file")
-                    return pd.DataFrame()
-            except KeyError:
-                logger.warning(
-                    "'date' column not found, attempting to read without specifying index"
+                # 다시 시도할 때는 앞선 시도나 다른 writer 가 쓴 이름을 건너뛴다.
+                manifest.generation += attempt
+                original = manifest.to_bytes()
+                try:
+                    yield manifest
+                    if manifest.to_bytes() != original:
+                        await self._store_manifest(manifest)
+                except PreconditionFailedError:
+                    # 발행되지 않은 이번 변경의 파일은 지운다.
+                    await self._discard_written(manifest)
+                    raise
+                for file_name in manifest.take_garbage():
+                    await self._remove_object(self._join_path(file_name))
+
+    async def _update_manifest(
+        self,
+        apply: Callable[[ChunkManifest], Awaitable[T]],
+        check_layout: bool = True,
+    ) -> T:
+        """
+        Run apply inside a manifest update and return its result. If a writer
+        on another host swapped the manifest or took a file name in between,
+        apply runs again on the reloaded manifest.
+        """
+        for attempt in range(MANIFEST_RETRIES + 1):
+            try:
+                async with self._manifest_update(check_layout, attempt) as manifest:
+                    return await apply(manifest)
+            except PreconditionFailedError as e:
+                if attempt == MANIFEST_RETRIES:
+                    raise
+                logger.info(
+                    f"Manifest of {self.base_path} changed by another writer, "
+                    f"retrying: {e}"
                 )
-                df = pd.read_csv(StringIO(content))
-                if "date" in df.columns:
-                    df["date"] = pd.to_datetime(
-                        df["date"], format=DATE_FORMAT, errors="coerce"
-                    )
-                    df.set_index("date", inplace=True)
-                else:
-                    logger.error("No 'date' column found in the CSV file")
-                    return pd.DataFrame()
 
-            if df.empty:
-                logger.warning(f"CSV file is empty: {file_path}")
-                return pd.DataFrame()
+    async def _discard_written(self, manifest: ChunkManifest):
+        for file_name in manifest.written:
+            try:
+                await self._remove_object(self._join_path(file_name))
+            except Exception as e:
+                logger.warning(f"Could not remove unpublished {file_name}: {e}")
+
+    async def _read_chunk(
+        self,
+        file_path: str,
+        file_format: Optional[str] = None,
+        entry: Optional[Dict[str, Any]] = None,
+        generation: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Read one chunk file without locking.
+        With a manifest entry the checksum is the cache version and the read is
+        limited to the published size; a missing file raises StaleManifestError.
+        generation (from a listing) pins the object version to download.
+        """
+        file_format = file_format or format_from_path(file_path) or self.file_format
+        logger.info(f"Attempting to read {file_format} file from {file_path}")
+        try:
+            version, size = None, None
+            if entry is not None:
+                version, size = entry["checksum"], entry["bytes"]
+            elif self.chunk_cache is not None:
+                version = generation = generation or await self._object_version(
+                    file_path
+                )
+                if version is None:
+                    logger.warning(f"Chunk file does not exist: {file_path}")
+                    return pd.DataFrame()
 
-            if not isinstance(df.index, pd.DatetimeIndex):
-                logger.warning("Index is not DatetimeIndex, attempting to convert")
-                df.index = pd.to_datetime(df.index, errors="coerce")
+            if self.chunk_cache is not None:
+                cached = self.chunk_cache.get(self._cache_key(file_path), version)
+                if cached is not None:
+                    return cached
 
-            df = df[~df.index.isna()]
+            content = await self._read_bytes(file_path, generation, size)
+            if content is None:
+                if entry is not None:
+                    raise StaleManifestError(f"{file_path} no longer exists")
+                logger.warning(f"Chunk file does not exist: {file_path}")
+                return pd.DataFrame()
 
-            if df.index.tz is None:
-                df.index = df.index.tz_localize("UTC")
-            else:
-                df.index = df.index.tz_convert("UTC")
+            loop = asyncio.get_running_loop()
+            df = await loop.run_in_executor(
+                PARSE_EXECUTOR, decode_chunk, content, file_format
+            )
+            if df.empty:
+                logger.warning(f"Chunk file is empty: {file_path}")
+                return pd.DataFrame()
 
+            if self.chunk_cache is not None:
+                self.chunk_cache.put(self._cache_key(file_path), version, df)
             return df
 
+        except StaleManifestError:
+            raise
         except FileNotFoundError:
-            logger.warning(f"CSV file not found: {file_path}")
+            logger.warning(f"Chunk file not found: {file_path}")
             return pd.DataFrame()
         except pd.errors.EmptyDataError:
-            logger.warning(f"CSV file is empty: {file_path}")
+            logger.warning(f"Chunk file is empty: {file_path}")
             return pd.DataFrame()
         except Exception as e:
-            logger.error(f"Error reading CSV file {file_path}: {e}", exc_info=True)
+            logger.error(f"Error reading chunk file {file_path}: {e}", exc_info=True)
             return pd.DataFrame()
 
+    async def _read_chunk_entry(
+        self,
+        manifest: ChunkManifest,
+        chunk_num: int,
+        generations: Optional[Dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Base chunk file plus its delta objects that are not compacted yet.
+        generations are object versions by file name, see _list_generations().
+        """
+        generations = generations or {}
+        entry = manifest.entry(chunk_num)
+        data = await self._read_chunk(
+            self._join_path(entry["file"]),
+            entry=entry,
+            generation=generations.get(entry["file"]),
+        )
+        deltas = manifest.deltas(chunk_num)
+        if not deltas:
+            return data
+
+        frames = [data] if not data.empty else []
+        for delta in deltas:
+            delta_data = await self._read_chunk(
+                self._join_path(delta["file"]),
+                entry=delta,
+                generation=generations.get(delta["file"]),
+            )
+            if not delta_data.empty:
+                frames.append(delta_data)
+        return self._fold_deltas(frames) if frames else pd.DataFrame()
+
+    @staticmethod
+    def _fold_deltas(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Base chunk followed by its delta objects, in write order. A delta row
+        replaces an earlier row with the same timestamp.
+        """
+        data = pd.concat(frames).sort_index(kind="stable")
+        return data[~data.index.duplicated(keep="last")]
+
     async def _save_data(self, new_data: pd.DataFrame):
+        """
+        Merge rows into the store. Only chunks whose time range receives new
+        timestamps are rewritten, other chunk files stay untouched.
+        Duplicates are resolved on the timestamp index (new rows win).
+        """
         if new_data.empty:
             return
 
-        last_chunk_num = await self._get_last_chunk_number()
-        all_existing_data = await self._read_all_chunks(last_chunk_num)
+        new_data = new_data[~new_data.index.isna()].sort_index()
+        new_data = new_data[~new_data.index.duplicated(keep="last")]
 
-        # 기존 데이터와 새 데이터를 병합하고 중복 제거
-        combined_data = (
-            pd.concat([all_existing_data, new_data]).drop_duplicates().sort_index()
-        )
+        if self.table is not None:
+            await self.table.upsert(new_data)
+            logger.info(f"Upserted {len(new_data)} rows into {self.table.key}")
+        else:
+            await self._update_manifest(
+                lambda manifest: self._merge_rows_into(manifest, new_data)
+            )
+        await self._after_save(new_data)
 
-        chunk_size = self.chunk_size
-        total_rows = len(combined_data)
-        num_chunks = (total_rows - 1) // chunk_size + 1
+    async def _merge_rows_into(self, manifest: ChunkManifest, new_data: pd.DataFrame):
+        if self.partition:
+            await self._save_partitions(manifest, new_data)
+            logger.info(f"Saved {len(new_data)} rows into {self.partition} partitions")
+            return
 
-        for i in range(num_chunks):
-            start_idx = i * chunk_size
-            end_idx = min((i + 1) * chunk_size, total_rows)
-            chunk_data = combined_data.iloc[start_idx:end_idx]
+        chunk_numbers = manifest.chunk_numbers()
+        if not chunk_numbers:
+            await self._append_rows(manifest, new_data)
+            logger.info(f"Saved {len(new_data)} rows")
+            return
 
-            file_path = self._get_file_path(i)
-            await self._write_csv(file_path, chunk_data)
+        # 마지막 chunk 이후의 데이터는 append 로 처리
+        last_max = manifest.max_timestamp(chunk_numbers[-1])
+        tail_mask = new_data.index > last_max
+        tail_data = new_data[tail_mask]
+        body_data = new_data[~tail_mask]
 
-            logger.info(f"{'Updated' if i <= last_chunk_num else 'Created'} chunk {i}")
+        # 각 row 를 min <= ts 인 마지막 chunk 에 배정 (첫 chunk 이전은 첫 chunk)
+        chunk_mins = pd.DatetimeIndex([manifest.min_timestamp(n) for n in chunk_numbers])
+        positions = chunk_mins.searchsorted(body_data.index, side="right") - 1
+        positions = positions.clip(min=0)
 
-        # 불필요한 이전 청크들 삭제
-        for i in range(num_chunks, last_chunk_num + 1):
-            file_path = self._get_file_path(i)
-            if await self._file_exists(file_path):
-                await self._delete_file(file_path)
-                logger.info(f"Removed unnecessary chunk {i}")
+        rewritten = 0
+        for position, rows in body_data.groupby(positions):
+            chunk_num = chunk_numbers[position]
+            if await self._merge_into_chunk(manifest, chunk_num, rows):
+                rewritten += 1
 
-        logger.info(f"Saved {total_rows} rows in {num_chunks} chunks")
+        if not tail_data.empty:
+            await self._append_rows(manifest, tail_data)
 
-    async def _save_new_data(self, new_data: pd.DataFrame):
+        logger.info(
+            f"Merged {len(body_data)} rows into {rewritten} chunks, "
+            f"appended {len(tail_data)} rows"
+        )
+
+    async def _after_save(self, new_data: pd.DataFrame):
+        """
+        Called with the rows of every successful save (derived stores hook in here)
+        """
+        await self._update_rollups(new_data)
+
+    async def _update_rollups(self, new_data: pd.DataFrame):
+        """
+        Recompute only the rollup buckets the saved rows fall into, from the
+        stored rows of those buckets.
+        """
+        if not self._rollup_stores or new_data.empty:
+            return
+        new_data = new_data[~new_data.index.isna()]
         if new_data.empty:
             return
 
-        last_chunk_num = await self._get_last_chunk_number()
-        last_chunk_data = (
-            await self._read_csv(self._get_file_path(last_chunk_num))
-            if last_chunk_num >= 0
-            else pd.DataFrame()
-        )
+        first, last = new_data.index.min(), new_data.index.max()
+        for freq, store in self._rollup_stores.items():
+            start = bucket_start(first, freq, self.calendar)
+            end = bucket_end(last, freq, self.calendar) - pd.Timedelta(1, "ns")
+            base = await self._load_date_range(start, end)
+            bars = aggregate(base, freq, self.calendar)
+            if not bars.empty:
+                await store._save_data(bars)
+                logger.debug(f"Updated {len(bars)} {freq} bars in {store.base_path}")
+
+    async def get_rollup(
+        self,
+        freq: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+        compact: bool = False,
+    ) -> pd.DataFrame:
+        """
+        freq OHLCV bars for [start_date, end_date], served from the stored
+        rollup. Frequencies without a rollup are aggregated on the fly.
+        """
+        store = self._rollup_stores.get(freq)
+        if store is None:
+            logger.warning(f"No {freq} rollup in {self.base_path}, aggregating on the fly")
+            data = await self.get_data_range(start_date, end_date)
+            bars = aggregate(data, freq, self.calendar)
+            return self._finish_read(bars, columns, compact) if not bars.empty else bars
+
+        data = await store._load_date_range(start_date, end_date)
+
+        # buffer 에 있는 row 가 들어갈 bucket 은 다시 계산한다.
+        pending = self._with_buffered(pd.DataFrame(), start_date, end_date)
+        if not pending.empty:
+            start = bucket_start(pending.index.min(), freq, self.calendar)
+            base = await self._load_date_range(start, end_date)
+            base = self._with_buffered(base, start, end_date)
+            data = self._merge_rows(data, aggregate(base, freq, self.calendar))
+
+        if data.empty:
+            return pd.DataFrame()
+        return self._finish_read(data.sort_index(), columns, compact)
+
+    async def rebuild_rollups(self) -> Dict[str, int]:
+        """
+        Recompute every rollup from the stored rows in one streaming pass.
+        Returns the number of bars per frequency.
+        """
+        if not self._rollup_stores:
+            return {}
+
+        carry = {freq: pd.DataFrame() for freq in self._rollup_stores}
+        bars_written = {freq: 0 for freq in self._rollup_stores}
+
+        async def write(freq: str, rows: pd.DataFrame):
+            bars = aggregate(rows, freq, self.calendar)
+            if not bars.empty:
+                await self._rollup_stores[freq]._save_data(bars)
+                bars_written[freq] += len(bars)
+
+        async for chunk in self.iter_range():
+            for freq in self._rollup_stores:
+                data = pd.concat([carry[freq], chunk]) if not carry[freq].empty else chunk
+                # chunk 경계에 걸친 마지막 bucket 은 다음 chunk 와 함께 계산
+                last_bucket = bucket_start(data.index[-1], freq, self.calendar)
+                await write(freq, data[data.index < last_bucket])
+                carry[freq] = data[data.index >= last_bucket]
+
+        for freq, rows in carry.items():
+            await write(freq, rows)
+
+        logger.info(f"Rebuilt rollups of {self.base_path}: {bars_written}")
+        return bars_written
+
+    async def _merge_into_chunk(
+        self, manifest: ChunkManifest, chunk_num: int, rows: pd.DataFrame
+    ) -> bool:
+        """
+        Rewrite one chunk with the given rows merged in. Overflow beyond
+        chunk_size goes to new chunks. Returns False if nothing changed.
+        """
+        existing = await self._read_chunk_entry(manifest, chunk_num)
+        merged = self._merge_rows(existing, rows)
+
+        if (
+            not manifest.deltas(chunk_num)
+            and merged.index.equals(existing.index)
+            and merged.equals(existing)
+        ):
+            return False
+
+        # 시간 partition 은 row 수로 나누지 않는다.
+        limit = len(merged) if self.partition else self.chunk_size
+        await self._write_chunk(chunk_num, merged.iloc[:limit], manifest=manifest)
+        logger.info(f"Updated chunk {chunk_num}")
+
+        for start_idx in range(limit, len(merged), self.chunk_size):
+            new_chunk = manifest.next_chunk_number()
+            await self._write_chunk(
+                new_chunk,
+                merged.iloc[start_idx : start_idx + self.chunk_size],
+                manifest=manifest,
+            )
+            logger.info(f"Created chunk {new_chunk} (split from chunk {chunk_num})")
+        return True
+
+    @staticmethod
+    def _merge_rows(existing: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Combine stored rows with new ones. New rows win on equal timestamps.
+        """
+        merged = pd.concat([existing, rows]) if not existing.empty else rows
+        return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+    async def _save_new_data(self, new_data: pd.DataFrame):
+        """
+        Append rows newer than the stored data. Only the new rows are written.
+        """
+        if new_data.empty:
+            return
 
         # NaT 값 제거
-        last_chunk_data = last_chunk_data[~last_chunk_data.index.isna()]
-        new_data = new_data[~new_data.index.isna()]
+        new_data = new_data[~new_data.index.isna()].sort_index()
+
+        if self.table is not None:
+            latest_timestamp = await self.table.latest_timestamp()
+            if latest_timestamp is not None:
+                new_data = new_data[new_data.index > latest_timestamp]
+            if new_data.empty:
+                logger.info("No rows newer than the stored data")
+                return
+            await self.table.upsert(new_data)
+            logger.info(f"Saved {len(new_data)} new rows")
+            await self._after_save(new_data)
+            return
 
-        if not last_chunk_data.empty:
-            last_date = last_chunk_data.index[-1]
-            new_data = new_data[new_data.index > last_date]
+        async def append(manifest: ChunkManifest) -> pd.DataFrame:
+            latest_timestamp = manifest.latest_timestamp()
+            rows = new_data
+            if latest_timestamp is not None:
+                rows = rows[rows.index > latest_timestamp]
+            if not rows.empty:
+                await self._append_rows(manifest, rows)
+            return rows
 
-        combined_data = pd.concat([last_chunk_data, new_data]).sort_index()
-        chunk_size = self.chunk_size
+        new_data = await self._update_manifest(append)
+        if new_data.empty:
+            logger.info("No rows newer than the stored data")
+            return
+        logger.info(f"Saved {len(new_data)} new rows")
+        await self._after_save(new_data)
 
-        current_chunk = last_chunk_num
-        start_idx = 0
+    async def _append_rows(self, manifest: ChunkManifest, new_data: pd.DataFrame):
+        """
+        The last chunk is extended (in place or with a delta object) and rolls
+        over to a new chunk when it reaches chunk_size.
+        """
+        if self.partition:
+            await self._save_partitions(manifest, new_data)
+            return
 
-        while start_idx < len(combined_data):
-            end_idx = min(start_idx + chunk_size, len(combined_data))
-            chunk_data = combined_data.iloc[start_idx:end_idx]
+        start_idx = 0
+        if not manifest.is_empty():
+            last_chunk_num = manifest.last_chunk_number()
+            room = self.chunk_size - manifest.entry(last_chunk_num)["rows"]
+            if room > 0:
+                await self._append_chunk(
+                    last_chunk_num, new_data.iloc[:room], manifest=manifest
+                )
+                start_idx = min(room, len(new_data))
+                logger.info(f"Appended {start_idx} rows to chunk {last_chunk_num}")
+            await self._compact_chunk_if_needed(manifest, last_chunk_num)
+
+        while start_idx < len(new_data):
+            end_idx = min(start_idx + self.chunk_size, len(new_data))
+            new_chunk = manifest.next_chunk_number()
+            await self._write_chunk(
+                new_chunk, new_data.iloc[start_idx:end_idx], manifest=manifest
+            )
+            logger.info(f"Created chunk {new_chunk}")
+            start_idx = end_idx
 
-            await self._write_csv(self._get_file_path(current_chunk), chunk_data)
-            logger.info(
-                f"{'Updated' if current_chunk == last_chunk_num else 'Created'} chunk {current_chunk}"
+    async def _save_partitions(self, manifest: ChunkManifest, new_data: pd.DataFrame):
+        """
+        Route rows to their time partition. Rows after the end of a partition are
+        appended, a new partition is written, anything else is merged.
+        """
+        keys = partition_keys(new_data.index, self.partition)
+        for key, rows in new_data.groupby(keys):
+            key = int(key)
+            chunk_max = (
+                manifest.max_timestamp(key) if manifest.entry(key) is not None else None
             )
+            if chunk_max is None:
+                await self._write_chunk(key, rows, manifest=manifest)
+                logger.info(f"Created partition {partition_name(key, self.partition)}")
+            elif rows.index.min() > chunk_max:
+                await self._append_chunk(key, rows, manifest=manifest)
+                await self._compact_chunk_if_needed(manifest, key)
+            else:
+                await self._merge_into_chunk(manifest, key, rows)
 
-            start_idx = end_idx
-            current_chunk += 1
+    async def _read_chunk_entries(
+        self, manifest: ChunkManifest, chunk_numbers: List[int]
+    ) -> List[pd.DataFrame]:
+        """
+        Read chunks concurrently (at most max_concurrent_reads in flight).
+        Results keep the order of chunk_numbers.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_reads)
+        generations = await self._list_generations(chunk_numbers)
 
-        logger.info(
-            f"Saved {len(new_data)} new rows across {current_chunk - last_chunk_num} chunks"
-        )
+        async def read(chunk_num: int) -> pd.DataFrame:
+            async with semaphore:
+                return await self._read_chunk_entry(manifest, chunk_num, generations)
 
-    async def _read_all_chunks(self, last_chunk_num: int) -> pd.DataFrame:
-        all_data = []
-        for chunk_num in range(last_chunk_num + 1):
-            chunk_data = await self._read_csv(self._get_file_path(chunk_num))
-            if not chunk_data.empty:
-                all_data.append(chunk_data)
-        return pd.concat(all_data) if all_data else pd.DataFrame()
+        return list(await asyncio.gather(*[read(n) for n in chunk_numbers]))
 
-    async def _read_last_chunk(self, chunk_num: int) -> pd.DataFrame:
-        file_path = self._get_file_path(chunk_num)
-        return await self._read_csv(file_path)
+    async def _list_generations(self, chunk_numbers: List[int]) -> Dict[str, str]:
+        """
+        Object versions of every file below base_path from one prefix listing
+        (GCS), instead of looking up each chunk on its own. Only worth it when
+        more than one chunk is read.
+        """
+        if len(chunk_numbers) < 2:
+            return {}
+        try:
+            return await self.storage.list_versions(self.base_path)
+        except Exception as e:
+            logger.warning(f"Listing {self.base_path} failed: {e}")
+            return {}
+
+    async def _read_all_chunks(self, manifest: ChunkManifest) -> pd.DataFrame:
+        chunks = await self._read_chunk_entries(manifest, manifest.chunk_numbers())
+        all_data = [chunk_data for chunk_data in chunks if not chunk_data.empty]
+        return pd.concat(all_data) if all_data else pd.DataFrame()
 
     async def _get_last_chunk_number(self) -> int:
-        chunk_num = 0
-        while True:
-            file_path = self._get_file_path(chunk_num)
-            if not await self._file_exists(file_path):
-                return chunk_num - 1 if chunk_num > 0 else 0
-            chunk_num += 1
+        manifest = await self._load_manifest()
+        return manifest.last_chunk_number()
 
-    async def get_all_data(self) -> pd.DataFrame:
+    async def get_all_data(
+        self, columns: Optional[List[str]] = None, compact: bool = False
+    ) -> pd.DataFrame:
+        """
+        compact=True returns a memory lean frame, see compact_frame()
+        """
         logger.info(f"Loading all data from {self.base_path}")
-        all_data = []
-        chunk_num = 0
+        all_data = await self._load_date_range(None, None, columns)
+        all_data = self._with_buffered(all_data)
+        if all_data.empty:
+            return pd.DataFrame()
+        return self._finish_read(self._unique_timestamps(all_data), columns, compact)
+
+    async def iter_range(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Yield the stored data one chunk at a time, in time order.
+        Only the current chunk and the prefetched next one are held in memory.
+        If a writer replaces a chunk meanwhile, iteration resumes after the last
+        yielded timestamp on the new manifest.
+        """
+        start_ts = self._to_utc_timestamp(start_date)
+        end_ts = self._to_utc_timestamp(end_date)
+        if self.table is not None:
+            async for data in self._iter_table(start_ts, end_ts, columns):
+                yield data
+            return
+
+        last_ts = None
+        for attempt in range(SNAPSHOT_RETRIES + 1):
+            manifest = await self._load_manifest()
+            chunk_numbers = self._select_chunks(
+                manifest, last_ts if last_ts is not None else start_ts, end_ts
+            )
+
+            generations = await self._list_generations(chunk_numbers)
+            next_read = None
+            try:
+                for i, chunk_num in enumerate(chunk_numbers):
+                    if next_read is None:
+                        next_read = asyncio.ensure_future(
+                            self._read_chunk_entry(manifest, chunk_num, generations)
+                        )
+                    data = await next_read
+                    next_read = None
+                    if i + 1 < len(chunk_numbers):
+                        next_read = asyncio.ensure_future(
+                            self._read_chunk_entry(
+                                manifest, chunk_numbers[i + 1], generations
+                            )
+                        )
+
+                    data = self._clip_chunk(manifest, chunk_num, data, start_ts, end_ts)
+                    if last_ts is not None:
+                        data = data[data.index > last_ts]
+                    if data.empty:
+                        continue
+                    last_ts = data.index.max()
+                    if columns is not None:
+                        data = self._project(data, columns)
+                    yield data
+
+                buffered = self._buffered_after(start_ts, end_ts, last_ts, columns)
+                if not buffered.empty:
+                    yield buffered
+                return
+            except StaleManifestError as e:
+                if attempt == SNAPSHOT_RETRIES:
+                    raise
+                logger.info(f"Snapshot of {self.base_path} changed while iterating: {e}")
+            finally:
+                # 중간에 iteration 을 멈춘 경우 prefetch 중인 read 가 끝날 때까지 기다린다.
+                if next_read is not None:
+                    await asyncio.gather(next_read, return_exceptions=True)
+
+    async def _iter_table(
+        self,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+        columns: Optional[List[str]],
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        iter_range over the sqlite table, chunk_size rows per primary key range scan
+        """
+        last_ts = None
         while True:
-            file_path = self._get_file_path(chunk_num)
-            if not await self._file_exists(file_path):
+            data = await self.table.query(
+                start_ts, end_ts, columns, after_ts=last_ts, limit=self.chunk_size
+            )
+            if data.empty:
                 break
-            data = await self._read_csv(file_path)
-            if not data.empty:
-                all_data.append(data)
-            chunk_num += 1
-        return (
-            pd.concat(all_data).sort_index().drop_duplicates(keep="last")
-            if all_data
-            else pd.DataFrame()
-        )
+            last_ts = data.index[-1]
+            yield data
+            if len(data) < self.chunk_size:
+                break
+        buffered = self._buffered_after(start_ts, end_ts, last_ts, columns)
+        if not buffered.empty:
+            yield buffered
+
+    def _buffered_after(
+        self,
+        start_ts: Optional[pd.Timestamp],
+        end_ts: Optional[pd.Timestamp],
+        last_ts: Optional[pd.Timestamp],
+        columns: Optional[List[str]],
+    ) -> pd.DataFrame:
+        """
+        Rows of the write buffer after the last yielded timestamp. Iteration
+        yields them last, as they are not stored yet.
+        """
+        buffered = self._with_buffered(pd.DataFrame(), start_ts, end_ts)
+        if last_ts is not None and not buffered.empty:
+            buffered = buffered[buffered.index > last_ts]
+        if columns is not None and not buffered.empty:
+            buffered = self._project(buffered, columns)
+        return buffered
+
+    def iter_chunks(
+        self, columns: Optional[List[str]] = None
+    ) -> AsyncIterator[pd.DataFrame]:
+        return self.iter_range(columns=columns)
+
+    async def export_csv(
+        self,
+        file_path: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Stream the stored data into a single local csv file. Returns written rows.
+        """
+        rows = 0
+        async with aiofiles.open(file_path, mode="wb") as f:
+            async for data in self.iter_range(start_date, end_date, columns):
+                content = await asyncio.to_thread(
+                    encode_chunk, data, "csv", header=rows == 0
+                )
+                await f.write(content)
+                rows += len(data)
+        logger.info(f"Exported {rows} rows from {self.base_path} to {file_path}")
+        return rows
 
     async def get_data_range(
-        self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+        compact: bool = False,
     ) -> pd.DataFrame:
+        """
+        compact=True returns a memory lean frame, see compact_frame()
+        """
         logger.info(f"Getting data from {start_date} to {end_date}")
-        all_data = await self.get_all_data()
-        if all_data.empty:
+        data = await self._load_date_range(start_date, end_date, columns)
+        data = self._with_buffered(data, start_date, end_date)
+        if data.empty:
             logger.warning(f"No data found in the range {start_date} to {end_date}")
             return pd.DataFrame()
 
-        if start_date:
-            start_ts = pd.Timestamp(start_date)
-            if start_ts.tzinfo is None:
-                start_ts = start_ts.tz_localize(pytz.UTC)
-            all_data = all_data[all_data.index >= start_ts]
+        return self._finish_read(self._unique_timestamps(data), columns, compact)
+
+    @staticmethod
+    def _unique_timestamps(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        One row per timestamp, the later one wins. Chunks arrive in manifest
+        time order, so only overlapping chunks need a sort.
+        """
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index(kind="stable")
+        return data[~data.index.duplicated(keep="last")]
+
+    @staticmethod
+    def _project(data: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        return data[[c for c in columns if c in data.columns]]
+
+    def _finish_read(
+        self, data: pd.DataFrame, columns: Optional[List[str]], compact: bool
+    ) -> pd.DataFrame:
+        if compact:
+            data = compact_frame(data, columns)
+            report = data.attrs["memory"]
+            logger.info(
+                f"Compact frame of {self.base_path}: {report['bytes_before']} -> "
+                f"{report['bytes_after']} bytes ({report['bytes_saved']} saved)"
+            )
+            return data
+        if columns is not None:
+            return self._project(data, columns)
+        return data
+
+    def _with_buffered(
+        self,
+        data: pd.DataFrame,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Stored rows plus the rows still waiting in the write buffer (buffer wins)
+        """
+        if self.write_buffer is None or len(self.write_buffer) == 0:
+            return data
+        buffered = self.write_buffer.view(
+            self._to_utc_timestamp(start_date), self._to_utc_timestamp(end_date)
+        )
+        if buffered.empty:
+            return data
+        if data.empty:
+            return buffered
+        return self._merge_rows(data, buffered)
+
+    async def buffer_new_data(self, new_data: pd.DataFrame):
+        """
+        Keep new rows in the write buffer and persist them once a flush is due.
+        Without a buffer the rows are saved right away.
+        """
+        if new_data.empty:
+            return
+        if self.write_buffer is None:
+            await self._save_new_data(new_data)
+            return
+        self.write_buffer.add(new_data[~new_data.index.isna()])
+        logger.info(
+            f"Buffered {len(new_data)} rows ({len(self.write_buffer)} pending) "
+            f"for {self.base_path}"
+        )
+        await self.flush_if_due()
+
+    async def flush_if_due(self):
+        if self.write_buffer is None or not self.write_buffer.is_due():
+            return
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(
+                f"Failed to flush {len(self.write_buffer)} buffered rows: {e}",
+                exc_info=True,
+            )
 
-        if end_date:
-            end_ts = pd.Timestamp(end_date)
-            if end_ts.tzinfo is None:
-                end_ts = end_ts.tz_localize(pytz.UTC)
-            all_data = all_data[all_data.index <= end_ts]
+    async def flush(self):
+        """
+        Persist every buffered row in one write. On failure the rows stay
+        buffered and the next flush retries them.
+        """
+        if self.write_buffer is None:
+            return
+        async with self._flush_lock:
+            pending = self.write_buffer.snapshot()
+            if pending.empty:
+                return
+            # buffer 보다 새로운 row 가 먼저 저장됐을 수 있으므로 merge 로 저장한다.
+            await self._save_data(pending)
+            self.write_buffer.discard(pending)
+            logger.info(f"Flushed {len(pending)} buffered rows to {self.base_path}")
 
-        return all_data
+    def get_write_buffer_stats(self) -> Dict[str, Any]:
+        return self.write_buffer.stats() if self.write_buffer is not None else {}
 
-    async def get_latest_n_days(self, n: int) -> pd.DataFrame:
+    async def get_latest_n_days(
+        self, n: int, columns: Optional[List[str]] = None, compact: bool = False
+    ) -> pd.DataFrame:
         logger.info(f"Getting latest {n} days of data")
         end_date = datetime.now(tz=pytz.UTC)
         start_date = end_date - timedelta(days=n)
-        return await self.get_data_range(start_date, end_date)
+        return await self.get_data_range(start_date, end_date, columns, compact)
+
+    async def _remove_object(self, file_path: str):
+        self._invalidate_cache(file_path)
+        await self.storage.delete(file_path)
+
+    async def _delete_file(
+        self, file_path: str, manifest: Optional[ChunkManifest] = None
+    ):
+        """
+        Delete a chunk file together with its delta objects and manifest entry.
+        Files referenced by the manifest are removed after the manifest swap.
+        """
+        if manifest is None:
+            await self._update_manifest(
+                lambda current: self._delete_file(file_path, manifest=current)
+            )
+            return
 
-    async def _delete_file(self, file_path: str):
-        if self.storage_type == "local":
-            os.remove(file_path)
-        elif self.storage_type == "gcs":
-            blob = self.bucket.blob(file_path)
-            await asyncio.to_thread(blob.delete)
+        chunk_num = manifest.find(self._file_name(file_path))
+        if chunk_num is not None:
+            self._drop_chunk(manifest, chunk_num)
+        elif await self._file_exists(file_path):
+            await self._remove_object(file_path)
+
+    @staticmethod
+    def _drop_chunk(manifest: ChunkManifest, chunk_num: int):
+        manifest.retire(manifest.remove(chunk_num))
 
     async def clean_old_data(self, days: int):
         logger.info(f"Cleaning data older than {days} days")
         cutoff_date = datetime.now(tz=pytz.UTC) - timedelta(days=days)
-        chunk_num = 0
-        while True:
-            file_path = self._get_file_path(chunk_num)
-            if not await self._file_exists(file_path):
-                break
-            data = await self._read_csv(file_path)
-            if not data.empty and data.index.max() < cutoff_date:
-                await self._delete_file(file_path)
-                logger.info(f"Deleted old data file {file_path}")
-            chunk_num += 1
+        if self.table is not None:
+            deleted = await self.table.delete_before(pd.Timestamp(cutoff_date))
+            logger.info(f"Deleted {deleted} rows of {self.table.key}")
+            return
+        if self.partition:
+            await self._clean_old_partitions(pd.Timestamp(cutoff_date))
+            return
+
+        async def drop_old(manifest: ChunkManifest):
+            for chunk_num in manifest.chunk_numbers():
+                chunk_max = manifest.max_timestamp(chunk_num)
+                if chunk_max is not None and chunk_max < cutoff_date:
+                    file_path = self._chunk_path(manifest, chunk_num)
+                    self._drop_chunk(manifest, chunk_num)
+                    logger.info(f"Deleted old data file {file_path}")
+
+        await self._update_manifest(drop_old)
+
+    async def _clean_old_partitions(self, cutoff: pd.Timestamp):
+        """
+        Drop partitions that end before cutoff. Directories entirely before the
+        cutoff (e.g. a whole year of monthly partitions) go with one prefix delete.
+        """
+
+        async def drop_old(manifest: ChunkManifest) -> Set[str]:
+            prefixes = set()
+            for key in manifest.chunk_numbers():
+                if partition_bounds(key, self.partition)[1] > cutoff:
+                    continue
+                prefix = expired_prefix(key, self.partition, cutoff)
+                if prefix is not None:
+                    manifest.remove(key)
+                    prefixes.add(prefix)
+                else:
+                    self._drop_chunk(manifest, key)
+                logger.info(f"Deleted old partition {partition_name(key, self.partition)}")
+            return prefixes
+
+        prefixes = await self._update_manifest(drop_old)
+
+        # manifest 교체 후 디렉토리(prefix) 단위로 삭제
+        for prefix in sorted(prefixes):
+            await self._remove_prefix(self._join_path(prefix))
+
+    async def _remove_prefix(self, prefix: str):
+        logger.info(f"Removing {prefix}")
+        for file_path in await self.storage.delete_prefix(prefix):
+            self._invalidate_cache(file_path)
 
     async def get_latest_datetime(self) -> Optional[datetime]:
         """
         return UTC[datetime.datetime]
         """
-        logger.info("Getting latest datetime from the last chunk")
-        last_chunk_num = await self._get_last_chunk_number()
-        if last_chunk_num < 0:
+        logger.info("Getting latest datetime from the manifest")
+        if self.table is not None:
+            latest = [await self.table.latest_timestamp()]
+        else:
+            latest = [(await self._load_manifest()).latest_timestamp()]
+        if self.write_buffer is not None:
+            latest.append(self.write_buffer.latest_timestamp())
+        latest = [ts for ts in latest if ts is not None]
+        latest_timestamp = max(latest) if latest else None
+        if latest_timestamp is None:
             return None
 
-        last_chunk_data = await self._read_last_chunk(last_chunk_num)
-        if not last_chunk_data.empty:
-            latest_timestamp = last_chunk_data.index.max()
-
-            if isinstance(latest_timestamp, pd.Timestamp):
-                latest_datetime = latest_timestamp.to_pydatetime()
-            elif isinstance(latest_timestamp, datetime):
-                latest_datetime = latest_timestamp
-            else:
-                latest_datetime = pd.to_datetime(latest_timestamp).to_pydatetime()
-
-            if latest_datetime.tzinfo is None:
-                latest_datetime = latest_datetime.replace(tzinfo=pytz.UTC)
+        latest_datetime = latest_timestamp.to_pydatetime()
+        if latest_datetime.tzinfo is None:
+            latest_datetime = latest_datetime.replace(tzinfo=pytz.UTC)
 
-            logger.info(f"Latest datetime in data: {latest_datetime}")
-            return latest_datetime
-        return None
+        logger.info(f"Latest datetime in data: {latest_datetime}")
+        return latest_datetime
 
     async def update_to_latest(self):
         """
@@ -490,36 +1564,421 @@ class DataPipeline(metaclass=ABCMeta):
         start_date = end_date - timedelta(days=days_back)
         return await self.get_data_range(start_date, end_date)
 
-    async def _write_csv(self, file_path: str, data: pd.DataFrame):
-        logger.info(f"Writing CSV to {file_path}")
-        if self.storage_type == "local":
-            async with self._file_lock(file_path):
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                await asyncio.to_thread(
-                    data.to_csv, file_path, index=True, header=True, mode="w"
+    async def _write_chunk(
+        self,
+        chunk_num: int,
+        data: pd.DataFrame,
+        manifest: Optional[ChunkManifest] = None,
+        keep_previous: bool = False,
+    ):
+        """
+        Write a chunk under a new generation name and point the manifest at it.
+        The previous file stays readable until the manifest swap.
+        """
+        if manifest is None:
+            await self._update_manifest(
+                lambda current: self._write_chunk(
+                    chunk_num, data, manifest=current, keep_previous=keep_previous
                 )
-        elif self.storage_type == "gcs":
-            csv_buffer = StringIO()
-            data.to_csv(csv_buffer, index=True, header=True)
-            csv_string = csv_buffer.getvalue()
-            blob = self.bucket.blob(file_path)
-            await asyncio.to_thread(
-                blob.upload_from_string, csv_string, content_type="text/csv"
             )
+            return
 
-    async def _append_csv(self, file_path: str, data: pd.DataFrame):
-        logger.info(f"Appending CSV to {file_path}")
-        if self.storage_type == "local":
-            async with self._file_lock(file_path):
-                await asyncio.to_thread(
-                    data.to_csv, file_path, mode="a", header=False, index=True
-                )
-        elif self.storage_type == "gcs":
-            existing_data = await self._read_csv(file_path)
-            combined_data = (
-                pd.concat([existing_data, data]).drop_duplicates().sort_index()
+        file_path = self._get_file_path(
+            chunk_num, generation=manifest.generation + 1
+        )
+        logger.info(f"Writing {self.file_format} chunk to {file_path}")
+        content = await asyncio.to_thread(
+            encode_chunk, data, self.file_format, self.compression
+        )
+        await self._write_object(
+            manifest, file_path, content, CONTENT_TYPES[self.file_format]
+        )
+
+        entry = ChunkManifest.describe(self._file_name(file_path), data, content)
+        previous = manifest.entry(chunk_num)
+        manifest.update(chunk_num, entry)
+        # 새로 쓴 chunk 는 delta 를 포함하므로 이전 파일과 delta 객체는 모두 폐기한다.
+        if not keep_previous:
+            manifest.retire(previous, keep=entry["file"])
+
+    async def _append_chunk(
+        self,
+        chunk_num: int,
+        data: pd.DataFrame,
+        manifest: Optional[ChunkManifest] = None,
+    ):
+        """
+        Append rows to an existing chunk without rewriting it.
+        csv files on storage that can append (local, memory) are extended in place
+        (readers only see the bytes recorded in the manifest), everything else
+        (GCS, columnar formats) gets a small delta object that compact_deltas()
+        merges later.
+        """
+        if manifest is None:
+            await self._update_manifest(
+                lambda current: self._append_chunk(chunk_num, data, manifest=current)
             )
-            await self._write_csv(file_path, combined_data)
+            return
+
+        entry = manifest.entry(chunk_num)
+        if entry is None:
+            await self._write_chunk(chunk_num, data, manifest=manifest)
+            return
+
+        file_path = self._join_path(entry["file"])
+        logger.info(f"Appending {len(data)} rows to {file_path}")
+        if (
+            self.storage.supports_append
+            and format_from_path(file_path) == "csv"
+            and self.file_format == "csv"
+            and not await self._is_compressed(file_path)
+        ):
+            content = await asyncio.to_thread(
+                encode_chunk, data, self.file_format, header=False
+            )
+            self._invalidate_cache(file_path)
+            await self.storage.append_bytes(file_path, content, entry["bytes"])
+            manifest.extend(chunk_num, data, content)
+        else:
+            await self._write_delta(manifest, chunk_num, data)
+
+    async def _write_delta(
+        self, manifest: ChunkManifest, chunk_num: int, data: pd.DataFrame
+    ) -> Dict[str, Any]:
+        """
+        Write rows as the next delta object of a chunk and record it
+        """
+        delta_path = self._get_delta_path(manifest, chunk_num)
+        content = await asyncio.to_thread(
+            encode_chunk, data, self.file_format, self.compression
+        )
+        await self._write_object(
+            manifest, delta_path, content, CONTENT_TYPES[self.file_format]
+        )
+        delta = ChunkManifest.describe(self._file_name(delta_path), data, content)
+        manifest.add_delta(chunk_num, delta)
+        return delta
+
+    async def _merge_as_delta(
+        self,
+        manifest: ChunkManifest,
+        chunk_num: int,
+        rows: pd.DataFrame,
+        existing: pd.DataFrame,
+    ):
+        """
+        Store rows for timestamps a chunk already covers as a delta object laid
+        over the chunk on read (see _fold_deltas), instead of rewriting it.
+        """
+        added = int((~rows.index.isin(existing.index)).sum())
+        delta = await self._write_delta(manifest, chunk_num, rows)
+        # 이미 있는 timestamp 는 chunk 의 row 수를 늘리지 않는다.
+        manifest.entry(chunk_num)["rows"] -= delta["rows"] - added
+        logger.info(f"Wrote {len(rows)} rows of chunk {chunk_num} as a delta")
+        await self._compact_chunk_if_needed(manifest, chunk_num)
+
+    async def _compact_chunk_if_needed(self, manifest: ChunkManifest, chunk_num: int):
+        deltas = manifest.deltas(chunk_num)
+        if not deltas:
+            return
+        if len(deltas) >= self.max_deltas or (
+            not self.partition and manifest.entry(chunk_num)["rows"] >= self.chunk_size
+        ):
+            await self._compact_chunk(manifest, chunk_num)
+
+    async def _compact_chunk(self, manifest: ChunkManifest, chunk_num: int):
+        data = await self._read_chunk_entry(manifest, chunk_num)
+        data = data[~data.index.duplicated(keep="last")]
+        await self._write_chunk(chunk_num, data, manifest=manifest)
+        logger.info(f"Compacted deltas of chunk {chunk_num} ({len(data)} rows)")
+
+    async def compact_deltas(self):
+        """
+        Merge every pending delta object into its base chunk
+        """
+        if self.table is not None:
+            return
+
+        async def compact_all(manifest: ChunkManifest):
+            for chunk_num in manifest.chunk_numbers():
+                if manifest.deltas(chunk_num):
+                    await self._compact_chunk(manifest, chunk_num)
+
+        await self._update_manifest(compact_all)
+
+    async def compact(
+        self,
+        target_bytes: int = DEFAULT_TARGET_CHUNK_BYTES,
+        remove_orphans: bool = True,
+    ) -> Dict[str, int]:
+        """
+        Rebalance the store: neighbouring undersized chunks are merged, oversized
+        ones split, pending deltas folded in and duplicate timestamps dropped.
+        Each group of chunks is swapped in with its own manifest update, so
+        writers are only blocked for one group at a time and readers always see
+        either the old or the new chunks. Time partitions keep their bounds and
+        are only rewritten when they have deltas.
+        """
+        if self.table is not None:
+            # sqlite 에는 chunk 파일이 없다.
+            logger.info(f"{self.base_path} is stored in sqlite, nothing to compact")
+            return {}
+
+        stats = {"groups": 0, "chunks_before": 0, "chunks_after": 0, "duplicates": 0}
+        manifest = await self._load_manifest()
+        stats["chunks_before"] = len(manifest.chunks)
+
+        if manifest.partition:
+            groups = [[n] for n in manifest.chunk_numbers() if manifest.deltas(n)]
+        else:
+            groups = self._plan_compaction(manifest, target_bytes)
+
+        for group in groups:
+            planned = {n: manifest.entry(n)["checksum"] for n in group}
+
+            async def rewrite(current: ChunkManifest) -> Optional[int]:
+                # 계획 이후 writer 가 바꾼 chunk 는 다음 compaction 에 맡긴다.
+                if any(
+                    current.entry(n) is None or current.entry(n)["checksum"] != checksum
+                    for n, checksum in planned.items()
+                ):
+                    return None
+                return await self._rewrite_group(current, group, target_bytes)
+
+            duplicates = await self._update_manifest(rewrite)
+            if duplicates is not None:
+                stats["duplicates"] += duplicates
+                stats["groups"] += 1
+            # 실시간 저장이 끼어들 수 있도록 group 사이에 양보
+            await asyncio.sleep(0)
+
+        if remove_orphans:
+            stats["orphans"] = await self.remove_orphans()
+
+        for store in self._rollup_stores.values():
+            await store.compact(target_bytes, remove_orphans)
+
+        stats["chunks_after"] = len((await self._load_manifest()).chunks)
+        logger.info(f"Compacted {self.base_path}: {stats}")
+        return stats
+
+    @staticmethod
+    def _plan_compaction(manifest: ChunkManifest, target_bytes: int) -> List[List[int]]:
+        """
+        Group neighbouring chunks (time order) whose combined size should be
+        rewritten. Returns only groups that change something.
+        """
+        groups, current, current_bytes, prev_max = [], [], 0, None
+        for chunk_num in manifest.chunk_numbers():
+            size = manifest.stored_bytes(chunk_num)
+            chunk_min = manifest.min_timestamp(chunk_num)
+            overlaps = (
+                prev_max is not None and chunk_min is not None and chunk_min <= prev_max
+            )
+            if (
+                not current
+                or overlaps
+                or current_bytes < target_bytes * UNDERSIZED_RATIO
+                or current_bytes + size <= target_bytes
+            ):
+                current.append(chunk_num)
+                current_bytes += size
+            else:
+                groups.append((current, current_bytes))
+                current, current_bytes = [chunk_num], size
+            chunk_max = manifest.max_timestamp(chunk_num)
+            if chunk_max is not None:
+                prev_max = max(prev_max, chunk_max) if prev_max is not None else chunk_max
+        if current:
+            groups.append((current, current_bytes))
+
+        selected = []
+        for group, group_bytes in groups:
+            if (
+                len(group) > 1
+                or manifest.deltas(group[0])
+                or group_bytes > target_bytes * 2
+            ):
+                selected.append(group)
+        return selected
+
+    async def _rewrite_group(
+        self, manifest: ChunkManifest, group: List[int], target_bytes: int
+    ) -> int:
+        """
+        Rewrite a group of chunks into evenly sized chunks of about target_bytes.
+        Returns the number of dropped duplicate rows.
+        """
+        frames = await self._read_chunk_entries(manifest, group)
+        frames = [frame for frame in frames if not frame.empty]
+        data = pd.concat(frames).sort_index(kind="stable") if frames else pd.DataFrame()
+        before = len(data)
+        data = data[~data.index.duplicated(keep="last")]
+        duplicates = before - len(data)
+
+        if manifest.partition:
+            await self._write_chunk(group[0], data, manifest=manifest)
+            return duplicates
+
+        group_bytes = sum(manifest.stored_bytes(n) for n in group)
+        parts = max(1, math.ceil(group_bytes / target_bytes)) if not data.empty else 0
+        numbers = list(group)
+        for part in np.array_split(np.arange(len(data)), parts) if parts else []:
+            chunk_num = numbers.pop(0) if numbers else manifest.next_chunk_number()
+            await self._write_chunk(chunk_num, data.iloc[part], manifest=manifest)
+        for chunk_num in numbers:
+            self._drop_chunk(manifest, chunk_num)
+
+        logger.info(
+            f"Rewrote chunks {group} of {self.base_path} into {max(parts, 1)} chunks "
+            f"({len(data)} rows, {duplicates} duplicates dropped)"
+        )
+        return duplicates
+
+    async def remove_orphans(self) -> int:
+        """
+        Delete chunk/delta/tmp files the manifest does not reference, e.g. left by
+        a writer that crashed before its manifest swap. Runs under the manifest
+        lock, so no writer is between writing a file and publishing it.
+        """
+        if self.table is not None:
+            return 0
+
+        async def remove(manifest: ChunkManifest) -> int:
+            removed = 0
+            referenced = set(manifest.referenced_files())
+            for file_name in await self._list_files():
+                # _manifest.json, _rollup/, _panel/ 등은 건드리지 않는다.
+                if file_name.startswith("_") or file_name in referenced:
+                    continue
+                if not self._is_data_file(file_name):
+                    continue
+                # 다른 host 의 writer 가 아직 발행하지 않은 파일은 이 manifest 보다
+                # 높은 generation 이름을 갖는다.
+                generation = generation_from_name(file_name)
+                if generation is not None and generation > manifest.generation:
+                    continue
+                await self._remove_object(self._join_path(file_name))
+                removed += 1
+            return removed
+
+        removed = await self._update_manifest(remove)
+        if removed:
+            logger.info(f"Removed {removed} orphan files in {self.base_path}")
+        return removed
+
+    def _is_data_file(self, file_name: str) -> bool:
+        if file_name.endswith(".tmp"):
+            return True
+        if self.partition and partition_from_name(file_name, self.partition):
+            return True
+        return (
+            chunk_number_from_name(file_name) is not None
+            or delta_number_from_name(file_name) >= 0
+        ) and "/" not in file_name
+
+    async def repartition(self) -> int:
+        """
+        Rewrite the stored data into the configured layout (row chunks or time
+        partitions). Returns the number of chunks written.
+        """
+        if self.table is not None:
+            logger.info(f"{self.base_path} is stored in sqlite, nothing to repartition")
+            return 0
+
+        async def rewrite(manifest: ChunkManifest) -> Optional[int]:
+            if manifest.partition == self.partition:
+                return None
+
+            data = await self._read_all_chunks(manifest)
+            for chunk_num in list(manifest.chunks):
+                self._drop_chunk(manifest, chunk_num)
+            manifest.partition = self.partition
+
+            if not data.empty:
+                data = data.sort_index()
+                data = data[~data.index.duplicated(keep="last")]
+                await self._append_rows(manifest, data)
+            return len(manifest.chunks)
+
+        written = await self._update_manifest(rewrite, check_layout=False)
+        if written is None:
+            logger.info(f"{self.base_path} already uses partition={self.partition}")
+            return 0
+        logger.info(
+            f"Repartitioned {self.base_path} into {written} chunks "
+            f"(partition={self.partition})"
+        )
+        return written
+
+    def _compression_for(self, file_format: str) -> Optional[str]:
+        if file_format == self.file_format:
+            return self.compression
+        return DEFAULT_COMPRESSION[file_format]
+
+    async def migrate_format(
+        self, source_format: str = "csv", keep_source: bool = False
+    ) -> int:
+        """
+        Convert existing chunk{N}.<source_format> files into the configured file_format.
+        Returns the number of migrated chunks.
+        """
+        source_format = validate_file_format(source_format)
+        if self.table is not None:
+            logger.info(f"{self.base_path} is stored in sqlite, nothing to migrate")
+            return 0
+        if source_format == self.file_format:
+            logger.info(f"Chunks in {self.base_path} are already {source_format}")
+            return 0
+
+        logger.info(
+            f"Migrating chunks in {self.base_path} from {source_format} to {self.file_format}"
+        )
+
+        async def convert(manifest: ChunkManifest) -> int:
+            migrated = 0
+            # manifest 에 등록된 source_format chunk
+            converted = set()
+            for chunk_num in manifest.chunk_numbers():
+                source_name = manifest.entry(chunk_num)["file"]
+                if format_from_path(source_name) != source_format:
+                    continue
+                data = await self._read_chunk_entry(manifest, chunk_num)
+                converted.add(source_name)
+                if data.empty:
+                    continue
+                await self._write_chunk(
+                    chunk_num, data, manifest=manifest, keep_previous=keep_source
+                )
+                migrated += 1
+
+            # manifest 에 없는 legacy chunk{N}.<source_format>
+            chunk_num = 0
+            while not self.partition:
+                source_path = self._get_file_path(chunk_num, source_format)
+                if self._file_name(source_path) in converted:
+                    chunk_num += 1
+                    continue
+                if not await self._file_exists(source_path):
+                    break
+                data = await self._read_chunk(source_path, source_format)
+                if not data.empty:
+                    target = (
+                        chunk_num
+                        if manifest.entry(chunk_num) is None
+                        else manifest.next_chunk_number()
+                    )
+                    await self._write_chunk(target, data, manifest=manifest)
+                    migrated += 1
+                if not keep_source:
+                    # manifest 교체 후에 지운다. (다시 시도해도 원본이 남아 있도록)
+                    manifest.garbage.append(self._file_name(source_path))
+                chunk_num += 1
+            return migrated
+
+        migrated = await self._update_manifest(convert)
+        logger.info(f"Migrated {migrated} chunks in {self.base_path}")
+        return migrated
 
     async def close(self):
         """
@@ -528,13 +1987,19 @@ class DataPipeline(metaclass=ABCMeta):
         logger.info(f"Closing data pipeline for {self.data_provider}")
 
         try:
+            if self.write_buffer is not None and len(self.write_buffer):
+                await self.flush()
+                logger.info("Write buffer flushed")
+
+            for store in self._rollup_stores.values():
+                await store.close()
+
             if hasattr(self.data_provider, "close"):
                 await self.data_provider.close()
                 logger.info("Data provider connection closed")
 
-            if self.storage_type == "gcs" and hasattr(self, "storage_client"):
-                self.storage_client.close()
-                logger.info("GCS client closed")
+            if self._owns_storage:
+                await self.storage.close()
 
             if self.use_file_lock:
                 await self._release_all_locks()
@@ -545,29 +2010,13 @@ class DataPipeline(metaclass=ABCMeta):
             logger.error(f"Error while closing data pipeline: {e}", exc_info=True)
 
     async def _release_all_locks(self):
-        if self.storage_type == "local":
-            lock_pattern = os.path.join(self.base_path, "*.lock")
-            lock_files = glob.glob(lock_pattern)
-            for lock_file in lock_files:
-                try:
-                    os.remove(lock_file)
-                    logger.info(f"Removed lock file: {lock_file}")
-                except Exception as e:
-                    logger.error(f"Failed to remove lock file {lock_file}: {e}")
+        # fcntl lock 은 fd 를 닫을 때 풀리므로, 아무도 잡고 있지 않은 lock 파일만 정리한다.
+        if self.storage.supports_file_lock:
+            await asyncio.to_thread(
+                file_lock_registry.cleanup_stale_locks, self.base_path
+            )
 
         # gcs는 file lock 하지 않음
-        # elif self.storage_type == "gcs":
-        #     # GCS의 경우 lock 파일 목록을 가져와서 삭제
-        #     prefix = f"{self.base_path}/"
-        #     blobs = self.bucket.list_blobs(prefix=prefix)
-        #     for blob in blobs:
-        #         if blob.name.endswith(".lock"):
-        #             try:
-        #                 blob.delete()
-        #                 logger.info(f"Removed lock file: {blob.name}")
-        #             except Exception as e:
-        #                 logger.error(f"Failed to remove lock file {blob.name}: {e}")
-
         logger.info("All file locks released")
 
     # Synchronous wrappers for backward compatibility
@@ -577,16 +2026,59 @@ class DataPipeline(metaclass=ABCMeta):
     def fetch_start_sync(self, **kwargs):
         asyncio.run(self.fetch_start(**kwargs))
 
-    def get_all_data_sync(self) -> pd.DataFrame:
-        return asyncio.run(self.get_all_data())
+    def get_all_data_sync(
+        self, columns: Optional[List[str]] = None, compact: bool = False
+    ) -> pd.DataFrame:
+        return asyncio.run(self.get_all_data(columns, compact))
 
     def get_data_range_sync(
-        self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+        compact: bool = False,
     ) -> pd.DataFrame:
-        return asyncio.run(self.get_data_range(start_date, end_date))
+        return asyncio.run(self.get_data_range(start_date, end_date, columns, compact))
 
-    def get_latest_n_days_sync(self, n: int) -> pd.DataFrame:
-        return asyncio.run(self.get_latest_n_days(n))
+    @staticmethod
+    def _iterate_sync(agen: AsyncIterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        loop = asyncio.new_event_loop()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(agen.aclose())
+            loop.close()
+
+    def iter_range_sync(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        return self._iterate_sync(self.iter_range(start_date, end_date, columns))
+
+    def iter_chunks_sync(
+        self, columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        return self._iterate_sync(self.iter_chunks(columns))
+
+    def export_csv_sync(
+        self,
+        file_path: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ) -> int:
+        return asyncio.run(self.export_csv(file_path, start_date, end_date, columns))
+
+    def get_latest_n_days_sync(
+        self, n: int, columns: Optional[List[str]] = None, compact: bool = False
+    ) -> pd.DataFrame:
+        return asyncio.run(self.get_latest_n_days(n, columns, compact))
 
     def clean_old_data_sync(self, days: int):
         asyncio.run(self.clean_old_data(days))
@@ -602,3 +2094,62 @@ class DataPipeline(metaclass=ABCMeta):
 
     def load_sync(self, days_back: int = 30) -> pd.DataFrame:
         return asyncio.run(self.load(days_back))
+
+    def compact_deltas_sync(self):
+        asyncio.run(self.compact_deltas())
+
+    def compact_sync(
+        self, target_bytes: int = DEFAULT_TARGET_CHUNK_BYTES
+    ) -> Dict[str, int]:
+        return asyncio.run(self.compact(target_bytes))
+
+    def repartition_sync(self) -> int:
+        return asyncio.run(self.repartition())
+
+    def get_rollup_sync(
+        self,
+        freq: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+        compact: bool = False,
+    ) -> pd.DataFrame:
+        return asyncio.run(self.get_rollup(freq, start_date, end_date, columns, compact))
+
+    def rebuild_rollups_sync(self) -> Dict[str, int]:
+        return asyncio.run(self.rebuild_rollups())
+
+    def migrate_format_sync(
+        self, source_format: str = "csv", keep_source: bool = False
+    ) -> int:
+        return asyncio.run(self.migrate_format(source_format, keep_source))
+
+
+class RollupPipeline(DataPipeline):
+    """
+    Store of coarser bars derived from another pipeline. It has no provider,
+    rows only come from the parent pipeline's saves.
+    """
+
+    async def fetch_data(self, **kwargs) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    async def fetch_start(self, **kwargs):
+        pass
+
+    async def _merge_into_chunk(
+        self, manifest: ChunkManifest, chunk_num: int, rows: pd.DataFrame
+    ) -> bool:
+        """
+        The bar of the still open bucket is recomputed on every save of the
+        parent. Bars from the last stored one on replace it through a delta
+        object, older bars are merged with a rewrite.
+        """
+        if rows.index.min() < manifest.max_timestamp(chunk_num):
+            return await super()._merge_into_chunk(manifest, chunk_num, rows)
+        existing = await self._read_chunk_entry(manifest, chunk_num)
+        current = existing.reindex(index=rows.index, columns=rows.columns)
+        if ((current == rows) | (current.isna() & rows.isna())).all().all():
+            return False
+        await self._merge_as_delta(manifest, chunk_num, rows, existing)
+        return True
@@ -0,0 +1,196 @@
+import os
+import glob
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from modules.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction 을 프로세스 간에 조율하지 않음
+    fcntl = None
+
+
+logger = get_logger(__name__)
+
+DEFAULT_DISK_CACHE_BYTES = 10 * 1024 * 1024 * 1024  # 10 GB
+
+# 여러 프로세스가 동시에 eviction 하지 않도록 잡는 lock 파일
+EVICTION_LOCK = ".eviction.lock"
+
+
+class DiskCache:
+    """
+    Read-through cache of remote object versions on local disk.
+
+    An entry is the content of one object at one version (GCS generation),
+    stored as <sha1(key)>.<version>. A version never changes, so an entry is
+    valid as long as the version the caller asks for matches; there is nothing
+    to expire. Every process on the host that uses the same directory shares
+    the entries: files are published with an atomic rename, the file mtime is
+    the LRU order, and eviction runs under an exclusive flock.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_DISK_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None  # 첫 eviction 검사 때 디렉토리를 훑어 채운다.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _digest(self, key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, version: Hashable) -> str:
+        digest = self._digest(key)
+        return os.path.join(self.directory, digest[:2], f"{digest}.{version}")
+
+    def _read(self, key: str, version: Hashable) -> Optional[bytes]:
+        path = self._path(key, version)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            # 최근에 쓴 entry 가 마지막에 지워지도록 mtime 갱신
+            os.utime(path, None)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def _write(self, key: str, version: Hashable, content: bytes):
+        if len(content) > self.max_bytes:
+            return
+        path = self._path(key, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        # 같은 object 의 이전 version 은 더 이상 읽히지 않는다.
+        freed = self._remove_versions(key, keep=path)
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += len(content) - freed
+            over = self._bytes is None or self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _remove_versions(self, key: str, keep: Optional[str] = None) -> int:
+        digest = self._digest(key)
+        pattern = os.path.join(self.directory, digest[:2], f"{digest}.*")
+        freed = 0
+        for path in glob.glob(pattern):
+            if path == keep or path.endswith(".tmp"):
+                continue
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                freed += size
+            except FileNotFoundError:
+                pass
+        return freed
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name == EVICTION_LOCK or name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        """
+        Delete least recently used entries until the cache fits max_bytes.
+        If another process is already evicting, leave it to that process.
+        """
+        fd = None
+        if fcntl is not None:
+            lock_file = os.path.join(self.directory, EVICTION_LOCK)
+            fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return
+        try:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+            with self._lock:
+                self._bytes = total
+                self.evictions += evicted
+            if evicted:
+                logger.info(f"Evicted {evicted} entries from disk cache {self.directory}")
+        finally:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    async def get(self, key: str, version: Hashable) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, key, version)
+
+    async def put(self, key: str, version: Hashable, content: bytes):
+        try:
+            await asyncio.to_thread(self._write, key, version, content)
+        except OSError as e:
+            # cache 에 쓰지 못해도 읽기는 계속한다.
+            logger.warning(f"Could not write disk cache entry for {key}: {e}")
+
+    async def invalidate(self, key: str):
+        freed = await asyncio.to_thread(self._remove_versions, key)
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes -= freed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "directory": self.directory,
+            }
+
+
+_disk_caches: Dict[str, DiskCache] = {}
+_disk_caches_lock = threading.Lock()
+
+
+def open_disk_cache(
+    directory: str, max_bytes: int = DEFAULT_DISK_CACHE_BYTES
+) -> DiskCache:
+    """
+    One DiskCache per directory in the process (pipelines of all symbols share it)
+    """
+    directory = os.path.abspath(os.path.expanduser(directory))
+    with _disk_caches_lock:
+        cache = _disk_caches.get(directory)
+        if cache is None:
+            cache = DiskCache(directory, max_bytes)
+            _disk_caches[directory] = cache
+        return cache
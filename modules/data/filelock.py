@@ -1,28 +1,252 @@
 import os
-import aiofiles
+import glob
 import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from modules.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내 잠금만 사용
+    fcntl = None
+
+
+logger = get_logger(__name__)
+
+DEFAULT_LOCK_TIMEOUT = 30.0
+
+# 다른 프로세스가 잡고 있는 lock 을 커널에서 기다리는 전용 thread
+LOCK_WAIT_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="flock-wait")
+
+
+class AsyncRWLock:
+    """
+    In-process reader/writer lock for one event loop. Writers are preferred so a
+    steady stream of readers cannot starve them.
+    """
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    async def acquire_read(self):
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: not self._writer and self._waiting_writers == 0
+            )
+            self._readers += 1
+
+    async def release_read(self):
+        async with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    async def acquire_write(self):
+        async with self._cond:
+            self._waiting_writers += 1
+            try:
+                await self._cond.wait_for(
+                    lambda: not self._writer and self._readers == 0
+                )
+            finally:
+                self._waiting_writers -= 1
+                self._cond.notify_all()
+            self._writer = True
+
+    async def release_write(self):
+        async with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+class FileLockRegistry:
+    """
+    Shared (read) / exclusive (write) locks on lock files.
+
+    Inside the process, coroutines are ordered by an AsyncRWLock per path.
+    Across processes, fcntl.flock is taken on the lock file; waiting happens in
+    the kernel instead of sleep polling, and the OS drops the lock when a process
+    dies, so a crashed process never leaves a lock behind.
+    """
+
+    def __init__(self):
+        # event loop 별로 {lock_file: [AsyncRWLock, 사용 중인 coroutine 수]}
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, list]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_lock(self, lock_file: str) -> AsyncRWLock:
+        locks = self._locks.setdefault(asyncio.get_running_loop(), {})
+        entry = locks.setdefault(lock_file, [AsyncRWLock(), 0])
+        entry[1] += 1
+        return entry[0]
+
+    def _put_lock(self, lock_file: str):
+        locks = self._locks.get(asyncio.get_running_loop(), {})
+        entry = locks.get(lock_file)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] == 0:
+            del locks[lock_file]
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        lock_file: str,
+        shared: bool = False,
+        timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT,
+    ):
+        rw_lock = self._get_lock(lock_file)
+        try:
+            try:
+                await asyncio.wait_for(
+                    rw_lock.acquire_read() if shared else rw_lock.acquire_write(),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"Could not acquire lock for {lock_file} within {timeout} seconds"
+                )
+            try:
+                fd = await self._os_lock(lock_file, shared, timeout)
+                try:
+                    yield
+                finally:
+                    self._os_unlock(fd)
+            finally:
+                if shared:
+                    await rw_lock.release_read()
+                else:
+                    await rw_lock.release_write()
+        finally:
+            self._put_lock(lock_file)
+
+    async def _os_lock(
+        self, lock_file: str, shared: bool, timeout: Optional[float]
+    ) -> Optional[int]:
+        if fcntl is None:
+            return None
+
+        mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        while True:
+            fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # fd 는 _wait_flock 이 책임지고 정리한다.
+                await self._wait_flock(fd, mode, lock_file, timeout)
+            except BaseException:
+                os.close(fd)
+                raise
+
+            # cleanup_stale_locks 가 파일을 지운 뒤 잡은 lock 이면 다시 시도
+            if self._is_current(fd, lock_file):
+                return fd
+            os.close(fd)
+
+    @staticmethod
+    async def _wait_flock(
+        fd: int, mode: int, lock_file: str, timeout: Optional[float]
+    ):
+        guard = threading.Lock()
+        state = {"acquired": False, "abandoned": False}
+
+        def wait():
+            fcntl.flock(fd, mode)
+            with guard:
+                if state["abandoned"]:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
+                    return
+                state["acquired"] = True
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(LOCK_WAIT_EXECUTOR, wait)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except BaseException as e:
+            with guard:
+                if state["acquired"]:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
+                else:
+                    # 아직 대기 중인 thread 가 lock 을 잡는 즉시 풀고 fd 를 닫는다.
+                    state["abandoned"] = True
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError(
+                    f"Could not acquire lock for {lock_file} within {timeout} seconds"
+                )
+            raise
+
+    @staticmethod
+    def _is_current(fd: int, lock_file: str) -> bool:
+        try:
+            return os.fstat(fd).st_ino == os.stat(lock_file).st_ino
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _os_unlock(fd: Optional[int]):
+        if fd is None:
+            return
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @staticmethod
+    def cleanup_stale_locks(directory: str) -> int:
+        """
+        Remove lock files nobody holds, e.g. left over by crashed processes or the
+        old polling lock. Returns the number of removed files.
+        """
+        removed = 0
+        for lock_file in glob.glob(os.path.join(directory, "*.lock")):
+            if fcntl is None:
+                break
+            try:
+                fd = os.open(lock_file, os.O_RDWR)
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            try:
+                if FileLockRegistry._is_current(fd, lock_file):
+                    os.remove(lock_file)
+                    removed += 1
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+        if removed:
+            logger.info(f"Removed {removed} stale lock files in {directory}")
+        return removed
+
+
+file_lock_registry = FileLockRegistry()
 
 
 class AsyncFileLock:
-    def __init__(self, lock_file: str):
+    def __init__(
+        self,
+        lock_file: str,
+        shared: bool = False,
+        timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT,
+    ):
         self.lock_file = lock_file
-        self._lock = asyncio.Lock()
+        self.shared = shared
+        self.timeout = timeout
 
     @asynccontextmanager
     async def acquire(self):
-        max_attempts = 10
-        for attempt in range(max_attempts):
-            async with self._lock:
-                if not os.path.exists(self.lock_file):
-                    async with aiofiles.open(self.lock_file, "w") as f:
-                        await f.write("lock")
-                    try:
-                        yield
-                    finally:
-                        os.remove(self.lock_file)
-                    return
-            await asyncio.sleep(0.5)  # 대기 시간을 늘립니다
-        raise TimeoutError(
-            f"Could not acquire lock for {self.lock_file} after {max_attempts} attempts"
-        )
+        async with file_lock_registry.acquire(
+            self.lock_file, shared=self.shared, timeout=self.timeout
+        ):
+            yield
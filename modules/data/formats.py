@@ -0,0 +1,197 @@
+import pandas as pd
+from io import BytesIO
+from typing import Optional
+from modules.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow 이 없으면 pandas parser 만 사용
+    pa = None
+    pa_csv = None
+
+
+logger = get_logger(__name__)
+
+FILE_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "feather": "application/vnd.apache.arrow.file",
+}
+
+# csv 는 압축하지 않고, columnar 포맷은 chunk 단위로 압축한다.
+DEFAULT_COMPRESSION = {
+    "csv": None,
+    "parquet": "zstd",
+    "feather": "zstd",
+}
+
+INDEX_NAME = "date"
+
+# csv chunk 의 OHLCV 컬럼 타입. 그 외 컬럼은 parser 가 추론한다.
+CSV_DTYPES = {
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "int64",
+}
+
+
+def validate_file_format(file_format: str) -> str:
+    if file_format not in FILE_FORMATS:
+        raise ValueError(
+            f"Unsupported file format: {file_format}. "
+            f"Choose one of {list(FILE_FORMATS)}"
+        )
+    return file_format
+
+
+def file_extension(file_format: str) -> str:
+    return FILE_FORMATS[validate_file_format(file_format)]
+
+
+def format_from_path(file_path: str) -> Optional[str]:
+    for file_format, extension in FILE_FORMATS.items():
+        if file_path.endswith(extension):
+            return file_format
+    return None
+
+
+def normalize_index(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make sure the frame is indexed by a tz-aware (UTC) DatetimeIndex named "date"
+    """
+    if df.empty:
+        return df
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        logger.warning("Index is not DatetimeIndex, attempting to convert")
+        df.index = pd.to_datetime(df.index, errors="coerce")
+
+    df = df[~df.index.isna()]
+
+    if df.index.tz is None:
+        df.index = df.index.tz_localize("UTC")
+    else:
+        df.index = df.index.tz_convert("UTC")
+
+    df.index.name = INDEX_NAME
+    return df
+
+
+def _decode_csv_arrow(content: bytes) -> Optional[pd.DataFrame]:
+    """
+    pyarrow csv reader on the raw bytes with declared column types. The
+    timestamp column is parsed once, straight into UTC.
+    None if the chunk does not fit (naive timestamps, non-integer volume, ...).
+    """
+    if pa_csv is None:
+        return None
+    column_types = {INDEX_NAME: pa.timestamp("ns", tz="UTC")}
+    for column, dtype in CSV_DTYPES.items():
+        column_types[column] = pa.from_numpy_dtype(dtype)
+    try:
+        table = pa_csv.read_csv(
+            pa.BufferReader(content),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types),
+        )
+    except pa.ArrowInvalid:
+        return None
+    if INDEX_NAME not in table.column_names:
+        return None
+    return table.to_pandas().set_index(INDEX_NAME)
+
+
+def _decode_csv_pandas(content: bytes) -> pd.DataFrame:
+    try:
+        df = pd.read_csv(BytesIO(content), dtype=CSV_DTYPES)
+    except ValueError:
+        # 선언한 타입과 맞지 않는 컬럼이 있으면 추론에 맡긴다.
+        df = pd.read_csv(BytesIO(content))
+
+    if INDEX_NAME not in df.columns:
+        logger.error("No 'date' column found in the CSV file")
+        return pd.DataFrame()
+
+    # timestamp 는 한 번만 parsing (offset 이 없는 값은 UTC 로 간주)
+    df[INDEX_NAME] = pd.to_datetime(
+        df[INDEX_NAME], format="ISO8601", utc=True, errors="coerce"
+    )
+    return df.set_index(INDEX_NAME)
+
+
+def _decode_csv(content: bytes) -> pd.DataFrame:
+    df = _decode_csv_arrow(content)
+    if df is None:
+        df = _decode_csv_pandas(content)
+    return df
+
+
+def _decode_parquet(content: bytes) -> pd.DataFrame:
+    df = pd.read_parquet(BytesIO(content), engine="pyarrow")
+    if INDEX_NAME in df.columns:
+        df = df.set_index(INDEX_NAME)
+    return df
+
+
+def _decode_feather(content: bytes) -> pd.DataFrame:
+    df = pd.read_feather(BytesIO(content))
+    if INDEX_NAME not in df.columns:
+        logger.error("No 'date' column found in the Feather file")
+        return pd.DataFrame()
+    return df.set_index(INDEX_NAME)
+
+
+def decode_chunk(content: bytes, file_format: str) -> pd.DataFrame:
+    """
+    bytes -> DataFrame (UTC DatetimeIndex)
+    """
+    if not content:
+        return pd.DataFrame()
+
+    if file_format == "csv":
+        df = _decode_csv(content)
+    elif file_format == "parquet":
+        df = _decode_parquet(content)
+    elif file_format == "feather":
+        df = _decode_feather(content)
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    if df.empty:
+        return pd.DataFrame()
+
+    return normalize_index(df)
+
+
+def encode_chunk(
+    data: pd.DataFrame,
+    file_format: str,
+    compression: Optional[str] = None,
+    header: bool = True,
+) -> bytes:
+    """
+    DataFrame -> bytes
+    header 는 csv 에만 적용된다. (append 시 header 없이 쓰기 위해 사용)
+    """
+    data = data.copy()
+    data.index.name = INDEX_NAME
+
+    if file_format == "csv":
+        return data.to_csv(index=True, header=header).encode("utf-8")
+
+    buffer = BytesIO()
+    if file_format == "parquet":
+        data.to_parquet(buffer, engine="pyarrow", compression=compression, index=True)
+    elif file_format == "feather":
+        data.reset_index().to_feather(buffer, compression=compression)
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+    return buffer.getvalue()
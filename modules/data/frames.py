@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# compact 모드에서 columns 를 지정하지 않으면 남기는 컬럼 (dividends, stock_splits 등은 제외)
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# float32 로 내려도 되는 최대 상대 오차
+FLOAT32_RTOL = 1e-6
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def frame_memory(data: pd.DataFrame) -> int:
+    return int(data.memory_usage(index=True, deep=True).sum())
+
+
+def downcast_column(series: pd.Series) -> pd.Series:
+    """
+    int64 -> int32 and float64 -> float32 (or int32 for whole numbers without
+    NaN) when every value survives the round trip. Other columns stay as they are.
+    """
+    values = series.to_numpy()
+    if series.dtype.kind in "iu":
+        if len(values) and INT32_MIN <= values.min() and values.max() <= INT32_MAX:
+            return series.astype(np.int32)
+        return series
+
+    if series.dtype.kind != "f":
+        return series
+
+    finite = values[np.isfinite(values)]
+    if len(finite) == len(values) and len(values):
+        if (
+            np.array_equal(finite, np.round(finite))
+            and INT32_MIN <= finite.min()
+            and finite.max() <= INT32_MAX
+        ):
+            return series.astype(np.int32)
+
+    with np.errstate(over="ignore"):
+        narrowed = values.astype(np.float32)
+    if np.allclose(
+        narrowed.astype(np.float64), values, rtol=FLOAT32_RTOL, atol=0, equal_nan=True
+    ):
+        return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def epoch_index(index: pd.Index) -> pd.Index:
+    """
+    Timestamps as int64 UTC epoch nanoseconds
+    """
+    if not isinstance(index, pd.DatetimeIndex):
+        # tz 가 섞여 object 가 된 index 도 UTC 로 맞춘다.
+        index = pd.DatetimeIndex(pd.to_datetime(index, utc=True))
+    elif index.tz is None:
+        index = index.tz_localize("UTC")
+    return pd.Index(index.asi8, dtype=np.int64, name=index.name)
+
+
+def to_datetime_index(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Undo epoch_index(): UTC DatetimeIndex again
+    """
+    if data.index.dtype.kind != "i":
+        return data
+    data = data.copy()
+    data.index = pd.DatetimeIndex(
+        pd.to_datetime(data.index.to_numpy(), utc=True), name=data.index.name
+    )
+    return data
+
+
+def compact_frame(
+    data: pd.DataFrame, columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Memory lean copy of a loaded frame: projected to columns (OHLCV by
+    default), numbers downcast where safe, int64 epoch-ns index.
+    The saved memory is reported in frame.attrs["memory"].
+    """
+    if data.empty:
+        return data
+
+    before = frame_memory(data)
+    if columns is None:
+        columns = [c for c in OHLCV_COLUMNS if c in data.columns] or list(data.columns)
+    compacted = pd.DataFrame(
+        {c: downcast_column(data[c]).to_numpy() for c in columns if c in data.columns},
+        index=epoch_index(data.index),
+    )
+
+    after = frame_memory(compacted)
+    compacted.attrs["memory"] = memory_report(before, after)
+    return compacted
+
+
+def memory_report(before: int, after: int) -> Dict[str, Any]:
+    return {
+        "bytes_before": before,
+        "bytes_after": after,
+        "bytes_saved": before - after,
+        "ratio": round(after / before, 3) if before else 1.0,
+    }
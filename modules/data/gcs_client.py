@@ -0,0 +1,291 @@
+import os
+import zlib
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from modules.logger import get_logger
+
+try:
+    import httpx
+except ImportError:  # storage_type="gcs" 를 쓸 때만 필요
+    httpx = None
+
+
+logger = get_logger(__name__)
+
+GCS_HOST = "https://storage.googleapis.com"
+# fake-gcs-server 등 local 대역 (google-cloud-storage 와 같은 환경 변수)
+EMULATOR_ENV = "STORAGE_EMULATOR_HOST"
+GCS_SCOPES = ["https://www.googleapis.com/auth/devstorage.read_write"]
+
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_TIMEOUT = 60.0
+LIST_PAGE_SIZE = 1000
+# upload 본문을 이 크기 단위로 나누어 (압축하며) 보낸다.
+UPLOAD_PIECE_BYTES = 1024 * 1024
+
+# GCS 가 알아서 풀어 주는 (decompressive transcoding) gzip 으로 올릴 content type
+GZIP_CONTENT_TYPES = ("text/csv", "application/json")
+
+
+class PreconditionFailedError(RuntimeError):
+    """
+    The object generation did not match the precondition of a write
+    """
+
+
+def _gcs_host() -> str:
+    host = os.environ.get(EMULATOR_ENV)
+    if not host:
+        return GCS_HOST
+    if "://" not in host:
+        host = f"http://{host}"
+    return host.rstrip("/")
+
+
+class AsyncGCSClient:
+    """
+    Minimal GCS JSON API client on httpx. Requests of every pipeline of the
+    process share one connection pool per event loop instead of occupying a
+    thread each. Talks to STORAGE_EMULATOR_HOST without auth when it is set.
+    """
+
+    def __init__(
+        self,
+        bucket_name: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        if httpx is None:
+            raise ImportError("httpx is required for GCS storage")
+        self.bucket_name = bucket_name
+        self.host = _gcs_host()
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._bucket_url = f"{self.host}/storage/v1/b/{quote(bucket_name, safe='')}"
+        self._upload_url = (
+            f"{self.host}/upload/storage/v1/b/{quote(bucket_name, safe='')}/o"
+        )
+
+        self.credentials = None
+        if self.host == GCS_HOST:
+            import google.auth
+
+            self.credentials, _ = google.auth.default(scopes=GCS_SCOPES)
+        self._credentials_lock = threading.Lock()
+        # httpx.AsyncClient 는 만든 event loop 에서만 쓸 수 있다. (*_sync 는 매번 새 loop)
+        self._clients: "weakref.WeakKeyDictionary[Any, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _http(self) -> "httpx.AsyncClient":
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.timeout,
+            )
+            self._clients[loop] = client
+        return client
+
+    def _refresh_credentials(self):
+        with self._credentials_lock:
+            if not self.credentials.valid:
+                from google.auth.transport.requests import Request
+
+                self.credentials.refresh(Request())
+
+    async def _headers(self) -> Dict[str, str]:
+        if self.credentials is None:
+            return {}
+        if not self.credentials.valid:
+            await asyncio.to_thread(self._refresh_credentials)
+        return {"Authorization": f"Bearer {self.credentials.token}"}
+
+    async def _request(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        headers = {**await self._headers(), **kwargs.pop("headers", {})}
+        return await self._http().request(method, url, headers=headers, **kwargs)
+
+    def _object_url(self, name: str) -> str:
+        return f"{self._bucket_url}/o/{quote(name, safe='')}"
+
+    async def get_metadata(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Object resource (name, generation, size, ...), None if it does not exist
+        """
+        response = await self._request("GET", self._object_url(name))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def download(
+        self, name: str, generation: Optional[str] = None
+    ) -> Optional[bytes]:
+        """
+        Object content in one request, None if it does not exist.
+        gzip stored objects arrive compressed and are inflated by httpx.
+        """
+        response = await self._get_media(name, generation)
+        return response.content if response is not None else None
+
+    async def download_with_generation(
+        self, name: str
+    ) -> Optional[Tuple[bytes, str]]:
+        """
+        Current object content together with the generation it was served
+        at, in one request. None if it does not exist.
+        """
+        response = await self._get_media(name)
+        if response is None:
+            return None
+        generation = response.headers.get("x-goog-generation")
+        if generation is not None:
+            return response.content, generation
+        # header 를 주지 않는 emulator 는 metadata 의 generation 으로 고정해서 받는다.
+        while True:
+            metadata = await self.get_metadata(name)
+            if metadata is None:
+                return None
+            generation = str(metadata["generation"])
+            response = await self._get_media(name, generation)
+            if response is not None:
+                return response.content, generation
+
+    async def _get_media(
+        self, name: str, generation: Optional[str] = None
+    ) -> Optional["httpx.Response"]:
+        params = {"alt": "media"}
+        if generation is not None:
+            params["generation"] = str(generation)
+        response = await self._request("GET", self._object_url(name), params=params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response
+
+    async def upload(
+        self,
+        name: str,
+        content: bytes,
+        content_type: str,
+        content_encoding: Optional[str] = None,
+        if_generation_match: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Replace the object with content, streamed in pieces. content_encoding
+        "gzip" compresses the pieces on the way and stores the object gzipped.
+        With if_generation_match the write only happens if the object is still
+        at that generation (0: does not exist yet), else PreconditionFailedError.
+        Returns the new object resource.
+        """
+        params = {"uploadType": "media", "name": name}
+        if content_encoding is not None:
+            params["contentEncoding"] = content_encoding
+        if if_generation_match is not None:
+            params["ifGenerationMatch"] = str(if_generation_match)
+        response = await self._request(
+            "POST",
+            self._upload_url,
+            params=params,
+            headers={"Content-Type": content_type},
+            content=self._pieces(content, content_encoding),
+        )
+        if response.status_code == 412:
+            raise PreconditionFailedError(
+                f"{name} is not at generation {if_generation_match}"
+            )
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    async def _pieces(
+        content: bytes, content_encoding: Optional[str]
+    ) -> AsyncIterator[bytes]:
+        view = memoryview(content)
+        compressor = None
+        if content_encoding == "gzip":
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip header
+        for start in range(0, len(view), UPLOAD_PIECE_BYTES):
+            piece = bytes(view[start : start + UPLOAD_PIECE_BYTES])
+            if compressor is not None:
+                piece = compressor.compress(piece)
+            if piece:
+                yield piece
+        if compressor is not None:
+            yield compressor.flush()
+
+    async def delete(self, name: str) -> bool:
+        """
+        False if the object did not exist
+        """
+        response = await self._request("DELETE", self._object_url(name))
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def list_objects(self, prefix: str) -> List[Dict[str, Any]]:
+        """
+        Every object below prefix with its generation, one request per
+        LIST_PAGE_SIZE objects
+        """
+        objects: List[Dict[str, Any]] = []
+        params = {
+            "prefix": prefix,
+            "maxResults": str(LIST_PAGE_SIZE),
+            "fields": "items(name,generation,size),nextPageToken",
+        }
+        while True:
+            response = await self._request(
+                "GET", f"{self._bucket_url}/o", params=params
+            )
+            response.raise_for_status()
+            page = response.json()
+            objects.extend(page.get("items", []))
+            token = page.get("nextPageToken")
+            if not token:
+                return objects
+            params["pageToken"] = token
+
+    async def aclose(self):
+        """
+        Close the connection pool of the running event loop
+        """
+        try:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        except RuntimeError:
+            client = None
+        if client is not None:
+            await client.aclose()
+
+
+_clients: Dict[str, AsyncGCSClient] = {}
+_clients_lock = threading.Lock()
+
+
+def shared_gcs_client(bucket_name: str) -> AsyncGCSClient:
+    """
+    One client (and connection pool) per bucket in the process
+    """
+    with _clients_lock:
+        client = _clients.get(bucket_name)
+        if client is None:
+            client = AsyncGCSClient(bucket_name)
+            _clients[bucket_name] = client
+        return client
+
+
+async def close_gcs_clients():
+    with _clients_lock:
+        clients = list(_clients.values())
+    for client in clients:
+        await client.aclose()
+    if clients:
+        logger.info("GCS clients closed")
@@ -0,0 +1,259 @@
+import json
+import re
+import zlib
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+MANIFEST_FILE = "_manifest.json"
+MANIFEST_VERSION = 1
+
+# chunk3.csv (legacy), chunk3.g12.parquet, chunk3.g12.delta0.parquet
+# (time partitions: 2024/01.g12.parquet, 2024/01.g12.delta0.parquet)
+CHUNK_FILE_PATTERN = re.compile(r"^chunk(\d+)(?:\.g\d+)?\.\w+$")
+DELTA_FILE_PATTERN = re.compile(r"\.delta(\d+)\.\w+$")
+GENERATION_PATTERN = re.compile(r"\.g(\d+)\.")
+
+
+class StaleManifestError(FileNotFoundError):
+    """
+    A file referenced by the manifest snapshot was replaced by a newer write
+    """
+
+
+def chunk_number_from_name(file_name: str) -> Optional[int]:
+    match = CHUNK_FILE_PATTERN.match(file_name)
+    return int(match.group(1)) if match else None
+
+
+def delta_number_from_name(file_name: str) -> int:
+    match = DELTA_FILE_PATTERN.search(file_name)
+    return int(match.group(1)) if match else -1
+
+
+def generation_from_name(file_name: str) -> Optional[int]:
+    """
+    Manifest generation a file was written for, None for legacy names
+    """
+    match = GENERATION_PATTERN.search(file_name)
+    return int(match.group(1)) if match else None
+
+
+def checksum(content: bytes, previous: Optional[str] = None) -> str:
+    """
+    crc32 checksum. previous 를 넘기면 이어서 계산한다. (append 용)
+    """
+    value = int(previous, 16) if previous else 0
+    return f"{zlib.crc32(content, value) & 0xFFFFFFFF:08x}"
+
+
+def _to_iso(ts: Optional[pd.Timestamp]) -> Optional[str]:
+    return ts.isoformat() if ts is not None and not pd.isna(ts) else None
+
+
+def _to_timestamp(value: Optional[str]) -> Optional[pd.Timestamp]:
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class ChunkManifest:
+    """
+    Per symbol directory catalog of chunk files.
+
+    {
+        "version": 1,
+        "generation": 12,
+        "partition": null,
+        "chunks": {
+            "0": {"file": "chunk0.csv", "rows": 10000, "min": "...", "max": "...",
+                  "bytes": 812345, "checksum": "1a2b3c4d"},
+            "1": {"file": "chunk1.parquet", "rows": 120, ...,
+                  "deltas": [{"file": "chunk1.delta0.parquet", "rows": 1, ...}]},
+            ...
+        }
+    }
+
+    rows/min/max of a chunk entry include its (not yet compacted) delta objects.
+    With a time partition ("year", "month", "day") the chunk numbers are the
+    partition keys (2024, 202401, 20240105) instead of sequential ids.
+    """
+
+    def __init__(
+        self,
+        chunks: Optional[Dict[int, Dict[str, Any]]] = None,
+        generation: int = 0,
+        partition: Optional[str] = None,
+    ):
+        self.chunks: Dict[int, Dict[str, Any]] = chunks or {}
+        self.generation = generation
+        self.partition = partition
+        # 이번 변경으로 더 이상 참조되지 않는 파일. manifest 교체 후에 삭제한다.
+        self.garbage: List[str] = []
+        # 이번 변경에서 새로 쓴 파일. manifest 교체에 실패하면 삭제한다.
+        self.written: List[str] = []
+        # 읽어 온 manifest object 의 version (GCS generation). 저장되지 않는다.
+        self.object_version: Optional[str] = None
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> "ChunkManifest":
+        raw = json.loads(content.decode("utf-8"))
+        chunks = {int(k): v for k, v in raw.get("chunks", {}).items()}
+        return cls(
+            chunks=chunks,
+            generation=raw.get("generation", 0),
+            partition=raw.get("partition"),
+        )
+
+    def to_bytes(self) -> bytes:
+        raw = {
+            "version": MANIFEST_VERSION,
+            "generation": self.generation,
+            "partition": self.partition,
+            "chunks": {str(k): self.chunks[k] for k in sorted(self.chunks)},
+        }
+        return json.dumps(raw, indent=2).encode("utf-8")
+
+    @staticmethod
+    def describe(file_name: str, data: pd.DataFrame, content: bytes) -> Dict[str, Any]:
+        return {
+            "file": file_name,
+            "rows": len(data),
+            "min": _to_iso(data.index.min()) if not data.empty else None,
+            "max": _to_iso(data.index.max()) if not data.empty else None,
+            "bytes": len(content),
+            "checksum": checksum(content),
+        }
+
+    def update(self, chunk_num: int, entry: Dict[str, Any]):
+        self.chunks[chunk_num] = entry
+
+    def extend(self, chunk_num: int, data: pd.DataFrame, content: bytes):
+        """
+        Update an entry after rows were appended to the end of its file
+        """
+        entry = self.chunks[chunk_num]
+        entry["rows"] += len(data)
+        if not data.empty:
+            entry["min"] = entry["min"] or _to_iso(data.index.min())
+            entry["max"] = _to_iso(data.index.max())
+        entry["bytes"] += len(content)
+        entry["checksum"] = checksum(content, entry["checksum"])
+
+    def add_delta(self, chunk_num: int, delta: Dict[str, Any]):
+        entry = self.chunks[chunk_num]
+        entry.setdefault("deltas", []).append(delta)
+        entry["rows"] += delta["rows"]
+        entry["min"] = entry["min"] or delta["min"]
+        entry["max"] = max(filter(None, [entry["max"], delta["max"]]), key=_to_timestamp)
+
+    def deltas(self, chunk_num: int) -> List[Dict[str, Any]]:
+        return self.chunks[chunk_num].get("deltas", [])
+
+    def next_delta_number(self, chunk_num: int) -> int:
+        numbers = [
+            delta_number_from_name(delta["file"]) for delta in self.deltas(chunk_num)
+        ]
+        return max(numbers) + 1 if numbers else 0
+
+    def remove(self, chunk_num: int) -> Optional[Dict[str, Any]]:
+        return self.chunks.pop(chunk_num, None)
+
+    def retire(self, entry: Optional[Dict[str, Any]], keep: Optional[str] = None):
+        """
+        Schedule the files of a replaced/removed entry for deletion
+        """
+        if entry is None:
+            return
+        files = [entry["file"]] + [delta["file"] for delta in entry.get("deltas", [])]
+        self.garbage.extend(f for f in files if f != keep)
+
+    def referenced_files(self) -> List[str]:
+        files = []
+        for entry in self.chunks.values():
+            files.append(entry["file"])
+            files.extend(delta["file"] for delta in entry.get("deltas", []))
+        return files
+
+    def take_garbage(self) -> List[str]:
+        referenced = set(self.referenced_files())
+        garbage = [f for f in dict.fromkeys(self.garbage) if f not in referenced]
+        self.garbage = []
+        return garbage
+
+    def stored_bytes(self, chunk_num: int) -> int:
+        """
+        Size of the chunk file plus its delta objects
+        """
+        entry = self.chunks[chunk_num]
+        return entry["bytes"] + sum(delta["bytes"] for delta in entry.get("deltas", []))
+
+    def find(self, file_name: str) -> Optional[int]:
+        for chunk_num, entry in self.chunks.items():
+            if entry["file"] == file_name:
+                return chunk_num
+        return None
+
+    def entry(self, chunk_num: int) -> Optional[Dict[str, Any]]:
+        return self.chunks.get(chunk_num)
+
+    def chunk_numbers(self) -> List[int]:
+        """
+        Chunk numbers in time order. Numbers are ids, a chunk split by a merge
+        gets the next free number even though it sits between older chunks.
+        """
+
+        def sort_key(chunk_num: int):
+            chunk_min = self.min_timestamp(chunk_num)
+            return (chunk_min is None, chunk_min or pd.Timestamp.min, chunk_num)
+
+        return sorted(self.chunks, key=sort_key)
+
+    def last_chunk_number(self) -> int:
+        return self.chunk_numbers()[-1] if self.chunks else 0
+
+    def next_chunk_number(self) -> int:
+        return max(self.chunks) + 1 if self.chunks else 0
+
+    def is_empty(self) -> bool:
+        return not self.chunks
+
+    def total_rows(self) -> int:
+        return sum(entry["rows"] for entry in self.chunks.values())
+
+    def min_timestamp(self, chunk_num: int) -> Optional[pd.Timestamp]:
+        return _to_timestamp(self.chunks[chunk_num]["min"])
+
+    def max_timestamp(self, chunk_num: int) -> Optional[pd.Timestamp]:
+        return _to_timestamp(self.chunks[chunk_num]["max"])
+
+    def latest_timestamp(self) -> Optional[pd.Timestamp]:
+        latest = [self.max_timestamp(n) for n in self.chunks]
+        latest = [ts for ts in latest if ts is not None]
+        return max(latest) if latest else None
+
+    def overlapping(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[int]:
+        """
+        Chunk numbers whose [min, max] range overlaps [start, end]
+        """
+        start_ts = _to_timestamp(start) if start is not None else None
+        end_ts = _to_timestamp(end) if end is not None else None
+
+        selected = []
+        for chunk_num in self.chunk_numbers():
+            chunk_min = self.min_timestamp(chunk_num)
+            chunk_max = self.max_timestamp(chunk_num)
+            if chunk_min is None or chunk_max is None:
+                continue
+            if start_ts is not None and chunk_max < start_ts:
+                continue
+            if end_ts is not None and chunk_min > end_ts:
+                continue
+            selected.append(chunk_num)
+        return selected
@@ -0,0 +1,490 @@
+import re
+import numpy as np
+import pandas as pd
+import pytz
+from abc import ABCMeta, abstractmethod
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Set, Tuple, Union
+from pandas.tseries.holiday import (
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from modules.logger import get_logger
+
+try:
+    import holidays as public_holidays
+except ImportError:  # 없으면 KRX_HOLIDAYS 에 있는 해만 알 수 있다.
+    public_holidays = None
+
+
+logger = get_logger(__name__)
+
+INTERVAL_UNITS = {
+    "m": 60,
+    "min": 60,
+    "h": 3600,
+    "d": 86400,
+}
+
+DateLike = Union[date, datetime, pd.Timestamp, str]
+
+
+def interval_seconds(interval: str) -> Optional[int]:
+    """
+    "1m", "5m", "1h", "1d", "1D" -> bar length in seconds, None if unknown
+    """
+    match = re.fullmatch(r"(\d+)\s*([a-zA-Z]+)", str(interval).strip())
+    if match is None:
+        return None
+    unit = INTERVAL_UNITS.get(match.group(2).lower())
+    return int(match.group(1)) * unit if unit else None
+
+
+def _to_day(value: DateLike) -> date:
+    return pd.Timestamp(value).date()
+
+
+def _clock(value: time) -> pd.Timedelta:
+    return pd.Timedelta(hours=value.hour, minutes=value.minute, seconds=value.second)
+
+
+class ExchangeCalendar(metaclass=ABCMeta):
+    """
+    Trading sessions of one exchange: weekdays without holidays, regular
+    hours with per-day exceptions (half-days, late opens) and the extended
+    hours used when fetching with prepost.
+    Array helpers work on whole DatetimeIndexes, scalar ones call them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timezone: str,
+        open_time: time,
+        close_time: time,
+        pre_open: time,
+        post_close: time,
+    ):
+        self.name = name
+        self.timezone = pytz.timezone(timezone)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.pre_open = pre_open
+        self.post_close = post_close
+        self._holidays: Dict[int, Set[date]] = {}
+        self._special_hours: Dict[int, Dict[date, Tuple[time, time]]] = {}
+
+    @abstractmethod
+    def _holidays_of(self, year: int) -> Set[date]:
+        """
+        Weekdays of year the exchange is closed
+        """
+
+    def _special_hours_of(self, year: int) -> Dict[date, Tuple[time, time]]:
+        """
+        (open, close) of sessions that differ from the regular hours
+        """
+        return {}
+
+    def holidays(self, year: int) -> Set[date]:
+        if year not in self._holidays:
+            self._holidays[year] = self._holidays_of(year)
+        return self._holidays[year]
+
+    def special_hours(self, year: int) -> Dict[date, Tuple[time, time]]:
+        if year not in self._special_hours:
+            self._special_hours[year] = self._special_hours_of(year)
+        return self._special_hours[year]
+
+    def is_session(self, day: DateLike) -> bool:
+        day = _to_day(day)
+        return day.weekday() < 5 and day not in self.holidays(day.year)
+
+    def sessions(self, start: DateLike, end: DateLike) -> pd.DatetimeIndex:
+        """
+        Session dates in [start, end] as naive midnight timestamps
+        """
+        start, end = _to_day(start), _to_day(end)
+        days = pd.bdate_range(start, end)
+        closed = set()
+        for year in range(start.year, end.year + 1):
+            closed |= self.holidays(year)
+        return days[~days.isin(pd.DatetimeIndex(sorted(closed)))]
+
+    def schedule(
+        self, start: DateLike, end: DateLike, prepost: bool = False
+    ) -> pd.DataFrame:
+        """
+        open / close (UTC) of every session in [start, end], indexed by date.
+        With prepost the extended hours are used.
+        """
+        days = self.sessions(start, end)
+        open_time = self.pre_open if prepost else self.open_time
+        close_time = self.post_close if prepost else self.close_time
+        opens = pd.Series(_clock(open_time), days)
+        closes = pd.Series(_clock(close_time), days)
+        if not prepost:
+            for year in range(_to_day(start).year, _to_day(end).year + 1):
+                for day, (open_time, close_time) in self.special_hours(year).items():
+                    day = pd.Timestamp(day)
+                    if day in opens.index:
+                        opens[day] = _clock(open_time)
+                        closes[day] = _clock(close_time)
+        return pd.DataFrame(
+            {
+                "open": self._localize(days + pd.TimedeltaIndex(opens.to_numpy())),
+                "close": self._localize(days + pd.TimedeltaIndex(closes.to_numpy())),
+            },
+            index=days,
+        )
+
+    def _localize(self, local: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        return local.tz_localize(self.timezone).tz_convert("UTC")
+
+    def local_dates(self, index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """
+        Session date (exchange local) of each UTC timestamp, naive midnight
+        """
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        return index.tz_convert(self.timezone).normalize().tz_localize(None)
+
+    def session_window(
+        self, day: DateLike, prepost: bool = False
+    ) -> Optional[Tuple[datetime, datetime]]:
+        """
+        (open, close) of day in the exchange time zone, None if it is no session
+        """
+        schedule = self.schedule(day, day, prepost)
+        if schedule.empty:
+            return None
+        row = schedule.iloc[0]
+        return (
+            row["open"].tz_convert(self.timezone).to_pydatetime(),
+            row["close"].tz_convert(self.timezone).to_pydatetime(),
+        )
+
+    def is_open(self, index: pd.DatetimeIndex, prepost: bool = False) -> np.ndarray:
+        """
+        Whether each timestamp falls inside a session (open and close included)
+        """
+        index = pd.DatetimeIndex(index)
+        if len(index) == 0:
+            return np.zeros(0, dtype=bool)
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        dates = self.local_dates(index)
+        schedule = self.schedule(dates.min(), dates.max(), prepost)
+        # session 이 아닌 날은 NaT (가장 작은 int64) 가 되어 close 비교에서 걸러진다.
+        opens = pd.DatetimeIndex(schedule["open"].reindex(dates)).asi8
+        closes = pd.DatetimeIndex(schedule["close"].reindex(dates)).asi8
+        ts = index.tz_convert("UTC").asi8
+        return (ts >= opens) & (ts <= closes)
+
+    def is_open_at(self, now: Optional[datetime] = None, prepost: bool = False) -> bool:
+        now = now or datetime.now(tz=pytz.UTC)
+        if now.tzinfo is None:
+            now = self.timezone.localize(now)
+        return bool(self.is_open(pd.DatetimeIndex([now]), prepost)[0])
+
+    def _session_days(self, dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        days = pd.DatetimeIndex(dates)
+        if days.tz is not None:
+            days = days.tz_convert(self.timezone).tz_localize(None)
+        return days.normalize()
+
+    def regular_closes(self, dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """
+        Regular close time (UTC) of each date, half-days and late closes ignored
+        """
+        days = self._session_days(dates)
+        if len(days) == 0:
+            return pd.DatetimeIndex([], tz="UTC")
+        return self._localize(days + _clock(self.close_time))
+
+    def session_closes(self, dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """
+        Close (UTC) of the session of each date. Dates that are no session get
+        the regular close time of that day.
+        """
+        days = self._session_days(dates)
+        if len(days) == 0:
+            return pd.DatetimeIndex([], tz="UTC")
+        closes = self.schedule(days.min(), days.max())["close"].reindex(days)
+        closes = pd.DatetimeIndex(closes)
+        return closes.where(closes.notna(), self.regular_closes(days))
+
+    def daily_bar_timestamps(
+        self, dates: pd.DatetimeIndex, now: Optional[datetime] = None
+    ) -> pd.DatetimeIndex:
+        """
+        Timestamps of daily bars: the regular close of each bar's day, except
+        today's bar while the session is still open, which is stamped now.
+        """
+        now = pd.Timestamp(now or datetime.now(tz=pytz.UTC))
+        if now.tzinfo is None:
+            now = now.tz_localize(self.timezone)
+        # 저장된 일봉은 half-day, 수능일에도 정규 마감 시각이므로 그대로 맞춘다.
+        stamps = self.regular_closes(dates)
+        today = pd.Timestamp(now.tz_convert(self.timezone).date())
+        is_today = np.asarray(self._session_days(dates) == today)
+        if is_today.any() and self.is_open_at(now.to_pydatetime()):
+            stamps = stamps.where(~is_today, now.tz_convert("UTC"))
+        return stamps
+
+    def next_open(
+        self, now: Optional[datetime] = None, prepost: bool = False
+    ) -> datetime:
+        return self._next_boundary(now, "open", prepost)
+
+    def next_close(
+        self, now: Optional[datetime] = None, prepost: bool = False
+    ) -> datetime:
+        return self._next_boundary(now, "close", prepost)
+
+    def _next_boundary(
+        self, now: Optional[datetime], column: str, prepost: bool
+    ) -> datetime:
+        now = pd.Timestamp(now or datetime.now(tz=pytz.UTC))
+        if now.tzinfo is None:
+            now = now.tz_localize("UTC")
+        start = now.tz_convert(self.timezone).date()
+        # 연휴가 길어도 한 달 안에는 다음 session 이 있다.
+        boundaries = self.schedule(start, start + timedelta(days=31), prepost)[column]
+        upcoming = boundaries[boundaries > now]
+        if upcoming.empty:
+            raise ValueError(f"No {self.name} session within a month of {now}")
+        return upcoming.iloc[0].to_pydatetime()
+
+
+def _nyse_new_year(day: datetime) -> datetime:
+    # 토요일인 1월 1일은 전날(12월 31일)로 옮기지 않는다.
+    return sunday_to_monday(day)
+
+
+NYSE_RULES = [
+    Holiday("New Years Day", month=1, day=1, observance=_nyse_new_year),
+    USMartinLutherKingJr,
+    USPresidentsDay,
+    GoodFriday,
+    USMemorialDay,
+    Holiday(
+        "Juneteenth",
+        month=6,
+        day=19,
+        start_date="2022-01-01",
+        observance=nearest_workday,
+    ),
+    Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+    USLaborDay,
+    USThanksgivingDay,
+    Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+]
+
+# 규칙으로 정할 수 없는 임시 휴장 (국장, 재해)
+NYSE_SPECIAL_CLOSURES = [
+    date(2012, 10, 29),
+    date(2012, 10, 30),
+    date(2018, 12, 5),
+    date(2025, 1, 9),
+]
+
+
+class NYSECalendar(ExchangeCalendar):
+    """
+    NYSE / NASDAQ. Half-days close at 13:00 ET: July 3rd, the day after
+    Thanksgiving and Christmas Eve.
+    """
+
+    EARLY_CLOSE = time(13, 0)
+
+    def __init__(self):
+        # pre-market 04:00~, after-hours ~20:00
+        super().__init__(
+            "NYSE",
+            "America/New_York",
+            time(9, 30),
+            time(16, 0),
+            pre_open=time(4, 0),
+            post_close=time(20, 0),
+        )
+
+    def _holidays_of(self, year: int) -> Set[date]:
+        start, end = datetime(year, 1, 1), datetime(year, 12, 31)
+        days = {d.date() for rule in NYSE_RULES for d in rule.dates(start, end)}
+        days |= {d for d in NYSE_SPECIAL_CLOSURES if d.year == year}
+        return {d for d in days if d.weekday() < 5}
+
+    def _special_hours_of(self, year: int) -> Dict[date, Tuple[time, time]]:
+        thanksgiving = USThanksgivingDay.dates(
+            datetime(year, 1, 1), datetime(year, 12, 31)
+        )[0].date()
+        candidates = [
+            date(year, 7, 3),
+            thanksgiving + timedelta(days=1),
+            date(year, 12, 24),
+        ]
+        return {
+            day: (self.open_time, self.EARLY_CLOSE)
+            for day in candidates
+            if day.weekday() < 5 and day not in self.holidays(year)
+        }
+
+
+# 매년 같은 날짜의 휴장일 (근로자의 날 포함)
+KRX_FIXED_HOLIDAYS = [
+    (1, 1),
+    (3, 1),
+    (5, 1),
+    (5, 5),
+    (6, 6),
+    (8, 15),
+    (10, 3),
+    (10, 9),
+    (12, 25),
+]
+
+# 설날, 추석, 부처님오신날(음력), 선거일, 대체/임시 공휴일
+# (holidays 패키지가 있으면 그 KR 공휴일과 합친다)
+KRX_HOLIDAYS = {
+    2021: "02-11 02-12 05-19 08-16 09-20 09-21 09-22 10-04 10-11",
+    2022: "01-31 02-01 02-02 03-09 06-01 09-09 09-12 10-10",
+    2023: "01-23 01-24 05-29 09-28 09-29 10-02",
+    2024: "02-09 02-12 04-10 05-06 05-15 09-16 09-17 09-18 10-01",
+    2025: "01-27 01-28 01-29 01-30 03-03 05-06 06-03 10-06 10-07 10-08",
+    2026: "02-16 02-17 02-18 03-02 05-25 06-03 07-17 08-17 09-24 09-25 10-05",
+}
+
+# 수능일: 10:00 개장, 16:30 마감
+KRX_CSAT_DAYS = [
+    date(2021, 11, 18),
+    date(2022, 11, 17),
+    date(2023, 11, 16),
+    date(2024, 11, 14),
+    date(2025, 11, 13),
+    date(2026, 11, 19),
+]
+
+
+class KRXCalendar(ExchangeCalendar):
+    """
+    KOSPI / KOSDAQ. Lunar, substitute and one-off holidays come from the KR
+    calendar of the holidays package together with KRX_HOLIDAYS. Without
+    the package, years outside KRX_HOLIDAYS raise ValueError instead of
+    silently treating lunar holidays as sessions. The first session of a
+    year opens at 10:00, on CSAT day the market opens at 10:00 and closes
+    at 16:30.
+    """
+
+    def __init__(self):
+        # 장전 시간외 08:30~, 장후 시간외 ~18:00
+        super().__init__(
+            "KRX",
+            "Asia/Seoul",
+            time(9, 0),
+            time(15, 30),
+            pre_open=time(8, 30),
+            post_close=time(18, 0),
+        )
+
+    def _holidays_of(self, year: int) -> Set[date]:
+        days = {date(year, month, day) for month, day in KRX_FIXED_HOLIDAYS}
+        if year in KRX_HOLIDAYS:
+            days |= {
+                date(year, int(d[:2]), int(d[3:])) for d in KRX_HOLIDAYS[year].split()
+            }
+        elif public_holidays is None:
+            raise ValueError(
+                f"KRX holidays of {year} are unknown: install the holidays "
+                f"package or add {year} to KRX_HOLIDAYS"
+            )
+        if public_holidays is not None:
+            days |= set(public_holidays.country_holidays("KR", years=year))
+        # 연말 휴장일: 그해 마지막 평일
+        year_end = date(year, 12, 31)
+        while year_end.weekday() >= 5:
+            year_end -= timedelta(days=1)
+        days.add(year_end)
+        return {d for d in days if d.weekday() < 5}
+
+    def _special_hours_of(self, year: int) -> Dict[date, Tuple[time, time]]:
+        hours = {
+            day: (time(10, 0), time(16, 30))
+            for day in KRX_CSAT_DAYS
+            if day.year == year
+        }
+        first = date(year, 1, 1)
+        while first.weekday() >= 5 or first in self.holidays(year):
+            first += timedelta(days=1)
+        hours[first] = (time(10, 0), self.close_time)
+        return hours
+
+
+KRX = KRXCalendar()
+NYSE = NYSECalendar()
+
+CALENDARS = {
+    "KRX": KRX,
+    "KOSPI": KRX,
+    "KOSDAQ": KRX,
+    "NYSE": NYSE,
+    "NASDAQ": NYSE,
+    "AMEX": NYSE,
+    "US": NYSE,
+}
+
+
+def get_calendar(market: Optional[str]) -> Optional[ExchangeCalendar]:
+    """
+    Calendar of a market or exchange name, None if unknown
+    """
+    if not market:
+        return None
+    return CALENDARS.get(str(market).upper())
+
+
+def find_gaps(
+    index: pd.DatetimeIndex,
+    calendar: ExchangeCalendar,
+    interval: str,
+    prepost: bool = False,
+) -> pd.DatetimeIndex:
+    """
+    Bars the calendar expects between the first and last timestamp of index
+    that are missing from it. Intraday bars are labelled by their start;
+    daily bars by their session date, whatever time they are stamped with.
+    """
+    index = pd.DatetimeIndex(index)
+    if len(index) == 0:
+        return pd.DatetimeIndex([], tz="UTC")
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    index = index.tz_convert("UTC")
+
+    bar = interval_seconds(interval)
+    if bar is None:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    local_dates = calendar.local_dates(index)
+    schedule = calendar.schedule(local_dates.min(), local_dates.max(), prepost)
+    if bar >= INTERVAL_UNITS["d"]:
+        missing = schedule.index[~schedule.index.isin(local_dates)]
+        return pd.DatetimeIndex(schedule.loc[missing, "close"])
+
+    # session 마다 open 부터 close 전까지 bar 시작 시각을 한 번에 펼친다.
+    step = bar * 10**9
+    opens = pd.DatetimeIndex(schedule["open"]).asi8
+    closes = pd.DatetimeIndex(schedule["close"]).asi8
+    counts = (closes - opens) // step
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    starts = np.repeat(opens, counts) + (np.arange(counts.sum()) - first) * step
+    expected = pd.to_datetime(starts, utc=True)
+    expected = expected[(expected >= index.min()) & (expected <= index.max())]
+    return expected[~expected.isin(index)]
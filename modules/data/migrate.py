@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+from typing import Optional
+from modules.data.formats import FILE_FORMATS
+from modules.data.utils import CONFIG_KEY_DATA_PIPELINES, create_pipelines, read_config
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+async def migrate_config(
+    config_path: str,
+    file_format: str,
+    source_format: str = "csv",
+    compression: Optional[str] = None,
+    keep_source: bool = False,
+) -> int:
+    """
+    Convert every symbol directory of a pipeline config to the given file format
+    """
+    config = await read_config(config_path)
+    config[CONFIG_KEY_DATA_PIPELINES]["file_format"] = file_format
+    if compression:
+        config[CONFIG_KEY_DATA_PIPELINES]["compression"] = compression
+
+    pipelines = await create_pipelines(config)
+    total = 0
+    try:
+        for pipeline in pipelines:
+            total += await pipeline.migrate_format(
+                source_format=source_format, keep_source=keep_source
+            )
+    finally:
+        await asyncio.gather(
+            *[pipeline.close() for pipeline in pipelines], return_exceptions=True
+        )
+
+    logger.info(f"Migrated {total} chunks for {len(pipelines)} symbols")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate DataPipeline chunk files to another storage format"
+    )
+    parser.add_argument("config", help="data pipeline config (yaml)")
+    parser.add_argument(
+        "--to", dest="file_format", default="parquet", choices=list(FILE_FORMATS)
+    )
+    parser.add_argument(
+        "--from", dest="source_format", default="csv", choices=list(FILE_FORMATS)
+    )
+    parser.add_argument("--compression", default=None)
+    parser.add_argument(
+        "--keep-source", action="store_true", help="keep the original chunk files"
+    )
+    args = parser.parse_args()
+
+    total = asyncio.run(
+        migrate_config(
+            args.config,
+            file_format=args.file_format,
+            source_format=args.source_format,
+            compression=args.compression,
+            keep_source=args.keep_source,
+        )
+    )
+    print(f"{total} chunks migrated to {args.file_format}")
+
+
+if __name__ == "__main__":
+    main()
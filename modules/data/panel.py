@@ -0,0 +1,255 @@
+import asyncio
+import pandas as pd
+from datetime import datetime
+from functools import reduce
+from typing import Dict, Iterable, List, Optional, Tuple
+from modules.data.buffer import DEFAULT_BUFFER_SECONDS
+from modules.data.cache import ChunkCache, shared_chunk_cache
+from modules.data.core import DataPipeline
+from modules.data.disk_cache import DEFAULT_DISK_CACHE_BYTES
+from modules.data.manifest import ChunkManifest
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# symbol 별 디렉토리와 같은 base_path 아래에 만드는 통합 저장소
+PANEL_DIR = "_panel"
+
+# "005930|close" 형태의 컬럼 이름
+COLUMN_SEPARATOR = "|"
+
+
+def panel_column(symbol: str, field: str) -> str:
+    return f"{symbol}{COLUMN_SEPARATOR}{field}"
+
+
+def split_column(column: str) -> Tuple[str, str]:
+    symbol, field = column.rsplit(COLUMN_SEPARATOR, 1)
+    return symbol, field
+
+
+def to_wide(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    {symbol: OHLCV frame} -> one frame indexed by timestamp with "symbol|field" columns
+    """
+    renamed = []
+    for symbol, data in frames.items():
+        if data is None or data.empty:
+            continue
+        data = data[~data.index.duplicated(keep="last")]
+        renamed.append(data.rename(columns=lambda c: panel_column(symbol, c)))
+    if not renamed:
+        return pd.DataFrame()
+    return pd.concat(renamed, axis=1).sort_index()
+
+
+class PanelPipeline(DataPipeline):
+    """
+    Consolidated store of every symbol of one config (market and interval).
+
+    Data is kept wide: one row per timestamp and one "symbol|field" column per
+    series. A cross-sectional read for a date range is therefore a single scan
+    over the chunks of one manifest instead of one directory walk per symbol.
+    Symbol pipelines stage their new rows with write(); rows of different
+    symbols at the same timestamp are combined in the write buffer and
+    persisted together. Rows for timestamps already stored go to delta
+    objects holding only their own columns until the chunk is compacted.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        chunk_size: int = 10000,
+        use_file_lock: bool = True,
+        storage_type: str = "local",
+        bucket_name: Optional[str] = None,
+        file_format: str = "parquet",
+        compression: Optional[str] = None,
+        max_deltas: int = 32,
+        chunk_cache: Optional[ChunkCache] = shared_chunk_cache,
+        max_concurrent_reads: int = 8,
+        partition: Optional[str] = None,
+        write_buffer_rows: int = 1000,
+        write_buffer_seconds: float = DEFAULT_BUFFER_SECONDS,
+        disk_cache_dir: Optional[str] = None,
+        disk_cache_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+        object_compression: Optional[str] = None,
+    ):
+        if file_format == "csv":
+            # 컬럼 구성이 다른 row 를 csv 에 이어 쓸 수 없다.
+            raise ValueError("PanelPipeline needs a columnar file format (parquet/feather)")
+        if storage_type == "sqlite":
+            # sqlite 는 symbol 별 row 가 이미 한 table 에 있으므로 panel 이 필요 없다.
+            raise ValueError("PanelPipeline needs object storage (local/gcs/memory)")
+        super().__init__(
+            data_provider=None,
+            base_path=base_path,
+            chunk_size=chunk_size,
+            use_file_lock=use_file_lock,
+            storage_type=storage_type,
+            bucket_name=bucket_name,
+            file_format=file_format,
+            compression=compression,
+            max_deltas=max_deltas,
+            chunk_cache=chunk_cache,
+            max_concurrent_reads=max_concurrent_reads,
+            partition=partition,
+            write_buffer_rows=write_buffer_rows,
+            write_buffer_seconds=write_buffer_seconds,
+            disk_cache_dir=disk_cache_dir,
+            disk_cache_bytes=disk_cache_bytes,
+            object_compression=object_compression,
+        )
+
+    async def fetch_data(self, **kwargs) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    async def fetch_start(self, **kwargs):
+        pass
+
+    @staticmethod
+    def _merge_rows(existing: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge only the columns of rows into existing. Values of rows win where
+        they are set, columns of other symbols are left as they are.
+        """
+        if existing.empty:
+            return rows.sort_index()
+        if rows.empty:
+            return existing
+        index = existing.index.union(rows.index)
+        merged = existing.reindex(index)
+        incoming = rows.reindex(index)
+        shared = rows.columns.intersection(existing.columns)
+        if len(shared) > 0:
+            merged[shared] = incoming[shared].where(
+                incoming[shared].notna(), merged[shared]
+            )
+        added = rows.columns.difference(existing.columns)
+        if len(added) > 0:
+            merged = pd.concat([merged, incoming[added]], axis=1)
+        return merged
+
+    @staticmethod
+    def _fold_deltas(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        # delta 는 일부 symbol 의 컬럼만 담고 있으므로 row 가 아닌 컬럼 단위로 합친다.
+        return reduce(PanelPipeline._merge_rows, frames)
+
+    async def _merge_into_chunk(
+        self, manifest: ChunkManifest, chunk_num: int, rows: pd.DataFrame
+    ) -> bool:
+        """
+        Store rows for timestamps the chunk already covers as a delta object
+        with only their columns, so the other symbols of the chunk are not
+        rewritten. Rows before the chunk or beyond chunk_size are merged with
+        a rewrite.
+        """
+        existing = await self._read_chunk_entry(manifest, chunk_num)
+        if existing.empty or rows.index.min() < existing.index.min():
+            return await super()._merge_into_chunk(manifest, chunk_num, rows)
+        added = int((~rows.index.isin(existing.index)).sum())
+        room = self.chunk_size - manifest.entry(chunk_num)["rows"]
+        if not self.partition and added > room:
+            return await super()._merge_into_chunk(manifest, chunk_num, rows)
+
+        current = existing.reindex(index=rows.index, columns=rows.columns)
+        if ((current == rows) | rows.isna()).all().all():
+            return False
+
+        await self._merge_as_delta(manifest, chunk_num, rows, existing)
+        return True
+
+    async def _save_new_data(self, new_data: pd.DataFrame):
+        # 다른 symbol 이 이미 같은 timestamp 를 썼을 수 있으므로 항상 merge
+        await self._save_data(new_data)
+
+    async def write(self, symbol: str, data: pd.DataFrame):
+        """
+        Stage new rows of one symbol
+        """
+        await self.buffer_new_data(to_wide({symbol: data}))
+
+    async def save_symbols(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Write the rows of several symbols at once
+        """
+        wide = to_wide(frames)
+        if not wide.empty:
+            await self._save_data(wide)
+
+    async def import_pipelines(
+        self,
+        pipelines: Iterable[DataPipeline],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: int = 50,
+    ) -> int:
+        """
+        Backfill the panel from existing per-symbol directories.
+        Symbols are written batch_size at a time to bound memory.
+        Returns the number of imported symbols.
+        """
+        imported = 0
+        frames: Dict[str, pd.DataFrame] = {}
+        for pipeline in pipelines:
+            data = await pipeline.get_data_range(start_date, end_date)
+            if not data.empty:
+                frames[pipeline.data_provider.symbol] = data
+            if len(frames) >= batch_size:
+                await self.save_symbols(frames)
+                imported += len(frames)
+                frames = {}
+        if frames:
+            await self.save_symbols(frames)
+            imported += len(frames)
+        logger.info(f"Imported {imported} symbols into {self.base_path}")
+        return imported
+
+    async def get_panel(
+        self,
+        symbols: Optional[List[str]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Cross-sectional frame for [start_date, end_date].
+        Columns are a (field, symbol) MultiIndex, so panel["close"] is a
+        timestamp x symbol matrix.
+        """
+        logger.info(f"Getting panel from {start_date} to {end_date}")
+        data = await self._load_date_range(start_date, end_date)
+        data = self._with_buffered(data, start_date, end_date)
+        if data.empty:
+            logger.warning(f"No panel data in the range {start_date} to {end_date}")
+            return pd.DataFrame()
+
+        wanted_symbols = set(symbols) if symbols is not None else None
+        wanted_fields = set(columns) if columns is not None else None
+        selected = []
+        for column in data.columns:
+            symbol, field = split_column(column)
+            if wanted_symbols is not None and symbol not in wanted_symbols:
+                continue
+            if wanted_fields is not None and field not in wanted_fields:
+                continue
+            selected.append((column, (field, symbol)))
+
+        if not selected:
+            return pd.DataFrame()
+
+        panel = data[[column for column, _ in selected]].sort_index()
+        panel.columns = pd.MultiIndex.from_tuples(
+            [key for _, key in selected], names=["field", "symbol"]
+        )
+        return panel.sort_index(axis=1)
+
+    def get_panel_sync(
+        self,
+        symbols: Optional[List[str]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        return asyncio.run(self.get_panel(symbols, start_date, end_date, columns))
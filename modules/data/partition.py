@@ -0,0 +1,150 @@
+import re
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+# partition 단위별 파일 이름 (base_path 기준 상대 경로, 확장자 제외)
+PARTITION_SCHEMES = {
+    "year": "%Y",  # 2024.parquet (일봉)
+    "month": "%Y/%m",  # 2024/01.parquet (분봉)
+    "day": "%Y/%m/%d",  # 2024/01/05.parquet
+}
+
+# 2024, 2024/01, 2024/01/05 (+ .g12 / .g12.delta0 + 확장자)
+PARTITION_FILE_PATTERN = re.compile(
+    r"^(\d{4})(?:/(\d{2}))?(?:/(\d{2}))?(?:\.g(\d+))?(?:\.delta(\d+))?\.\w+$"
+)
+
+
+def validate_partition(partition: Optional[str]) -> Optional[str]:
+    if partition is not None and partition not in PARTITION_SCHEMES:
+        raise ValueError(
+            f"Unsupported partition: {partition}. "
+            f"Choose one of {list(PARTITION_SCHEMES)} or None"
+        )
+    return partition
+
+
+def partition_keys(index: pd.DatetimeIndex, partition: str) -> np.ndarray:
+    """
+    Integer partition key of every timestamp: 2024, 202401 or 20240105.
+    Keys sort in time order, so they are used as chunk numbers in the manifest.
+    """
+    if partition == "year":
+        return np.asarray(index.year, dtype=np.int64)
+    if partition == "month":
+        return np.asarray(index.year * 100 + index.month, dtype=np.int64)
+    if partition == "day":
+        return np.asarray(
+            index.year * 10000 + index.month * 100 + index.day, dtype=np.int64
+        )
+    raise ValueError(f"Unsupported partition: {partition}")
+
+
+def partition_start(key: int, partition: str) -> pd.Timestamp:
+    if partition == "year":
+        return pd.Timestamp(year=key, month=1, day=1, tz="UTC")
+    if partition == "month":
+        return pd.Timestamp(year=key // 100, month=key % 100, day=1, tz="UTC")
+    if partition == "day":
+        return pd.Timestamp(
+            year=key // 10000, month=key // 100 % 100, day=key % 100, tz="UTC"
+        )
+    raise ValueError(f"Unsupported partition: {partition}")
+
+
+def partition_bounds(key: int, partition: str) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    [start, end) of a partition
+    """
+    start = partition_start(key, partition)
+    if partition == "year":
+        end = start + pd.DateOffset(years=1)
+    elif partition == "month":
+        end = start + pd.DateOffset(months=1)
+    else:
+        end = start + pd.DateOffset(days=1)
+    return start, end
+
+
+def partition_name(key: int, partition: str) -> str:
+    return partition_start(key, partition).strftime(PARTITION_SCHEMES[partition])
+
+
+def partition_from_name(
+    file_name: str, partition: str
+) -> Optional[Tuple[int, int, Optional[int]]]:
+    """
+    "2024/01.g12.parquet" -> (202401, 12, None), "2024/01.g13.delta0.parquet" ->
+    (202401, 13, 0). Legacy names without generation give generation 0.
+    None if the name does not belong to the partition scheme.
+    """
+    match = PARTITION_FILE_PATTERN.match(file_name)
+    if match is None:
+        return None
+    year, month, day, generation, delta = match.groups()
+    parts = [part for part in (year, month, day) if part is not None]
+    if len(parts) != len(PARTITION_SCHEMES[partition].split("/")):
+        return None
+    return (
+        int("".join(parts)),
+        int(generation or 0),
+        int(delta) if delta is not None else None,
+    )
+
+
+def partition_prefix(key: int, partition: str) -> Optional[str]:
+    """
+    Directory that holds the partition file ("2024" for month partitions),
+    None for year partitions which live directly under base_path.
+    """
+    name = partition_name(key, partition)
+    return name.rsplit("/", 1)[0] if "/" in name else None
+
+
+def prefix_end(prefix: str) -> pd.Timestamp:
+    """
+    End (exclusive) of the time span covered by a partition directory
+    """
+    parts = [int(p) for p in prefix.split("/")]
+    start = pd.Timestamp(
+        year=parts[0], month=parts[1] if len(parts) > 1 else 1, day=1, tz="UTC"
+    )
+    if len(parts) > 1:
+        return start + pd.DateOffset(months=1)
+    return start + pd.DateOffset(years=1)
+
+
+def expired_prefix(key: int, partition: str, cutoff: pd.Timestamp) -> Optional[str]:
+    """
+    Outermost directory of the partition whose whole time span ends before
+    cutoff, so retention can delete it with one prefix delete.
+    """
+    prefix = partition_prefix(key, partition)
+    if prefix is None:
+        return None
+    parts = prefix.split("/")
+    for depth in range(1, len(parts) + 1):
+        candidate = "/".join(parts[:depth])
+        if prefix_end(candidate) <= cutoff:
+            return candidate
+    return None
+
+
+def partitions_between(
+    start: Optional[datetime], end: Optional[datetime], keys: List[int], partition: str
+) -> List[int]:
+    """
+    Subset of keys whose partition overlaps [start, end]
+    """
+    selected = []
+    for key in sorted(keys):
+        key_start, key_end = partition_bounds(key, partition)
+        if start is not None and key_end <= start:
+            continue
+        if end is not None and key_start > end:
+            continue
+        selected.append(key)
+    return selected
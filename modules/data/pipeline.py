@@ -1,12 +1,19 @@
 import asyncio
 import pandas as pd
 import pytz
-from typing import Optional
+from typing import List, Optional
 from asyncio import Event
 from pandas.tseries.offsets import BDay
 from datetime import datetime, date, timedelta
 from modules.data.core import DataProvider
 from modules.data.core import DataPipeline
+from modules.data.buffer import DEFAULT_BUFFER_SECONDS
+from modules.data.cache import ChunkCache, shared_chunk_cache
+from modules.data.disk_cache import DEFAULT_DISK_CACHE_BYTES
+from modules.data.market_calendar import find_gaps
+from modules.data.panel import PanelPipeline
+from modules.data.scheduler import FetchScheduler, wait_for_stop
+from modules.data.storage import StorageBackend
 from modules.logger import get_logger
 
 
@@ -28,6 +35,22 @@ class ProviderDataPipeline(DataPipeline):
         fetch_interval: int = 60,
         storage_type: str = "local",
         bucket_name: Optional[str] = None,
+        file_format: str = "csv",
+        compression: Optional[str] = None,
+        max_deltas: int = 32,
+        chunk_cache: Optional[ChunkCache] = shared_chunk_cache,
+        max_concurrent_reads: int = 8,
+        partition: Optional[str] = None,
+        write_buffer_rows: int = 0,
+        write_buffer_seconds: float = DEFAULT_BUFFER_SECONDS,
+        panel_store: Optional[PanelPipeline] = None,
+        rollups: Optional[List[str]] = None,
+        storage: Optional[StorageBackend] = None,
+        database_path: Optional[str] = None,
+        disk_cache_dir: Optional[str] = None,
+        disk_cache_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+        object_compression: Optional[str] = None,
+        market_hours: bool = True,  # False 이면 장 시간과 관계없이 fetch_interval 마다
     ):
         super().__init__(
             data_provider=data_provider,
@@ -37,8 +60,33 @@ class ProviderDataPipeline(DataPipeline):
             cache_days=cache_days,
             storage_type=storage_type,
             bucket_name=bucket_name,
+            file_format=file_format,
+            compression=compression,
+            max_deltas=max_deltas,
+            chunk_cache=chunk_cache,
+            max_concurrent_reads=max_concurrent_reads,
+            partition=partition,
+            write_buffer_rows=write_buffer_rows,
+            write_buffer_seconds=write_buffer_seconds,
+            rollups=rollups,
+            storage=storage,
+            database_path=database_path,
+            disk_cache_dir=disk_cache_dir,
+            disk_cache_bytes=disk_cache_bytes,
+            object_compression=object_compression,
         )
         self.fetch_interval = fetch_interval
+        self.scheduler = (
+            FetchScheduler.for_provider(data_provider, fetch_interval)
+            if market_hours
+            else FetchScheduler(None, "", fetch_interval)
+        )
+        self.panel_store = panel_store  # 모든 symbol 을 함께 저장하는 통합 저장소
+
+    async def _after_save(self, new_data: pd.DataFrame):
+        await super()._after_save(new_data)
+        if self.panel_store is not None and not new_data.empty:
+            await self.panel_store.write(self.data_provider.symbol, new_data)
 
     async def fetch_data(self, **kwargs) -> pd.DataFrame:
         if self.data_provider is None:
@@ -76,24 +124,35 @@ class ProviderDataPipeline(DataPipeline):
                         )
                     new_data = await self.fetch_data()
                     if not new_data.empty:
-                        await self._save_new_data(new_data)
+                        await self.buffer_new_data(new_data)
                         updated_latest_datetime = new_data.index.max()
                         logger.info(
                             f"데이터를 {updated_latest_datetime}까지 업데이트 했습니다. {len(new_data)}행이 추가 되었습니다."
                         )
                     else:
                         logger.info("새로운 데이터가 없습니다.")
+                        await self.flush_if_due()
 
                 if single_fetch:
                     logger.info("Single fetch completed, exiting loop")
                     break
 
-                logger.info(
-                    f"Waiting for {self.fetch_interval} seconds before next fetch"
-                )
-                await asyncio.sleep(self.fetch_interval)
+                wait = self.scheduler.seconds_until_next()
+                buffer = self.write_buffer
+                if buffer is not None and wait >= buffer.max_seconds:
+                    # 다음 fetch 까지 오래 쉬는 동안 buffer 의 row 가 묵지 않도록 먼저 저장
+                    await self.flush()
+                logger.info(f"Waiting for {wait:.0f} seconds before next fetch")
+                if await wait_for_stop(stop_event, wait):
+                    break
         except Exception as e:
             logger.error(f"Error in fetch_and_save_realtime: {e}", exc_info=True)
+        finally:
+            # stop_event 로 종료할 때 buffer 에 남은 row 를 저장
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error while flushing write buffer: {e}", exc_info=True)
 
     async def fetch_and_save_increment(self):
         try:
@@ -128,3 +187,34 @@ class ProviderDataPipeline(DataPipeline):
         except Exception as e:
             logger.error(f"Error in fetch_start: {e}", exc_info=True)
             raise
+
+    async def find_gaps(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> pd.DatetimeIndex:
+        """
+        Bars the exchange calendar expects but the stored data is missing
+        (holidays and closed hours are not counted as gaps)
+        """
+        if self.calendar is None:
+            logger.warning("No exchange calendar for this provider, skipping gaps")
+            return pd.DatetimeIndex([], tz="UTC")
+
+        data = await self.get_data_range(start_date, end_date, columns=["close"])
+        gaps = find_gaps(
+            data.index,
+            self.calendar,
+            self.data_provider.interval,
+            getattr(self.data_provider, "prepost", False),
+        )
+        if len(gaps):
+            logger.warning(f"{len(gaps)} missing bars, first at {gaps[0]}")
+        return gaps
+
+    def find_gaps_sync(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> pd.DatetimeIndex:
+        return asyncio.run(self.find_gaps(start_date, end_date))
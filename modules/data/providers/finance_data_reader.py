@@ -3,9 +3,10 @@ import asyncio
 import FinanceDataReader as fdr
 import pandas as pd
 from typing import Optional
-from datetime import datetime, timedelta, time
+from datetime import datetime, timedelta
 from modules.data.core import DataProvider
 from modules.data.constants import DATE_FORMAT
+from modules.data.market_calendar import KRX
 from modules.logger import get_logger
 
 
@@ -13,32 +14,13 @@ logger = get_logger(__name__)
 
 KST_TIMEZONE = pytz.timezone("Asia/Seoul")
 UTC_TIMEZONE = pytz.UTC
-MARKET_OPEN_TIME = time(9, 0)
-MARKET_CLOSE_TIME = time(15, 30)
 
 
 def is_market_open(now: Optional[datetime] = None) -> bool:
-    now = now or datetime.now(KST_TIMEZONE)
-    if now.tzinfo is None:
-        now = KST_TIMEZONE.localize(now)
-    elif now.tzinfo != KST_TIMEZONE:
-        now = now.astimezone(KST_TIMEZONE)
-
-    market_open = now.replace(
-        hour=MARKET_OPEN_TIME.hour,
-        minute=MARKET_OPEN_TIME.minute,
-        second=0,
-        microsecond=0,
-    )
-    market_close = now.replace(
-        hour=MARKET_CLOSE_TIME.hour,
-        minute=MARKET_CLOSE_TIME.minute,
-        second=0,
-        microsecond=0,
-    )
-    return (
-        market_open <= now <= market_close and now.weekday() < 5
-    )  # FIXME: 향후 휴일 여부도 추가 필요
+    """
+    Regular KRX session, holidays included (naive now is KST)
+    """
+    return KRX.is_open_at(now)
 
 
 def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
@@ -50,10 +32,7 @@ def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         logger.error("DataFrame does not have a 'date' column")
         return pd.DataFrame()
 
-    now = datetime.now(KST_TIMEZONE)
-    today = now.date()
-
-    # datetime 열을 나노초 정밀도로 파싱하고 시간대 정보를 추가합니다
+    # datetime 열을 나노초 정밀도로 파싱합니다
     df["date"] = pd.to_datetime(
         df["date"], format=DATE_FORMAT, errors="coerce", utc=False
     )
@@ -64,47 +43,11 @@ def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         logger.warning("DataFrame is empty after processing")
         return pd.DataFrame()
 
-    # datetime 열에 시간대 정보 추가 및 마이크로초 정보 추가
-    df["date"] = df["date"].apply(
-        lambda x: (
-            x.tz_localize(KST_TIMEZONE).replace(microsecond=x.microsecond or 0)
-            if x.tzinfo is None
-            else x.replace(microsecond=x.microsecond or 0)
-        )
+    # 일봉은 그날 정규 마감 시각으로, 장 중인 오늘 봉은 현재 시각으로 (UTC)
+    df["date"] = KRX.daily_bar_timestamps(
+        pd.DatetimeIndex(df["date"]), datetime.now(KST_TIMEZONE)
     )
 
-    # 날짜별로 처리
-    for date, group in df.groupby(df["date"].dt.date):
-        if date < today:
-            # 과거 데이터는 장 마감 시간으로 설정
-            df.loc[group.index, "date"] = pd.Timestamp(date).replace(
-                hour=MARKET_CLOSE_TIME.hour,
-                minute=MARKET_CLOSE_TIME.minute,
-                second=0,
-                microsecond=0,
-                tzinfo=KST_TIMEZONE,
-            )
-        elif date == today:
-            if is_market_open(now):
-                # 오늘이고 시장이 열려있는 경우, 시간을 그대로 유지하되 가장 최근 데이터는 현재 시간으로 업데이트
-                last_index = group.index[-1]
-                df.loc[last_index, "date"] = pd.Timestamp(now).astimezone(KST_TIMEZONE)
-            else:
-                # 오늘이지만 시장이 닫혀있는 경우, 장 마감 시간으로 설정
-                df.loc[group.index, "date"] = pd.Timestamp(date).replace(
-                    hour=MARKET_CLOSE_TIME.hour,
-                    minute=MARKET_CLOSE_TIME.minute,
-                    second=0,
-                    microsecond=0,
-                    tzinfo=KST_TIMEZONE,
-                )
-        else:
-            # 미래 날짜의 데이터는 그대로 유지 (이런 경우는 없어야 하지만, 안전을 위해 추가)
-            pass
-
-    # UTC로 변환 및 인덱스 설정
-    df["date"] = df["date"].apply(lambda x: x.astimezone(UTC_TIMEZONE))
-
     # 마이크로초가 0인 경우에도 표시되도록 문자열로 변환 후 다시 datetime으로 변환
     df["date"] = pd.to_datetime(df["date"].dt.strftime(DATE_FORMAT))
 
@@ -114,6 +57,9 @@ def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
 
 
 class FinanceDataReader(DataProvider):
+    market = "KRX"
+    prepost = False
+
     def __init__(
         self,
         symbol: str,
@@ -170,7 +116,8 @@ class FinanceDataReader(DataProvider):
 
         try:
             logger.debug(f"Calling FinanceDataReader with params: {params}")
-            df = await asyncio.to_thread(fdr.DataReader, **params)
+            async with self.rate_limiter.limit():
+                df = await asyncio.to_thread(fdr.DataReader, **params)
 
             if df.empty:
                 logger.warning(f"No data found for {self.symbol}")
@@ -193,12 +140,13 @@ class FinanceDataReader(DataProvider):
         try:
             end_date = datetime.now(KST_TIMEZONE)
             start_date = end_date - timedelta(days=7)
-            df = await asyncio.to_thread(
-                fdr.DataReader,
-                self.symbol,
-                start=start_date.strftime("%Y-%m-%d"),
-                end=end_date.strftime("%Y-%m-%d"),
-            )
+            async with self.rate_limiter.limit():
+                df = await asyncio.to_thread(
+                    fdr.DataReader,
+                    self.symbol,
+                    start=start_date.strftime("%Y-%m-%d"),
+                    end=end_date.strftime("%Y-%m-%d"),
+                )
             success = not df.empty
             logger.info(
                 f"Ping {'successful' if success else 'failed'} for {self.symbol}"
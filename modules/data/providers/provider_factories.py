@@ -1,7 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 from modules.data.core import DataProvider
-from modules.data.providers.yahoo import YahooFinance
+from modules.data.providers.yahoo import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BATCH_WINDOW,
+    YahooFinance,
+    YahooFinanceBatch,
+)
 from modules.data.providers.finance_data_reader import FinanceDataReader
 
 
@@ -12,6 +17,19 @@ class DataProviderFactory(ABC):
 
 
 class YahooFinanceFactory(DataProviderFactory):
+    def __init__(self):
+        # 같은 설정의 provider 들은 하나의 batch 를 함께 쓴다.
+        self._batches: Dict[Tuple[float, int], YahooFinanceBatch] = {}
+
+    def _batch(self, config: Dict[str, Any]) -> Optional[YahooFinanceBatch]:
+        window = config.get("batch_window", DEFAULT_BATCH_WINDOW)
+        if not window:
+            return None
+        key = (float(window), int(config.get("batch_size", DEFAULT_BATCH_SIZE)))
+        if key not in self._batches:
+            self._batches[key] = YahooFinanceBatch(window=key[0], max_symbols=key[1])
+        return self._batches[key]
+
     def create(self, symbol: str, config: Dict[str, Any]) -> DataProvider:
         params = [
             "interval",
@@ -22,13 +40,14 @@ class YahooFinanceFactory(DataProviderFactory):
             "convert_utc",
             "start_date",
             "end_date",
+            "prepost",
         ]
         provider_params = {k: config.get(k) for k in params if k in config}
         provider_params.setdefault("raise_errors", True)
         provider_params.setdefault("keepna", True)
         provider_params.setdefault("timeout", 100)
         provider_params.setdefault("convert_utc", False)
-        return YahooFinance(symbol=symbol, **provider_params)
+        return YahooFinance(symbol=symbol, batch=self._batch(config), **provider_params)
 
 
 class FinanceDataReaderFactory(DataProviderFactory):
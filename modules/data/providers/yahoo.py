@@ -1,12 +1,15 @@
 import yfinance as yf
 import pandas as pd
 import asyncio
+import threading
 import pytz
 from yfinance.exceptions import YFPricesMissingError
-from datetime import datetime, timedelta, time
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from modules.data.core import DataProvider
 from modules.data.constants import DATE_FORMAT
+from modules.data.market_calendar import INTERVAL_UNITS, NYSE, interval_seconds
+from modules.data.rate_limit import rate_limiter
 from modules.logger import get_logger
 
 
@@ -15,20 +18,152 @@ logger = get_logger(__name__)
 KST_TIMEZONE = pytz.timezone("Asia/Seoul")
 ET_TIMEZONE = pytz.timezone("America/New_York")
 UTC_TIMEZONE = pytz.UTC
-MARKET_OPEN_TIME = time(9, 30)
-MARKET_CLOSE_TIME = time(16, 0)
+
+# 같은 요청을 모으는 시간(초)과 한 번에 받는 최대 종목 수
+DEFAULT_BATCH_WINDOW = 0.5
+DEFAULT_BATCH_SIZE = 200
 
 
 def is_market_open(now: Optional[datetime] = None) -> bool:
-    now = now or datetime.now(ET_TIMEZONE)
-    if now.tzinfo is None:
-        now = ET_TIMEZONE.localize(now)
-    elif now.tzinfo != ET_TIMEZONE:
-        now = now.astimezone(ET_TIMEZONE)
+    """
+    Regular NYSE session, holidays and half-days included (naive now is ET)
+    """
+    return NYSE.is_open_at(now)
+
 
-    market_open = now.replace(hour=9, minute=30, second=0, microsecond=0)
-    market_close = now.replace(hour=16, minute=0, second=0, microsecond=0)
-    return market_open <= now <= market_close and now.weekday() < 5
+class YahooFinanceBatch:
+    """
+    Coalesces the history requests of YahooFinance providers with the same
+    parameters (interval, range, prepost ...) that arrive within `window`
+    seconds into one yf.download call and splits the result back per symbol.
+    Yahoo serves bars per symbol, so the download fans out over yfinance's
+    shared session with `threads` workers instead of one executor job and
+    crumb lookup per provider.
+    """
+
+    # yf.download 는 결과를 module 전역(shared._DFS)에 모으므로 한 번에 하나씩만 실행한다.
+    _download_lock = threading.Lock()
+
+    def __init__(
+        self,
+        window: float = DEFAULT_BATCH_WINDOW,
+        max_symbols: int = DEFAULT_BATCH_SIZE,
+        threads: Union[bool, int] = True,
+    ):
+        self.window = window
+        self.max_symbols = max_symbols
+        self.threads = threads
+        self._pending: Dict[Tuple, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def history(self, symbol: str, params: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Same frame as yf.Ticker(symbol).history(**params), fetched together
+        with the other symbols requested in the same window
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, tuple(sorted(params.items())))
+        future = loop.create_future()
+        requests = self._pending.setdefault(key, [])
+        requests.append((symbol, future))
+        if len(requests) == 1:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        if len(requests) >= self.max_symbols:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: Tuple):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        requests = self._pending.pop(key, None)
+        if not requests:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._run(dict(key[1]), requests)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, params: Dict[str, Any], requests: List[Tuple[str, asyncio.Future]]
+    ):
+        symbols = list(dict.fromkeys(symbol for symbol, _ in requests))
+        logger.info(f"Downloading {len(symbols)} symbols in one batch")
+        # symbol 마다 요청이 하나씩 나가므로 token 도 그만큼 쓴다.
+        limiter = rate_limiter(YahooFinance.__name__)
+        try:
+            async with limiter.limit(cost=len(symbols)):
+                frames = await asyncio.to_thread(
+                    self._download, symbols, params, limiter.max_concurrent
+                )
+        except Exception as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for symbol, future in requests:
+            if not future.done():
+                future.set_result(frames.get(symbol, pd.DataFrame()))
+
+    def _download(
+        self,
+        symbols: List[str],
+        params: Dict[str, Any],
+        max_concurrent: Optional[int] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        # download 는 실패한 종목을 raise 하지 않고 빈 frame 으로 돌려준다.
+        options = {k: v for k, v in params.items() if k != "raise_errors"}
+        threads = self.threads
+        if threads and max_concurrent:
+            threads = (
+                max_concurrent if threads is True else min(threads, max_concurrent)
+            )
+        with self._download_lock:
+            data = yf.download(
+                tickers=symbols,
+                group_by="ticker",
+                auto_adjust=True,  # Ticker.history 기본값과 같게
+                actions=True,
+                ignore_tz=False,
+                progress=False,
+                threads=threads,
+                **options,
+            )
+        if data is None or data.empty:
+            return {}
+
+        if isinstance(data.columns, pd.MultiIndex):
+            tickers = set(data.columns.get_level_values(0))
+            frames = {
+                symbol: data[symbol.upper()]
+                for symbol in symbols
+                if symbol.upper() in tickers
+            }
+        else:
+            frames = {symbols[0]: data}
+
+        bar = interval_seconds(params.get("interval", ""))
+        index_name = "Datetime" if bar and bar < INTERVAL_UNITS["d"] else "Date"
+        return {
+            symbol: self._restore(frame, index_name)
+            for symbol, frame in frames.items()
+        }
+
+    @staticmethod
+    def _restore(frame: pd.DataFrame, index_name: str) -> pd.DataFrame:
+        """
+        Undo what combining the symbols did: the rows other symbols added,
+        the UTC index and the float volume
+        """
+        frame = frame.dropna(how="all").copy()
+        frame.columns.name = None
+        frame.index = frame.index.tz_convert(ET_TIMEZONE)
+        frame.index.name = frame.index.name or index_name
+        if "Volume" in frame.columns and frame["Volume"].notna().all():
+            frame["Volume"] = frame["Volume"].astype("int64")
+        return frame
 
 
 class YahooFinance(DataProvider):
@@ -38,6 +173,8 @@ class YahooFinance(DataProvider):
     Converted time zone: datetime64[ns, UTC]
     """
 
+    market = "NYSE"
+
     def __init__(
         self,
         symbol: str,
@@ -49,15 +186,19 @@ class YahooFinance(DataProvider):
         convert_utc: bool = True,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        prepost: bool = True,  # pre-market / after-hours 포함
+        batch: Optional[YahooFinanceBatch] = None,  # 여러 종목을 한 번에 받을 때
     ):
         super().__init__(start_date=start_date, end_date=end_date)
         self.symbol = symbol
+        self.prepost = prepost
         self.interval = interval
         self.period = period
         self.raise_errors = raise_errors
         self.keepna = keepna
         self.timeout = timeout
         self.convert_utc = convert_utc
+        self.batch = batch
 
         if self.interval == "1m":
             logger.warning(
@@ -78,10 +219,49 @@ class YahooFinance(DataProvider):
         return await self._get_data_async()
 
     async def _get_data_async(self) -> pd.DataFrame:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._get_data_sync)
+        params = self._request_params()
+        if params is None:
+            return pd.DataFrame()
+        if self.batch is None:
+            loop = asyncio.get_event_loop()
+            async with self.rate_limiter.limit():
+                return await loop.run_in_executor(None, self._get_data_sync, params)
+
+        try:
+            df = await self.batch.history(self.symbol, params)
+        except Exception as e:
+            return self._fetch_failed(e)
+        return self._finish_data(df)
+
+    def _get_data_sync(self, params: dict) -> pd.DataFrame:
+        try:
+            df = yf.Ticker(self.symbol).history(**params)
+        except Exception as e:
+            return self._fetch_failed(e)
+        return self._finish_data(df)
+
+    def _finish_data(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            logger.warning(f"No data found for {self.symbol}")
+            return pd.DataFrame()
+        try:
+            return self._process_dataframe(df)
+        except Exception as e:
+            return self._fetch_failed(e)
+
+    def _fetch_failed(self, e: Exception) -> pd.DataFrame:
+        if isinstance(e, YFPricesMissingError):
+            logger.error(f"YFPricesMissingError fetching data for {self.symbol}: {e}")
+        elif isinstance(e, (IndexError, KeyError)):
+            logger.error(f"{type(e).__name__} fetching data for {self.symbol}: {e}")
+        else:
+            logger.error(f"Error fetching data for {self.symbol}: {e}", exc_info=True)
+        return pd.DataFrame()
 
-    def _get_data_sync(self) -> pd.DataFrame:
+    def _request_params(self) -> Optional[dict]:
+        """
+        history() parameters of this fetch, None if it should be skipped
+        """
         now = datetime.now(ET_TIMEZONE)
         today = now.date()
 
@@ -93,7 +273,7 @@ class YahooFinance(DataProvider):
                 logger.warning(
                     "Market is open. Skipping 1d data fetch to avoid incomplete data."
                 )
-                return pd.DataFrame()
+                return None
 
         # 우선 사용자가 지정한 start_date와 end_date를 우선적으로 사용하도록 수정
         if self.start_date and self.end_date:
@@ -106,28 +286,7 @@ class YahooFinance(DataProvider):
             if not self._end_date_str:
                 self._end_date_str = datetime.now(tz=pytz.UTC).strftime("%Y-%m-%d")
 
-        ticker = yf.Ticker(self.symbol)
-        params = self._prepare_params()
-        try:
-            df = ticker.history(**params)
-            if df.empty:
-                logger.warning(f"No data found for {self.symbol}")
-                return pd.DataFrame()
-
-            return self._process_dataframe(df)
-
-        except YFPricesMissingError as e:
-            logger.error(f"YFPricesMissingError fetching data for {self.symbol}: {e}")
-            return pd.DataFrame()
-        except IndexError as e:
-            logger.error(f"IndexError fetching data for {self.symbol}: {e}")
-            return pd.DataFrame()
-        except KeyError as e:
-            logger.error(f"KeyError fetching data for {self.symbol}: {e}")
-            return pd.DataFrame()
-        except Exception as e:
-            logger.error(f"Error fetching data for {self.symbol}: {e}", exc_info=True)
-            return pd.DataFrame()
+        return self._prepare_params()
 
     def _prepare_params(self) -> dict:
         params = {
@@ -135,7 +294,7 @@ class YahooFinance(DataProvider):
             "raise_errors": self.raise_errors,
             "keepna": self.keepna,
             "timeout": self.timeout,
-            "prepost": True,
+            "prepost": self.prepost,
         }
 
         if self.interval == "1m" and is_market_open():
@@ -155,35 +314,10 @@ class YahooFinance(DataProvider):
         df = df.reset_index()
         if self.interval == "1d":
             df = df.rename(columns={"Date": "date", "Volume": "volume"})
-            now = datetime.now(ET_TIMEZONE)
-            for idx in df.index:
-                if df.loc[idx, "date"].date() == now.date():
-                    if is_market_open():
-                        df.loc[idx, "date"] = now
-                    else:
-                        df.loc[idx, "date"] = (
-                            df.loc[idx, "date"]
-                            .replace(
-                                hour=MARKET_CLOSE_TIME.hour,
-                                minute=MARKET_CLOSE_TIME.minute,
-                                second=0,
-                                microsecond=0,
-                                tzinfo=ET_TIMEZONE,
-                            )
-                            .astimezone(UTC_TIMEZONE)
-                        )
-                else:
-                    df.loc[idx, "date"] = (
-                        df.loc[idx, "date"]
-                        .replace(
-                            hour=MARKET_CLOSE_TIME.hour,
-                            minute=MARKET_CLOSE_TIME.minute,
-                            second=0,
-                            microsecond=0,
-                            tzinfo=ET_TIMEZONE,
-                        )
-                        .astimezone(UTC_TIMEZONE)
-                    )
+            # 일봉은 그날 정규 마감 시각으로 (장 중인 오늘 봉은 현재 시각으로) 맞춘다.
+            df["date"] = NYSE.daily_bar_timestamps(
+                pd.DatetimeIndex(df["date"]), datetime.now(ET_TIMEZONE)
+            )
         elif self.interval == "1m":
             df = df.rename(columns={"Datetime": "date", "Volume": "volume"})
         df["date"] = pd.to_datetime(df["date"], format=DATE_FORMAT, errors="coerce")
@@ -201,7 +335,8 @@ class YahooFinance(DataProvider):
 
     async def _ping_async(self) -> bool:
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._ping_sync)
+        async with self.rate_limiter.limit():
+            return await loop.run_in_executor(None, self._ping_sync)
 
     def _ping_sync(self) -> bool:
         try:
@@ -0,0 +1,205 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket plus concurrency cap on the upstream calls of one provider
+    class, shared by every pipeline of the process.
+
+    A call reserves `cost` tokens (refilled at `rate` per second up to
+    `burst`) and then one of `max_concurrent` slots, both in arrival order.
+    State lives behind a thread lock and waiters are woken through their own
+    event loop, so pipelines running in different loops (*_sync wrappers)
+    share the same limits. None means unlimited.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+    ):
+        self.name = name
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = (
+            deque()
+        )
+        self._in_flight = 0
+        self._queued = 0
+        self.requests = 0
+        self.delayed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.max_queued = 0
+        self.configure(rate, burst, max_concurrent)
+
+    def configure(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+    ):
+        with self._lock:
+            self.rate = float(rate) if rate else None
+            # burst 를 정하지 않으면 1초 분량까지 몰아서 보낼 수 있다.
+            self.burst = max(int(burst or self.rate or 1), 1)
+            self.max_concurrent = int(max_concurrent) if max_concurrent else None
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+
+    @asynccontextmanager
+    async def limit(self, cost: int = 1) -> AsyncIterator[None]:
+        """
+        Hold cost tokens and one concurrency slot for the body of the block
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._queued += 1
+            self.max_queued = max(self.max_queued, self._queued)
+        try:
+            await self._take_tokens(cost)
+            await self._acquire_slot()
+        finally:
+            with self._lock:
+                self._queued -= 1
+        self._record(time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._release_slot()
+
+    def _reserve(self, cost: int) -> float:
+        with self._lock:
+            if self.rate is None:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # 모자라면 미리 빌려 두고 (음수), 그만큼 채워질 때까지 기다린다.
+            self._tokens -= cost
+            return max(-self._tokens / self.rate, 0.0)
+
+    async def _take_tokens(self, cost: int):
+        delay = self._reserve(cost)
+        if delay <= 0:
+            return
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._tokens += cost  # 쓰지 않은 token 반환
+            raise
+
+    async def _acquire_slot(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and (
+                self.max_concurrent is None or self._in_flight < self.max_concurrent
+            ):
+                self._in_flight += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                    granted = False
+                except ValueError:
+                    granted = True
+            # 취소되는 사이에 slot 을 넘겨받았으면 다음 차례로 돌려준다.
+            if granted:
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if loop.is_closed():
+                    continue
+                # slot 을 그대로 넘기므로 in_flight 는 그대로 둔다.
+                loop.call_soon_threadsafe(self._grant, future)
+                return
+            self._in_flight -= 1
+
+    @staticmethod
+    def _grant(future: asyncio.Future):
+        if not future.done():
+            future.set_result(None)
+
+    def _record(self, waited: float):
+        with self._lock:
+            self.requests += 1
+            if waited >= 0.001:
+                self.delayed += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if waited >= 1:
+            logger.debug(f"{self.name} call waited {waited:.1f}s for the rate limit")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "delayed": self.delayed,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "queued": self._queued,
+                "max_queued": self.max_queued,
+                "in_flight": self._in_flight,
+                "rate": self.rate,
+                "burst": self.burst,
+                "max_concurrent": self.max_concurrent,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def rate_limiter(name: str) -> RateLimiter:
+    """
+    One limiter per provider class in the process, unlimited until configured
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = RateLimiter(name)
+            _limiters[name] = limiter
+        return limiter
+
+
+def configure_rate_limit(
+    name: str,
+    requests_per_second: Optional[float] = None,
+    burst: Optional[int] = None,
+    max_concurrent: Optional[int] = None,
+) -> RateLimiter:
+    limiter = rate_limiter(name)
+    limiter.configure(requests_per_second, burst, max_concurrent)
+    logger.info(
+        f"Rate limit for {name}: {requests_per_second} req/s, burst {limiter.burst}, "
+        f"max {max_concurrent} concurrent"
+    )
+    return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
@@ -0,0 +1,102 @@
+import pandas as pd
+from typing import Dict, List, Optional
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+from modules.data.market_calendar import ExchangeCalendar
+
+
+# rollup 저장 디렉토리 (base_path/_rollup/5min, base_path/_rollup/1h, ...)
+ROLLUP_DIR = "_rollup"
+
+OHLCV_AGGREGATION = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+
+def validate_rollups(rollups: Optional[List[str]]) -> List[str]:
+    """
+    Only fixed-size frequencies (5min, 1h, 1D) are allowed, so the bucket of a
+    timestamp is a plain floor and can be recomputed on its own.
+    """
+    validated = []
+    for freq in rollups or []:
+        try:
+            offset = to_offset(freq)
+        except ValueError:
+            raise ValueError(f"Invalid rollup frequency: {freq}")
+        if not isinstance(offset, Tick):
+            raise ValueError(
+                f"Rollup frequency must be fixed size (e.g. 5min, 1h, 1D): {freq}"
+            )
+        validated.append(freq)
+    return validated
+
+
+def is_session_frequency(freq: str) -> bool:
+    """
+    Daily and longer buckets follow the trading sessions of the exchange
+    """
+    return pd.Timedelta(to_offset(freq)) >= pd.Timedelta(days=1)
+
+
+def _session_day(ts: pd.Timestamp, freq: str, calendar: ExchangeCalendar):
+    # exchange 현지 날짜 (naive) 를 freq 단위로 내림
+    return calendar.local_dates(pd.DatetimeIndex([ts]))[0].floor(freq)
+
+
+def bucket_start(
+    ts: pd.Timestamp, freq: str, calendar: Optional[ExchangeCalendar] = None
+) -> pd.Timestamp:
+    """
+    First instant of the bucket that holds ts. With a calendar, daily and
+    longer buckets start at local midnight of the exchange, so extended-hours
+    bars after 00:00 UTC stay with their session.
+    """
+    if calendar is None or not is_session_frequency(freq):
+        return ts.floor(freq)
+    day = _session_day(ts, freq, calendar)
+    return day.tz_localize(calendar.timezone).tz_convert("UTC")
+
+
+def bucket_end(
+    ts: pd.Timestamp, freq: str, calendar: Optional[ExchangeCalendar] = None
+) -> pd.Timestamp:
+    """
+    Exclusive end of the bucket that holds ts
+    """
+    if calendar is None or not is_session_frequency(freq):
+        return ts.floor(freq) + to_offset(freq)
+    day = _session_day(ts, freq, calendar) + to_offset(freq)
+    return day.tz_localize(calendar.timezone).tz_convert("UTC")
+
+
+def aggregate(
+    data: pd.DataFrame, freq: str, calendar: Optional[ExchangeCalendar] = None
+) -> pd.DataFrame:
+    """
+    OHLCV bars -> coarser bars labelled by bucket start. Columns other than
+    OHLCV keep their last value. Buckets without rows are dropped.
+    With a calendar, daily and longer bars are grouped by session date and
+    labelled with the session close of the bucket's first day, the stamp
+    the daily pipelines give their bars.
+    """
+    if data.empty:
+        return pd.DataFrame()
+
+    spec: Dict[str, str] = {
+        column: OHLCV_AGGREGATION.get(column, "last") for column in data.columns
+    }
+    data = data.sort_index()
+    if calendar is not None and is_session_frequency(freq):
+        days = calendar.local_dates(data.index).floor(freq)
+        bars = data.groupby(days).agg(spec)
+        bars.index = calendar.session_closes(bars.index).rename(data.index.name)
+        return bars
+
+    bars = data.resample(freq, label="left", closed="left").agg(spec)
+    counts = data.resample(freq, label="left", closed="left").size()
+    return bars[counts.reindex(bars.index, fill_value=0) > 0]
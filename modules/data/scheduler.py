@@ -0,0 +1,118 @@
+import asyncio
+import pytz
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
+from modules.data.market_calendar import (
+    INTERVAL_UNITS,
+    ExchangeCalendar,
+    get_calendar,
+    interval_seconds,
+)
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# bar 가 닫힌 뒤 provider 에 반영될 때까지 기다리는 시간
+DEFAULT_SETTLE_SECONDS = 5.0
+# 일봉은 장 마감 후 이 시간이 지나서 가져온다.
+DEFAULT_DAILY_DELAY = timedelta(minutes=10)
+# 다음 거래일을 찾을 때 살펴보는 최대 일수 (긴 연휴 포함)
+MAX_SEARCH_DAYS = 31
+
+
+class FetchScheduler:
+    """
+    Next useful fetch time of a realtime pipeline.
+
+    Intraday pipelines fetch right after each bar (or fetch_interval, if
+    longer) closes inside the session, aligned to the session open so the
+    schedule does not drift. Daily pipelines fetch once after the close.
+    Outside the session, on weekends and on exchange holidays they sleep
+    until the next session. Without a known market it falls back to a fixed
+    fetch_interval.
+    """
+
+    def __init__(
+        self,
+        calendar: Optional[ExchangeCalendar],
+        interval: str,
+        fetch_interval: float = 60,
+        prepost: bool = False,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        daily_delay: timedelta = DEFAULT_DAILY_DELAY,
+    ):
+        self.calendar = calendar
+        self.interval = interval
+        self.fetch_interval = fetch_interval
+        self.prepost = prepost
+        self.settle = timedelta(seconds=settle_seconds)
+        self.daily_delay = daily_delay
+        bar = interval_seconds(interval)
+        self.daily = bar is not None and bar >= INTERVAL_UNITS["d"]
+        self.step = timedelta(seconds=max(bar or 0, fetch_interval))
+
+    @classmethod
+    def for_provider(
+        cls, data_provider: Any, fetch_interval: float = 60
+    ) -> "FetchScheduler":
+        return cls(
+            get_calendar(getattr(data_provider, "market", None)),
+            getattr(data_provider, "interval", ""),
+            fetch_interval,
+            prepost=getattr(data_provider, "prepost", False),
+        )
+
+    def next_fetch(self, now: Optional[datetime] = None) -> datetime:
+        now = now or datetime.now(tz=pytz.UTC)
+        if now.tzinfo is None:
+            now = pytz.UTC.localize(now)
+        if self.calendar is None:
+            return now + timedelta(seconds=self.fetch_interval)
+
+        local = now.astimezone(self.calendar.timezone)
+        for offset in range(MAX_SEARCH_DAYS):
+            day = local.date() + timedelta(days=offset)
+            if not self.calendar.is_session(day):
+                continue
+            fetch_time = self._fetch_time_on(day, now)
+            if fetch_time is not None:
+                return fetch_time.astimezone(pytz.UTC)
+
+        logger.warning(f"No trading day within {MAX_SEARCH_DAYS} days after {now}")
+        return now + timedelta(seconds=self.fetch_interval)
+
+    def _fetch_time_on(self, day: date, now: datetime) -> Optional[datetime]:
+        if self.daily:
+            _, close = self.calendar.session_window(day)
+            fetch_time = close + self.daily_delay
+            return fetch_time if fetch_time > now else None
+
+        open_, close = self.calendar.session_window(day, self.prepost)
+        # settle 만큼 늦게 가져오므로, 이미 가져간 마지막 bar 의 마감 시각 기준으로 계산
+        reference = now - self.settle
+        if reference >= close:
+            return None
+        if reference < open_:
+            bar_close = open_ + self.step
+        else:
+            bars = (reference - open_) // self.step + 1
+            bar_close = open_ + bars * self.step
+        return min(bar_close, close) + self.settle
+
+    def seconds_until_next(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(tz=pytz.UTC)
+        if now.tzinfo is None:
+            now = pytz.UTC.localize(now)
+        return max((self.next_fetch(now) - now).total_seconds(), 0.0)
+
+
+async def wait_for_stop(stop_event: asyncio.Event, timeout: float) -> bool:
+    """
+    Sleep up to timeout seconds. Returns True as soon as stop_event is set.
+    """
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        return stop_event.is_set()
@@ -0,0 +1,294 @@
+import os
+import json
+import sqlite3
+import asyncio
+import threading
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar
+from modules.data.formats import INDEX_NAME, normalize_index
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# storage_type="sqlite" 의 기본 database 파일 (symbol 디렉토리들의 상위 경로에 하나)
+SQLITE_FILE = "ohlcv.sqlite"
+
+ROWS_TABLE = "ohlcv"
+SERIES_TABLE = "series"
+
+T = TypeVar("T")
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype) -> str:
+    if dtype.kind in "iubM":
+        return "INTEGER"
+    if dtype.kind == "f":
+        return "REAL"
+    return "TEXT"
+
+
+class SQLiteDatabase:
+    """
+    One connection per database file, shared by every store of the process.
+    Rows of all series live in one table keyed by (symbol, ts), ts being UTC
+    epoch nanoseconds, so range reads and upserts are primary key lookups.
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            database_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {ROWS_TABLE} ("
+            "symbol TEXT NOT NULL, ts INTEGER NOT NULL, PRIMARY KEY (symbol, ts)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {SERIES_TABLE} ("
+            "symbol TEXT PRIMARY KEY, columns TEXT NOT NULL)"
+        )
+        self._table_columns: Optional[Set[str]] = None
+
+    def run(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        with self._lock:
+            return func(self._conn)
+
+    def ensure_columns(self, conn: sqlite3.Connection, columns: Dict[str, str]):
+        """
+        Add the missing columns to the rows table. Runs inside the write
+        transaction: other processes may have added columns since the table
+        was last read, so it is read again before altering it.
+        """
+        if self._table_columns is not None and all(
+            name in self._table_columns for name in columns
+        ):
+            return
+        self._table_columns = {
+            row[1] for row in conn.execute(f"PRAGMA table_info({ROWS_TABLE})")
+        }
+        for name, sql_type in columns.items():
+            if name not in self._table_columns:
+                conn.execute(
+                    f"ALTER TABLE {ROWS_TABLE} ADD COLUMN {_quote(name)} {sql_type}"
+                )
+                self._table_columns.add(name)
+
+    def forget_columns(self):
+        """
+        Drop the cached table columns, e.g. after a rolled back ALTER
+        """
+        self._table_columns = None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_databases: Dict[str, SQLiteDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def open_database(database_path: str) -> SQLiteDatabase:
+    database_path = os.path.abspath(database_path)
+    with _databases_lock:
+        database = _databases.get(database_path)
+        if database is None:
+            database = SQLiteDatabase(database_path)
+            _databases[database_path] = database
+        return database
+
+
+def close_databases():
+    with _databases_lock:
+        for database in _databases.values():
+            database.close()
+        _databases.clear()
+
+
+class SQLiteStore:
+    """
+    Rows of one series (one symbol, rollup or panel) in an embedded SQLite
+    database. Replaces the chunk files of DataPipeline: there is nothing to
+    rewrite, a save is an upsert and a range read an index scan.
+    """
+
+    def __init__(self, database_path: str, key: str):
+        self.database = open_database(database_path)
+        self.database_path = self.database.database_path
+        self.key = key
+        self._columns: Optional[Dict[str, str]] = None  # column -> pandas dtype
+
+    def _load_columns(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        if self._columns is None:
+            row = conn.execute(
+                f"SELECT columns FROM {SERIES_TABLE} WHERE symbol = ?", (self.key,)
+            ).fetchone()
+            self._columns = json.loads(row[0]) if row else {}
+        return self._columns
+
+    async def upsert(self, data: pd.DataFrame) -> int:
+        """
+        Insert rows, rows with a stored timestamp replace the stored values
+        """
+        if data.empty:
+            return 0
+        data = normalize_index(data.copy())
+        data = data[~data.index.duplicated(keep="last")]
+        columns = [str(c) for c in data.columns]
+        data.columns = columns
+
+        values = [[self.key] * len(data), data.index.asi8.tolist()]
+        for column in columns:
+            series = data[column]
+            if series.dtype.kind == "M":
+                series = pd.to_datetime(series, utc=True).astype("int64")
+            elif series.dtype.kind not in "iubf":
+                series = series.astype(object).where(series.notna(), None)
+                series = series.map(lambda v: v if v is None else str(v))
+            # numpy scalar 는 sqlite3 에 bind 할 수 없으므로 python 값으로 변환
+            values.append(series.tolist())
+        rows = list(zip(*values))
+
+        names = ", ".join(["symbol", "ts"] + [_quote(c) for c in columns])
+        placeholders = ", ".join(["?"] * (len(columns) + 2))
+        if columns:
+            updates = ", ".join(f"{_quote(c)} = excluded.{_quote(c)}" for c in columns)
+            conflict = f"DO UPDATE SET {updates}"
+        else:
+            conflict = "DO NOTHING"
+        sql = (
+            f"INSERT INTO {ROWS_TABLE} ({names}) VALUES ({placeholders}) "
+            f"ON CONFLICT(symbol, ts) {conflict}"
+        )
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = self._load_columns(conn)
+                if any(c not in known for c in columns):
+                    # 다른 process 가 같은 series 에 컬럼을 추가했을 수 있으므로
+                    # write lock 을 잡은 뒤 다시 읽는다.
+                    self._columns = None
+                    known = self._load_columns(conn)
+                new_columns = {
+                    c: str(data[c].dtype) for c in columns if c not in known
+                }
+                self.database.ensure_columns(
+                    conn, {c: _sql_type(data[c].dtype) for c in columns}
+                )
+                if new_columns:
+                    merged = {**known, **new_columns}
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {SERIES_TABLE} (symbol, columns) "
+                        "VALUES (?, ?)",
+                        (self.key, json.dumps(merged)),
+                    )
+                conn.executemany(sql, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                self._columns = None
+                self.database.forget_columns()
+                raise
+            if new_columns:
+                self._columns = {**known, **new_columns}
+            return len(rows)
+
+        return await asyncio.to_thread(self.database.run, write)
+
+    async def query(
+        self,
+        start_ts: Optional[pd.Timestamp] = None,
+        end_ts: Optional[pd.Timestamp] = None,
+        columns: Optional[List[str]] = None,
+        after_ts: Optional[pd.Timestamp] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Rows in [start_ts, end_ts] (and > after_ts), in time order
+        """
+
+        def read(conn: sqlite3.Connection) -> pd.DataFrame:
+            known = self._load_columns(conn)
+            if not known:
+                return pd.DataFrame()
+            wanted = columns if columns is not None else list(known)
+            selected = [c for c in wanted if c in known]
+
+            names = ", ".join(["ts"] + [_quote(c) for c in selected])
+            sql = f"SELECT {names} FROM {ROWS_TABLE} WHERE symbol = ?"
+            params: List[Any] = [self.key]
+            for op, ts in ((">=", start_ts), ("<=", end_ts), (">", after_ts)):
+                if ts is not None:
+                    sql += f" AND ts {op} ?"
+                    params.append(int(pd.Timestamp(ts).value))
+            sql += " ORDER BY ts"
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            rows = conn.execute(sql, params).fetchall()
+            return self._to_frame(rows, selected, known)
+
+        return await asyncio.to_thread(self.database.run, read)
+
+    @staticmethod
+    def _to_frame(
+        rows: List[tuple], selected: List[str], known: Dict[str, str]
+    ) -> pd.DataFrame:
+        if not rows:
+            return pd.DataFrame()
+        data = pd.DataFrame.from_records(rows, columns=["ts"] + selected)
+        data.index = pd.DatetimeIndex(
+            pd.to_datetime(data.pop("ts"), utc=True), name=INDEX_NAME
+        )
+        for column in selected:
+            dtype = known[column]
+            if dtype.startswith("datetime64"):
+                data[column] = pd.to_datetime(data[column], utc=True)
+                continue
+            try:
+                data[column] = data[column].astype(dtype)
+            except (TypeError, ValueError):
+                # NULL 이 있는 정수 컬럼 등은 읽은 그대로 둔다.
+                pass
+        return data
+
+    async def latest_timestamp(self) -> Optional[pd.Timestamp]:
+        def read(conn: sqlite3.Connection) -> Optional[int]:
+            return conn.execute(
+                f"SELECT MAX(ts) FROM {ROWS_TABLE} WHERE symbol = ?", (self.key,)
+            ).fetchone()[0]
+
+        value = await asyncio.to_thread(self.database.run, read)
+        return pd.Timestamp(value, tz="UTC") if value is not None else None
+
+    async def delete_before(self, cutoff: pd.Timestamp) -> int:
+        def delete(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(
+                f"DELETE FROM {ROWS_TABLE} WHERE symbol = ? AND ts < ?",
+                (self.key, int(pd.Timestamp(cutoff).value)),
+            )
+            return cursor.rowcount
+
+        return await asyncio.to_thread(self.database.run, delete)
+
+    async def count(self) -> int:
+        def read(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM {ROWS_TABLE} WHERE symbol = ?", (self.key,)
+            ).fetchone()[0]
+
+        return await asyncio.to_thread(self.database.run, read)
@@ -0,0 +1,554 @@
+import os
+import shutil
+import asyncio
+import aiofiles
+import threading
+from abc import ABCMeta, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from modules.data.compression import (
+    COMPRESSED_CONTENT_TYPES,
+    compress_object,
+    validate_object_compression,
+)
+from modules.data.disk_cache import (
+    DEFAULT_DISK_CACHE_BYTES,
+    DiskCache,
+    open_disk_cache,
+)
+from modules.data.gcs_client import GZIP_CONTENT_TYPES, shared_gcs_client
+from modules.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# chunk 파일을 저장하는 object storage. "sqlite" 는 chunk 파일 대신 row 단위로 저장한다.
+OBJECT_STORAGE_TYPES = ("local", "gcs", "memory")
+STORAGE_TYPES = OBJECT_STORAGE_TYPES + ("sqlite",)
+
+
+def validate_storage_type(storage_type: str) -> str:
+    if storage_type not in STORAGE_TYPES:
+        raise ValueError(
+            f"Unsupported storage type: {storage_type}. "
+            f"Choose one of {list(STORAGE_TYPES)}"
+        )
+    return storage_type
+
+
+class StorageBackend(metaclass=ABCMeta):
+    """
+    Object storage under DataPipeline's chunk files and manifest.
+    Paths are full object paths (base_path joined with the file name).
+    """
+
+    # 파일 끝에 bytes 를 이어 쓸 수 있는지 (csv chunk 의 in-place append)
+    supports_append = False
+    # 프로세스 간 fcntl file lock 을 쓸 수 있는지
+    supports_file_lock = False
+    # version 이 맞을 때만 쓰는 write_bytes_if 를 지원하는지 (host 간 경쟁 감지)
+    supports_conditional_write = False
+
+    @abstractmethod
+    def join(self, base_path: str, file_name: str) -> str:
+        pass
+
+    @abstractmethod
+    def cache_key(self, path: str) -> str:
+        pass
+
+    def prepare(self, base_path: str):
+        """
+        Called once per pipeline before anything is stored under base_path
+        """
+
+    @abstractmethod
+    async def exists(self, path: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def read_bytes(
+        self,
+        path: str,
+        generation: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """
+        Object content, None if it does not exist.
+        generation pins the version when it is already known, size limits the
+        read to the first bytes.
+        """
+
+    @abstractmethod
+    async def version(self, path: str) -> Optional[str]:
+        """
+        Cheap version token of an object, None if it does not exist
+        """
+
+    async def read_versioned(self, path: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Object content with the version it was read at, (None, None) if it
+        does not exist. The version is only known with supports_conditional_write.
+        """
+        return await self.read_bytes(path), None
+
+    @abstractmethod
+    async def write_bytes(self, path: str, content: bytes, content_type: str):
+        """
+        Replace the object atomically
+        """
+
+    async def write_bytes_if(
+        self, path: str, content: bytes, content_type: str, version: str
+    ) -> str:
+        """
+        Replace the object only if it is still at version ("0": it does not
+        exist yet), else raise PreconditionFailedError. Returns the new version.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support conditional writes"
+        )
+
+    async def append_bytes(self, path: str, content: bytes, offset: int):
+        """
+        Cut the object at offset and append content (only if supports_append)
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support append")
+
+    @abstractmethod
+    async def delete(self, path: str):
+        pass
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        """
+        Delete every object below prefix. Returns the deleted paths if known.
+        """
+
+    @abstractmethod
+    async def list_files(self, base_path: str) -> List[str]:
+        """
+        Every object below base_path, relative to it ("2024/01.g3.parquet")
+        """
+
+    async def list_versions(self, base_path: str) -> Dict[str, str]:
+        """
+        Version of every object below base_path from one listing, keyed like
+        list_files(). Empty if the storage cannot read by version.
+        """
+        return {}
+
+    async def close(self):
+        pass
+
+
+def _fsync_directory(path: str):
+    """
+    Persist the directory entry of a rename. Not possible on every platform
+    (Windows cannot open directories), there it is skipped.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _replace_durably(path: str, content: bytes):
+    """
+    Write to a temporary file, fsync it, rename it over path and fsync the
+    directory, so a crash leaves either the old or the new content in place.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory or ".")
+
+
+class LocalStorage(StorageBackend):
+    supports_append = True
+    supports_file_lock = True
+
+    def join(self, base_path: str, file_name: str) -> str:
+        return os.path.join(base_path, file_name)
+
+    def cache_key(self, path: str) -> str:
+        return os.path.abspath(path)
+
+    def prepare(self, base_path: str):
+        os.makedirs(base_path, exist_ok=True)
+
+    async def exists(self, path: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, path)
+
+    async def read_bytes(
+        self,
+        path: str,
+        generation: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> Optional[bytes]:
+        try:
+            async with aiofiles.open(path, mode="rb") as f:
+                return await f.read(-1 if size is None else size)
+        except FileNotFoundError:
+            return None
+
+    async def version(self, path: str) -> Optional[str]:
+        try:
+            stat = await asyncio.to_thread(os.stat, path)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    async def write_bytes(self, path: str, content: bytes, content_type: str):
+        await asyncio.to_thread(_replace_durably, path, content)
+
+    async def append_bytes(self, path: str, content: bytes, offset: int):
+        # 이전에 실패한 append 가 남긴 꼬리는 잘라낸다.
+        await asyncio.to_thread(os.truncate, path, offset)
+        async with aiofiles.open(path, mode="ab") as f:
+            await f.write(content)
+            await f.flush()
+            # manifest 가 이 bytes 를 가리키기 전에 disk 에 기록한다.
+            await asyncio.to_thread(os.fsync, f.fileno())
+
+    async def delete(self, path: str):
+        os.remove(path)
+
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        await asyncio.to_thread(shutil.rmtree, prefix, True)
+        return []
+
+    async def list_files(self, base_path: str) -> List[str]:
+        def walk() -> List[str]:
+            files = []
+            for root, _, names in os.walk(base_path):
+                for name in names:
+                    rel = os.path.relpath(os.path.join(root, name), base_path)
+                    files.append(rel.replace(os.sep, "/"))
+            return files
+
+        return await asyncio.to_thread(walk)
+
+
+class GCSStorage(StorageBackend):
+    """
+    GCS bucket over the shared async client. With a disk_cache, downloads are
+    kept on local disk by blob name and generation; a read then costs one
+    metadata request (none if the generation is already known) and downloads
+    only blobs that changed.
+    """
+
+    supports_conditional_write = True
+
+    def __init__(
+        self, bucket_name: Optional[str], disk_cache: Optional[DiskCache] = None
+    ):
+        if not bucket_name:
+            raise ValueError("Bucket name must be provided for GCS storage")
+        self.bucket_name = bucket_name
+        self.client = shared_gcs_client(bucket_name)
+        self.disk_cache = disk_cache
+
+    def join(self, base_path: str, file_name: str) -> str:
+        return f"{base_path}/{file_name}"
+
+    def cache_key(self, path: str) -> str:
+        return f"gs://{self.bucket_name}/{path}"
+
+    async def exists(self, path: str) -> bool:
+        return await self.client.get_metadata(path) is not None
+
+    async def read_bytes(
+        self,
+        path: str,
+        generation: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> Optional[bytes]:
+        if self.disk_cache is not None:
+            return await self._read_through_cache(path, generation)
+        # 없는 object 는 404 로 알 수 있으므로 exists 요청을 따로 하지 않는다.
+        return await self.client.download(path, generation)
+
+    async def _read_through_cache(
+        self, path: str, generation: Optional[str]
+    ) -> Optional[bytes]:
+        if generation is None:
+            # 내려받기 전에 metadata 요청 한 번으로 현재 generation 확인
+            generation = await self.version(path)
+            if generation is None:
+                return None
+
+        key = self.cache_key(path)
+        content = await self.disk_cache.get(key, generation)
+        if content is not None:
+            return content
+
+        content = await self.client.download(path, generation)
+        if content is not None:
+            await self.disk_cache.put(key, generation, content)
+        return content
+
+    async def version(self, path: str) -> Optional[str]:
+        metadata = await self.client.get_metadata(path)
+        return str(metadata["generation"]) if metadata is not None else None
+
+    async def list_versions(self, base_path: str) -> Dict[str, str]:
+        prefix = self.join(base_path, "")
+        return {
+            item["name"][len(prefix) :]: str(item["generation"])
+            for item in await self.client.list_objects(prefix)
+        }
+
+    async def read_versioned(self, path: str) -> Tuple[Optional[bytes], Optional[str]]:
+        # manifest 처럼 매번 바뀌는 object 는 disk cache 없이 한 요청으로 읽는다.
+        result = await self.client.download_with_generation(path)
+        return result if result is not None else (None, None)
+
+    async def write_bytes(self, path: str, content: bytes, content_type: str):
+        await self._upload(path, content, content_type)
+
+    async def write_bytes_if(
+        self, path: str, content: bytes, content_type: str, version: str
+    ) -> str:
+        return await self._upload(path, content, content_type, int(version))
+
+    async def _upload(
+        self,
+        path: str,
+        content: bytes,
+        content_type: str,
+        if_generation_match: Optional[int] = None,
+    ) -> Optional[str]:
+        # csv, manifest 는 gzip 으로 저장한다. (읽을 때 GCS/httpx 가 풀어 준다)
+        encoding = "gzip" if content_type in GZIP_CONTENT_TYPES else None
+        metadata = await self.client.upload(
+            path, content, content_type, encoding, if_generation_match
+        )
+        generation = metadata.get("generation")
+        if generation is None:
+            return None
+        if self.disk_cache is not None:
+            # 방금 올린 내용은 다시 내려받지 않도록 바로 cache 에 넣는다.
+            await self.disk_cache.put(self.cache_key(path), str(generation), content)
+        return str(generation)
+
+    async def delete(self, path: str):
+        deleted = await self.client.delete(path)
+        if self.disk_cache is not None:
+            await self.disk_cache.invalidate(self.cache_key(path))
+        if not deleted:
+            raise FileNotFoundError(path)
+
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        names = [
+            item["name"] for item in await self.client.list_objects(f"{prefix}/")
+        ]
+        await asyncio.gather(*[self.client.delete(name) for name in names])
+        if self.disk_cache is not None:
+            for name in names:
+                await self.disk_cache.invalidate(self.cache_key(name))
+        return names
+
+    async def list_files(self, base_path: str) -> List[str]:
+        return list(await self.list_versions(base_path))
+
+
+class MemoryStorage(StorageBackend):
+    """
+    Process local object store. Keeps the pipeline logic measurable without
+    any disk or network I/O (benchmarks, dry runs).
+    """
+
+    supports_append = True
+
+    def __init__(self):
+        self._objects: Dict[str, Tuple[int, bytes]] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def join(self, base_path: str, file_name: str) -> str:
+        return f"{base_path}/{file_name}"
+
+    def cache_key(self, path: str) -> str:
+        return f"memory://{path}"
+
+    def _put(self, path: str, content: bytes):
+        with self._lock:
+            self._version += 1
+            self._objects[path] = (self._version, content)
+
+    async def exists(self, path: str) -> bool:
+        return path in self._objects
+
+    async def read_bytes(
+        self,
+        path: str,
+        generation: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> Optional[bytes]:
+        stored = self._objects.get(path)
+        if stored is None:
+            return None
+        return stored[1] if size is None else stored[1][:size]
+
+    async def version(self, path: str) -> Optional[str]:
+        stored = self._objects.get(path)
+        return str(stored[0]) if stored is not None else None
+
+    async def write_bytes(self, path: str, content: bytes, content_type: str):
+        self._put(path, bytes(content))
+
+    async def append_bytes(self, path: str, content: bytes, offset: int):
+        stored = self._objects.get(path)
+        if stored is None:
+            raise FileNotFoundError(path)
+        self._put(path, stored[1][:offset] + content)
+
+    async def delete(self, path: str):
+        with self._lock:
+            if self._objects.pop(path, None) is None:
+                raise FileNotFoundError(path)
+
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        with self._lock:
+            removed = [path for path in self._objects if path.startswith(f"{prefix}/")]
+            for path in removed:
+                del self._objects[path]
+        return removed
+
+    async def list_files(self, base_path: str) -> List[str]:
+        prefix = self.join(base_path, "")
+        return [
+            path[len(prefix) :] for path in list(self._objects) if path.startswith(prefix)
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+
+
+class CompressedStorage(StorageBackend):
+    """
+    Compresses every object written to another backend (zstd or gzip).
+    The compressed frame carries its own marker (magic bytes, plus an
+    application/zstd or application/gzip content type); DataPipeline decodes
+    by that marker on every read, so old and new objects load side by side
+    whatever the current setting is.
+    """
+
+    # 압축된 object 는 끝에 이어 쓸 수 없으므로 append 는 delta object 로 한다.
+    supports_append = False
+
+    def __init__(self, inner: StorageBackend, compression: str):
+        self.inner = inner
+        self.compression = validate_object_compression(compression)
+        self.supports_file_lock = inner.supports_file_lock
+        self.supports_conditional_write = inner.supports_conditional_write
+
+    @property
+    def disk_cache(self) -> Optional[DiskCache]:
+        return getattr(self.inner, "disk_cache", None)
+
+    def join(self, base_path: str, file_name: str) -> str:
+        return self.inner.join(base_path, file_name)
+
+    def cache_key(self, path: str) -> str:
+        return self.inner.cache_key(path)
+
+    def prepare(self, base_path: str):
+        self.inner.prepare(base_path)
+
+    async def exists(self, path: str) -> bool:
+        return await self.inner.exists(path)
+
+    async def read_bytes(
+        self,
+        path: str,
+        generation: Optional[str] = None,
+        size: Optional[int] = None,
+    ) -> Optional[bytes]:
+        # 압축된 object 는 크기를 잘라 읽을 수 없다.
+        return await self.inner.read_bytes(path, generation)
+
+    async def version(self, path: str) -> Optional[str]:
+        return await self.inner.version(path)
+
+    async def read_versioned(self, path: str) -> Tuple[Optional[bytes], Optional[str]]:
+        return await self.inner.read_versioned(path)
+
+    async def write_bytes(self, path: str, content: bytes, content_type: str):
+        compressed = await asyncio.to_thread(compress_object, content, self.compression)
+        await self.inner.write_bytes(
+            path, compressed, COMPRESSED_CONTENT_TYPES[self.compression]
+        )
+
+    async def write_bytes_if(
+        self, path: str, content: bytes, content_type: str, version: str
+    ) -> str:
+        compressed = await asyncio.to_thread(compress_object, content, self.compression)
+        return await self.inner.write_bytes_if(
+            path, compressed, COMPRESSED_CONTENT_TYPES[self.compression], version
+        )
+
+    async def delete(self, path: str):
+        await self.inner.delete(path)
+
+    async def delete_prefix(self, prefix: str) -> List[str]:
+        return await self.inner.delete_prefix(prefix)
+
+    async def list_files(self, base_path: str) -> List[str]:
+        return await self.inner.list_files(base_path)
+
+    async def list_versions(self, base_path: str) -> Dict[str, str]:
+        return await self.inner.list_versions(base_path)
+
+    async def close(self):
+        await self.inner.close()
+
+
+# storage_type="memory" 인 pipeline 들이 공유하는 저장소 (다시 열어도 데이터가 남는다)
+shared_memory_storage = MemoryStorage()
+
+
+def create_storage(
+    storage_type: str,
+    bucket_name: Optional[str] = None,
+    disk_cache_dir: Optional[str] = None,
+    disk_cache_bytes: int = DEFAULT_DISK_CACHE_BYTES,
+    object_compression: Optional[str] = None,
+) -> StorageBackend:
+    """
+    Object storage for a storage_type ("sqlite" stores its chunk-less rows
+    elsewhere and has no object storage). disk_cache_dir puts a local disk
+    cache in front of GCS, object_compression ("zstd", "gzip") compresses
+    every object written.
+    """
+    if storage_type == "local":
+        storage = LocalStorage()
+    elif storage_type == "gcs":
+        disk_cache = None
+        if disk_cache_dir:
+            disk_cache = open_disk_cache(disk_cache_dir, disk_cache_bytes)
+        storage = GCSStorage(bucket_name, disk_cache)
+    elif storage_type == "memory":
+        storage = shared_memory_storage
+    else:
+        raise ValueError(f"Unsupported object storage type: {storage_type}")
+    if object_compression is not None:
+        storage = CompressedStorage(storage, object_compression)
+    return storage
@@ -10,8 +10,13 @@ from datetime import datetime, timedelta
 from concurrent.futures import ProcessPoolExecutor
 from functools import reduce
 from typing import List, Optional, Dict, Any, Callable
+from modules.data.core import DataPipeline
+from modules.data.gcs_client import close_gcs_clients
 from modules.data.pipeline import ProviderDataPipeline, DataProvider
+from modules.data.panel import PANEL_DIR, PanelPipeline
 from modules.data.providers.provider_factories import PROVIDER_FACTORIES
+from modules.data.rate_limit import configure_rate_limit, get_rate_limit_stats
+from modules.data.scheduler import wait_for_stop
 from modules.logger import get_logger
 
 
@@ -119,13 +124,13 @@ async def read_config(config_path: str) -> Dict[str, Any]:
         storage_type = new_config[CONFIG_KEY_DATA_PIPELINES].get(
             "storage_type", "local"
         )
-        if storage_type == "gcs":
-            # GCS의 경우 base_path를 그대로 사용
+        if storage_type in ("gcs", "memory"):
+            # GCS, memory 의 경우 base_path를 그대로 사용
             new_config[CONFIG_KEY_DATA_PIPELINES][CONFIG_KEY_BASE_PATH] = new_config[
                 CONFIG_KEY_DATA_PIPELINES
             ][CONFIG_KEY_BASE_PATH]
-        elif storage_type == "local":
-            # local의 경우 project_root와 결합
+        elif storage_type in ("local", "sqlite"):
+            # local, sqlite 의 경우 project_root와 결합
             new_config[CONFIG_KEY_DATA_PIPELINES][CONFIG_KEY_BASE_PATH] = (
                 os.path.normpath(
                     os.path.join(
@@ -144,6 +149,20 @@ async def read_config(config_path: str) -> Dict[str, Any]:
             project_root, "data"
         )
 
+    # sqlite database 파일 경로 (없으면 base_path/ohlcv.sqlite)
+    database_path = new_config[CONFIG_KEY_DATA_PIPELINES].get("database_path")
+    if database_path:
+        new_config[CONFIG_KEY_DATA_PIPELINES]["database_path"] = os.path.normpath(
+            os.path.join(project_root, database_path)
+        )
+
+    # gcs 를 읽을 때 쓰는 local disk cache 경로
+    disk_cache_dir = new_config[CONFIG_KEY_DATA_PIPELINES].get("disk_cache_dir")
+    if disk_cache_dir:
+        new_config[CONFIG_KEY_DATA_PIPELINES]["disk_cache_dir"] = os.path.normpath(
+            os.path.join(project_root, os.path.expanduser(disk_cache_dir))
+        )
+
     # bucket_name 처리 (GCS를 위해 추가)
     if storage_type == "gcs":
         bucket_name = new_config[CONFIG_KEY_DATA_PIPELINES].get("bucket_name")
@@ -214,6 +233,16 @@ async def create_data_providers(config: Dict[str, Any]) -> List[DataProvider]:
 
     factory = PROVIDER_FACTORIES[provider_class.__name__]
 
+    # 같은 provider class 의 모든 pipeline 이 함께 지키는 호출 제한
+    rate_limit = data_pipelines.get("rate_limit")
+    if rate_limit:
+        configure_rate_limit(
+            provider_class.__name__,
+            requests_per_second=rate_limit.get("requests_per_second"),
+            burst=rate_limit.get("burst"),
+            max_concurrent=rate_limit.get("max_concurrent"),
+        )
+
     providers = []
     for stock in stocks:
         symbol = stock["symbol"]
@@ -230,18 +259,34 @@ async def create_data_providers(config: Dict[str, Any]) -> List[DataProvider]:
 
 
 async def load_data(
-    dp: ProviderDataPipeline, n_days_before: Optional[int] = None
+    dp: ProviderDataPipeline,
+    n_days_before: Optional[int] = None,
+    freq: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    compact: bool = False,
 ) -> Optional[pd.DataFrame]:
+    """
+    freq 를 지정하면 저장된 rollup (5min, 1h, 1D ...) 에서 읽는다.
+    compact=True 이면 float32/int32, epoch(ns) index 로 메모리를 줄여서 돌려준다.
+    """
     logger.info(f"Loading data for symbol: {dp.data_provider.symbol}")
     try:
-        if n_days_before is not None:
+        if freq is not None:
+            start_date = None
+            if n_days_before is not None:
+                start_date = datetime.now(tz=pytz.UTC) - timedelta(days=n_days_before)
+            logger.debug(f"Loading {freq} rollup from {start_date or 'the beginning'}")
+            data = await dp.get_rollup(
+                freq, start_date, columns=columns, compact=compact
+            )
+        elif n_days_before is not None:
             end_date = datetime.now(tz=pytz.UTC)
             start_date = end_date - timedelta(days=n_days_before)
             logger.debug(f"Loading data from {start_date} to {end_date}")
-            data = await dp.get_data_range(start_date, end_date)
+            data = await dp.get_data_range(start_date, end_date, columns, compact)
         else:
             logger.debug("Loading all available data")
-            data = await dp.get_all_data()
+            data = await dp.get_all_data(columns, compact)
 
         if data.empty:
             logger.warning(f"No data found for symbol: {dp.data_provider.symbol}")
@@ -257,13 +302,18 @@ async def process_data(
     dp: ProviderDataPipeline,
     n_days_before: Optional[int] = None,
     read_mode: bool = False,
+    freq: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    compact: bool = False,
 ) -> Optional[Dict[str, pd.DataFrame]]:
     symbol = dp.data_provider.symbol
     logger.info(f"Processing data for symbol: {symbol}")
     try:
         if not read_mode:
             await dp.update_to_latest()
-        data = await load_data(dp, n_days_before)
+        data = await load_data(
+            dp, n_days_before, freq=freq, columns=columns, compact=compact
+        )
         if data is not None:
             logger.info(f"Loaded data for {symbol}:")
             logger.info(f"Shape: {data.shape}")
@@ -275,7 +325,65 @@ async def process_data(
         return None
 
 
-async def create_pipelines(config: Dict[str, Any]) -> List[ProviderDataPipeline]:
+def storage_options(data_pipelines_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Object storage options of the config: object_compression and the gcs disk
+    cache (disk_cache_dir / disk_cache_bytes)
+    """
+    options = {
+        "object_compression": data_pipelines_config.get("object_compression"),
+        "disk_cache_dir": data_pipelines_config.get("disk_cache_dir"),
+    }
+    if data_pipelines_config.get("disk_cache_bytes"):
+        options["disk_cache_bytes"] = int(data_pipelines_config["disk_cache_bytes"])
+    return options
+
+
+async def create_panel_store(config: Dict[str, Any]) -> Optional[PanelPipeline]:
+    """
+    Shared store of all symbols of the config, None unless panel_store is enabled
+    """
+    data_pipelines_config = config[CONFIG_KEY_DATA_PIPELINES]
+    if not data_pipelines_config.get("panel_store", False):
+        return None
+
+    base_path = data_pipelines_config[CONFIG_KEY_BASE_PATH]
+    storage_type = data_pipelines_config.get("storage_type", "local")
+    if storage_type == "gcs":
+        panel_path = f"{base_path}/{PANEL_DIR}"
+    else:
+        panel_path = os.path.join(base_path, PANEL_DIR)
+
+    return PanelPipeline(
+        base_path=panel_path,
+        storage_type=storage_type,
+        bucket_name=data_pipelines_config.get("bucket_name"),
+        file_format=data_pipelines_config.get("panel_file_format", "parquet"),
+        partition=data_pipelines_config.get("partition"),
+        max_concurrent_reads=data_pipelines_config.get("max_concurrent_reads", 8),
+        **storage_options(data_pipelines_config),
+    )
+
+
+async def load_panel(
+    panel: PanelPipeline,
+    symbols: Optional[List[str]] = None,
+    n_days_before: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    start_date = None
+    if n_days_before is not None:
+        start_date = datetime.now(tz=pytz.UTC) - timedelta(days=n_days_before)
+    try:
+        return await panel.get_panel(symbols, start_date, None, columns)
+    except Exception as e:
+        logger.error(f"Error loading panel from {panel.base_path}: {e}")
+        return pd.DataFrame()
+
+
+async def create_pipelines(
+    config: Dict[str, Any], panel_store: Optional[PanelPipeline] = None
+) -> List[ProviderDataPipeline]:
     # FIXME 이 부분부터 전부 변경해야 함...
     # FIXME 투웰브 데이터 포함해서 진행하든지...
     logger.info("Creating data pipelines")
@@ -284,6 +392,14 @@ async def create_pipelines(config: Dict[str, Any]) -> List[ProviderDataPipeline]
     base_path = data_pipelines_config[CONFIG_KEY_BASE_PATH]
     storage_type = data_pipelines_config.get("storage_type", "local")
     bucket_name = data_pipelines_config.get("bucket_name")
+    file_format = data_pipelines_config.get("file_format", "csv")
+    compression = data_pipelines_config.get("compression")
+    max_concurrent_reads = data_pipelines_config.get("max_concurrent_reads", 8)
+    partition = data_pipelines_config.get("partition")
+    write_buffer_rows = data_pipelines_config.get("write_buffer_rows", 0)
+    write_buffer_seconds = data_pipelines_config.get("write_buffer_seconds", 300)
+    rollups = data_pipelines_config.get("rollups")
+    database_path = data_pipelines_config.get("database_path")
 
     pipelines = []
     for provider in providers:
@@ -293,6 +409,17 @@ async def create_pipelines(config: Dict[str, Any]) -> List[ProviderDataPipeline]
             base_path=symbol_base_path,
             storage_type=storage_type,
             bucket_name=bucket_name,
+            file_format=file_format,
+            compression=compression,
+            max_concurrent_reads=max_concurrent_reads,
+            partition=partition,
+            write_buffer_rows=write_buffer_rows,
+            write_buffer_seconds=write_buffer_seconds,
+            panel_store=panel_store,
+            rollups=rollups,
+            database_path=database_path,
+            market_hours=data_pipelines_config.get("market_hours", True),
+            **storage_options(data_pipelines_config),
         )
         pipelines.append(pipeline)
         logger.debug(f"Created pipeline for symbol: {provider.symbol}")
@@ -306,10 +433,14 @@ async def parallel_process(
     items: List[Any],
     n_days_before: Optional[int] = None,
     read_mode: bool = False,
+    **kwargs,
 ) -> List[Dict[str, pd.DataFrame]]:
     logger.info("Starting parallel processing")
     results = []
-    tasks = [asyncio.create_task(func(item, n_days_before, read_mode=read_mode)) for item in items]
+    tasks = [
+        asyncio.create_task(func(item, n_days_before, read_mode=read_mode, **kwargs))
+        for item in items
+    ]
 
     completed, _ = await asyncio.wait(tasks)
 
@@ -327,10 +458,51 @@ async def parallel_process(
     return results
 
 
+async def compact_pipelines(
+    pipelines: List[DataPipeline],
+    stop_event: asyncio.Event,
+    interval: float,
+    target_bytes: Optional[int] = None,
+):
+    """
+    Background compaction of every pipeline, one at a time so it stays a low
+    priority companion of the realtime loop.
+    """
+    kwargs = {"target_bytes": target_bytes} if target_bytes else {}
+    while not stop_event.is_set():
+        for pipeline in pipelines:
+            if stop_event.is_set():
+                break
+            try:
+                await pipeline.compact(**kwargs)
+            except Exception as e:
+                logger.error(
+                    f"Compaction of {pipeline.base_path} failed: {e}", exc_info=True
+                )
+        if await wait_for_stop(stop_event, interval):
+            break
+
+
 async def run_data_pipeline(config: Dict[str, Any]):
-    pipelines: List[ProviderDataPipeline] = await create_pipelines(config)
+    panel_store = await create_panel_store(config)
+    pipelines: List[ProviderDataPipeline] = await create_pipelines(
+        config, panel_store=panel_store
+    )
+    data_pipelines_config = config[CONFIG_KEY_DATA_PIPELINES]
+    compaction_interval = data_pipelines_config.get("compaction_interval")
 
     stop_event = asyncio.Event()
+    compaction_task = None
+    if compaction_interval:
+        stores = pipelines + ([panel_store] if panel_store is not None else [])
+        compaction_task = asyncio.create_task(
+            compact_pipelines(
+                stores,
+                stop_event,
+                compaction_interval,
+                data_pipelines_config.get("target_chunk_bytes"),
+            )
+        )
 
     try:
         # Continuous update (including initial fetch)
@@ -363,9 +535,17 @@ async def run_data_pipeline(config: Dict[str, Any]):
         # Wait for all tasks to complete
         if "update_tasks" in locals():
             await asyncio.gather(*update_tasks, return_exceptions=True)
+        if compaction_task is not None:
+            await asyncio.gather(compaction_task, return_exceptions=True)
         # Close all pipelines
         close_tasks = [pipeline.close() for pipeline in pipelines]
         await asyncio.gather(*close_tasks, return_exceptions=True)
+        # 모든 symbol 의 row 가 들어온 뒤에 통합 저장소를 닫는다. (buffer flush)
+        if panel_store is not None:
+            await panel_store.close()
+        await close_gcs_clients()
+        for name, stats in get_rate_limit_stats().items():
+            logger.info(f"Rate limit stats of {name}: {stats}")
         logger.info("All data pipelines closed")
 
 
@@ -431,6 +611,28 @@ def process_wrapper(args):
     return process_dataframe(*args)
 
 
+def at_frequency(index: pd.DatetimeIndex, freq: str) -> bool:
+    """
+    Whether index has at most one row per freq bucket (e.g. bars read from the
+    freq rollup), so resampling would only relabel the rows.
+    """
+    try:
+        return index.floor(freq).is_unique
+    except ValueError:
+        # 1W, 1ME 처럼 고정 길이가 아닌 freq 나 잘못된 freq
+        return False
+
+
+def resample_last(data: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Last value per freq bucket, gaps filled. Rows already at freq are only
+    filled, keeping their stamps (rollup bars sit at the session close).
+    """
+    if at_frequency(data.index, freq):
+        return data.sort_index().bfill().ffill()
+    return data.resample(freq).last().bfill().ffill().sort_index()
+
+
 def prepare_data(
     dp_result: List[Dict[str, Optional[pd.DataFrame]]],
     freq: str = "1D",
@@ -465,7 +667,7 @@ def prepare_data(
             logger.info("Converted index to datetime format")
 
         try:
-            all_data = all_data.resample(freq).last().bfill().ffill().sort_index()
+            all_data = resample_last(all_data, freq)
         except ValueError as ve:
             logger.error(f"Invalid frequency '{freq}' provided: {ve}")
             return pd.DataFrame()
@@ -485,6 +687,47 @@ def prepare_data(
         return pd.DataFrame()
 
 
+async def prepare_pipeline_data(
+    pipelines: List[ProviderDataPipeline],
+    freq: str = "1D",
+    value: str = "close",
+    n_days_before: Optional[int] = None,
+    read_mode: bool = True,
+) -> pd.DataFrame:
+    """
+    prepare_data over pipelines, reading their freq rollups through
+    load_data(freq=...) instead of the full 1m history.
+    """
+    dp_result = await parallel_process(
+        process_data,
+        pipelines,
+        n_days_before,
+        read_mode=read_mode,
+        freq=freq,
+        columns=[value],
+    )
+    return prepare_data(dp_result, freq, value)
+
+
+def prepare_panel(
+    panel: pd.DataFrame, freq: str = "1D", value: str = "close"
+) -> pd.DataFrame:
+    """
+    prepare_data for a PanelPipeline.get_panel result: the value field is
+    already a timestamp x symbol matrix, so only resampling is left.
+    """
+    logger.info(f"Preparing panel data with frequency: {freq}")
+    if panel.empty or value not in panel.columns.get_level_values("field"):
+        logger.error(f"No '{value}' data in the panel")
+        return pd.DataFrame()
+
+    try:
+        return resample_last(panel[value], freq)
+    except ValueError as ve:
+        logger.error(f"Invalid frequency '{freq}' provided: {ve}")
+        return pd.DataFrame()
+
+
 def create_symbol_mapper(configs: List[Dict]) -> Dict[str, str]:
     symbol_mapper = {}
     for config in configs:
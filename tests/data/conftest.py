@@ -0,0 +1,20 @@
+import pytest
+from modules.data.pipeline import ProviderDataPipeline
+
+
+@pytest.fixture(params=["csv", "parquet", "feather"])
+def file_format(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return tmp_path / "AAPL"
+
+
+@pytest.fixture
+def pipeline(store_path, file_format):
+    # chunk cache 를 끄고 매번 파일에서 읽는다.
+    return ProviderDataPipeline(
+        None, str(store_path), chunk_size=100, file_format=file_format, chunk_cache=None
+    )
@@ -0,0 +1,77 @@
+import httpx
+from urllib.parse import unquote
+
+
+class FakeGCS:
+    """
+    In-memory bucket behind the JSON API routes the client uses
+    """
+
+    def __init__(self, generation_header: bool = True):
+        # False: x-goog-generation 을 보내지 않는 emulator 처럼
+        self.generation_header = generation_header
+        self.objects = {}  # name -> (content as stored, metadata)
+        self.generation = 0
+        self.uploads = []  # 받은 upload 요청 (params, body)
+        self.downloads = []  # 내려준 object 이름
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = unquote(request.url.path)
+        params = dict(request.url.params)
+        if request.method == "POST" and path.startswith("/upload/"):
+            body = await request.aread()
+            self.uploads.append((params, body))
+            return self._upload(request, params, body)
+        if path.endswith("/o"):
+            return self._list(params.get("prefix", ""))
+
+        name = path.split("/o/", 1)[1]
+        if name not in self.objects:
+            return httpx.Response(404, json={"error": {"code": 404}})
+        content, metadata = self.objects[name]
+        if request.method == "DELETE":
+            del self.objects[name]
+            return httpx.Response(204)
+        if params.get("alt") != "media":
+            return httpx.Response(200, json=metadata)
+        if params.get("generation", metadata["generation"]) != metadata["generation"]:
+            return httpx.Response(404, json={"error": {"code": 404}})
+        self.downloads.append(name)
+        headers = {"Content-Type": metadata["contentType"]}
+        if self.generation_header:
+            headers["x-goog-generation"] = metadata["generation"]
+        if "contentEncoding" in metadata:
+            # Accept-Encoding: gzip 이면 GCS 는 압축된 그대로 보낸다.
+            headers["Content-Encoding"] = metadata["contentEncoding"]
+        return httpx.Response(200, content=content, headers=headers)
+
+    def _upload(self, request, params, body) -> httpx.Response:
+        name = params["name"]
+        current = self.objects.get(name)
+        expected = params.get("ifGenerationMatch")
+        if expected is not None:
+            generation = current[1]["generation"] if current else "0"
+            if generation != expected:
+                return httpx.Response(412, json={"error": {"code": 412}})
+        self.generation += 1
+        metadata = {
+            "name": name,
+            "generation": str(self.generation),
+            "size": str(len(body)),
+            "contentType": request.headers["Content-Type"],
+        }
+        if "contentEncoding" in params:
+            metadata["contentEncoding"] = params["contentEncoding"]
+        self.objects[name] = (body, metadata)
+        return httpx.Response(200, json=metadata)
+
+    def _list(self, prefix: str) -> httpx.Response:
+        items = [
+            metadata
+            for name, (_, metadata) in sorted(self.objects.items())
+            if name.startswith(prefix)
+        ]
+        return httpx.Response(200, json={"items": items})
+
+    def names(self, prefix: str = "") -> list:
+        return sorted(name for name in self.objects if name.startswith(prefix))
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+
+def ohlcv(n: int, start: str = "2024-01-02 14:30", freq: str = "1min", seed: int = 0):
+    """
+    n OHLCV bars in UTC with random values
+    """
+    index = pd.date_range(start, periods=n, freq=freq, tz="UTC", name="date")
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.random(n).cumsum()
+    return pd.DataFrame(
+        {
+            "open": close - rng.random(n),
+            "high": close + rng.random(n),
+            "low": close - 1 - rng.random(n),
+            "close": close,
+            "volume": rng.integers(1, 1000, n),
+        },
+        index=index,
+    )
+
+
+def stored_files(path) -> list:
+    """
+    Data files below path relative to it, manifest and lock files excluded
+    """
+    return sorted(
+        str(p.relative_to(path))
+        for p in path.rglob("*")
+        if p.is_file() and not p.name.startswith("_") and not p.name.endswith(".lock")
+    )
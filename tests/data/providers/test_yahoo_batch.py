@@ -0,0 +1,168 @@
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from modules.data.providers import yahoo
+from modules.data.providers.yahoo import ET_TIMEZONE, YahooFinance, YahooFinanceBatch
+
+PARAMS = {"interval": "1m", "start": "2024-07-01", "end": "2024-07-02"}
+
+
+def bars(n: int) -> pd.DataFrame:
+    """
+    What yf.Ticker(symbol).history returns for n one-minute bars
+    """
+    index = pd.date_range(
+        "2024-07-01 09:30", periods=n, freq="1min", tz=ET_TIMEZONE, name="Datetime"
+    )
+    return pd.DataFrame(
+        {
+            "Open": 1.0,
+            "High": 2.0,
+            "Low": 0.5,
+            "Close": np.arange(n, dtype=float),
+            "Volume": np.arange(n, dtype="int64"),
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=index,
+    )
+
+
+class FakeDownload:
+    """
+    yf.download stub: each symbol in `frames` gets that many bars, the others
+    are left out of the response like delisted tickers
+    """
+
+    def __init__(self, frames: dict):
+        self.frames = frames
+        self.calls = []
+
+    def __call__(self, tickers, **options):
+        self.calls.append((list(tickers), options))
+        found = {
+            ticker.upper(): bars(self.frames[ticker.upper()])
+            for ticker in tickers
+            if ticker.upper() in self.frames
+        }
+        if not found:
+            return pd.DataFrame()
+        if len(tickers) == 1:
+            return found[tickers[0].upper()]
+        # 여러 종목은 UTC index 의 (Ticker, Price) 컬럼으로 합쳐서 온다.
+        data = pd.concat(
+            found.values(),
+            axis=1,
+            sort=True,
+            keys=found.keys(),
+            names=["Ticker", "Price"],
+        )
+        data.index = data.index.tz_convert("UTC")
+        return data
+
+
+@pytest.fixture
+def download(monkeypatch):
+    fake = FakeDownload({"AAPL": 3, "MSFT": 5})
+    monkeypatch.setattr(yahoo.yf, "download", fake)
+    return fake
+
+
+@pytest.fixture
+def batch():
+    return YahooFinanceBatch(window=0.01)
+
+
+def fetch(batch, symbols, params=PARAMS):
+    async def main():
+        return await asyncio.gather(
+            *(batch.history(symbol, params) for symbol in symbols)
+        )
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_make_one_download(batch, download):
+    aapl, msft = fetch(batch, ["AAPL", "msft"])
+
+    assert len(download.calls) == 1
+    tickers, options = download.calls[0]
+    assert tickers == ["AAPL", "msft"]
+    assert options["group_by"] == "ticker" and options["interval"] == "1m"
+    # 각자 자기 종목의 frame 을 history() 와 같은 모양으로 받는다.
+    pd.testing.assert_frame_equal(aapl, bars(3), check_freq=False)
+    pd.testing.assert_frame_equal(msft, bars(5), check_freq=False)
+
+
+@pytest.mark.parametrize(
+    "symbols",
+    [["AAPL", "BAD"], ["BAD"], ["BAD", "GONE"]],
+    ids=["with-others", "alone", "all-missing"],
+)
+def test_symbol_missing_from_the_response_gets_an_empty_frame(
+    batch, download, symbols
+):
+    frames = fetch(batch, symbols)
+
+    assert len(download.calls) == 1
+    for symbol, frame in zip(symbols, frames):
+        assert frame.empty == (symbol not in download.frames)
+
+
+def test_same_symbol_requested_twice_is_downloaded_once(batch, download):
+    first, second = fetch(batch, ["AAPL", "AAPL"])
+
+    assert download.calls[0][0] == ["AAPL"]
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_full_batch_is_flushed_before_the_window(download):
+    batch = YahooFinanceBatch(window=60, max_symbols=2)
+
+    frames = fetch(batch, ["AAPL", "MSFT"])
+
+    assert [len(frame) for frame in frames] == [3, 5]
+
+
+def test_different_params_are_separate_downloads(batch, download):
+    async def main():
+        return await asyncio.gather(
+            batch.history("AAPL", PARAMS),
+            batch.history("MSFT", {**PARAMS, "prepost": True}),
+        )
+
+    asyncio.run(main())
+
+    assert sorted(tickers for tickers, _ in download.calls) == [["AAPL"], ["MSFT"]]
+
+
+def test_failed_download_fails_every_caller(batch, monkeypatch):
+    def fail(tickers, **options):
+        raise ConnectionError("reset by peer")
+
+    monkeypatch.setattr(yahoo.yf, "download", fail)
+
+    async def main():
+        return await asyncio.gather(
+            batch.history("AAPL", PARAMS),
+            batch.history("MSFT", PARAMS),
+            return_exceptions=True,
+        )
+
+    assert [type(e) for e in asyncio.run(main())] == [ConnectionError] * 2
+
+
+def test_providers_sharing_a_batch(batch, download):
+    providers = [
+        YahooFinance(symbol, "1m", "1d", batch=batch) for symbol in ("AAPL", "BAD")
+    ]
+
+    async def main():
+        return await asyncio.gather(*(p.get_data() for p in providers))
+
+    aapl, bad = asyncio.run(main())
+
+    assert len(download.calls) == 1
+    assert len(aapl) == 3 and str(aapl.index.tz) == "UTC"
+    assert bad.empty
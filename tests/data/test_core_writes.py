@@ -0,0 +1,258 @@
+import asyncio
+import json
+import pandas as pd
+import pytest
+from modules.data.formats import encode_chunk
+from modules.data.manifest import MANIFEST_FILE
+from modules.data.pipeline import ProviderDataPipeline
+from modules.data.utils import compact_pipelines
+from tests.data.helpers import ohlcv, stored_files
+
+
+def read_manifest(path) -> dict:
+    return json.loads((path / MANIFEST_FILE).read_text())
+
+
+def assert_same_rows(actual: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        actual, expected, check_dtype=False, check_freq=False
+    )
+
+
+def test_first_save_writes_generation_named_chunk(pipeline, store_path, file_format):
+    asyncio.run(pipeline._save_new_data(ohlcv(10)))
+
+    manifest = read_manifest(store_path)
+    assert manifest["generation"] == 1
+    assert stored_files(store_path) == [f"chunk0.g1.{file_format}"]
+    assert manifest["chunks"]["0"]["rows"] == 10
+
+
+def test_append_extends_csv_in_place_or_writes_delta(
+    pipeline, store_path, file_format
+):
+    data = ohlcv(15)
+    asyncio.run(pipeline._save_new_data(data.iloc[:10]))
+    asyncio.run(pipeline._save_new_data(data.iloc[10:]))
+
+    manifest = read_manifest(store_path)
+    entry = manifest["chunks"]["0"]
+    assert manifest["generation"] == 2
+    assert entry["rows"] == 15
+    if file_format == "csv":
+        # local csv 는 같은 파일 뒤에 이어 쓴다.
+        assert stored_files(store_path) == ["chunk0.g1.csv"]
+        assert "deltas" not in entry
+    else:
+        # delta 는 그것을 기록하는 manifest 의 generation 으로 이름 짓는다.
+        assert stored_files(store_path) == [
+            f"chunk0.g1.{file_format}",
+            f"chunk0.g2.delta0.{file_format}",
+        ]
+        assert [d["file"] for d in entry["deltas"]] == [
+            f"chunk0.g2.delta0.{file_format}"
+        ]
+        assert entry["deltas"][0]["rows"] == 5
+
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+
+
+def test_deltas_are_compacted_at_max_deltas(store_path):
+    pipeline = ProviderDataPipeline(
+        None, str(store_path), file_format="parquet", max_deltas=3, chunk_cache=None
+    )
+    data = ohlcv(8)
+    asyncio.run(pipeline._save_new_data(data.iloc[:5]))
+    for i in range(5, 8):
+        asyncio.run(pipeline._save_new_data(data.iloc[i : i + 1]))
+
+    entry = read_manifest(store_path)["chunks"]["0"]
+    assert "deltas" not in entry
+    assert stored_files(store_path) == [entry["file"]]
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+
+
+def test_overlapping_save_rewrites_chunk_under_new_generation(
+    pipeline, store_path, file_format
+):
+    data = ohlcv(15)
+    asyncio.run(pipeline._save_data(data.iloc[:10]))
+    update = data.iloc[5:15].copy()
+    update.iloc[:5, update.columns.get_loc("close")] = 1.0
+    asyncio.run(pipeline._save_data(update))
+
+    manifest = read_manifest(store_path)
+    entry = manifest["chunks"]["0"]
+    assert manifest["generation"] == 2
+    assert entry["rows"] == 15
+    assert entry["file"] == f"chunk0.g2.{file_format}"
+    if file_format == "csv":
+        assert stored_files(store_path) == ["chunk0.g2.csv"]
+    else:
+        # 겹치는 5 row 는 base 를 rewrite 하고, 뒤의 5 row 는 delta 로 붙인다.
+        assert stored_files(store_path) == [
+            f"chunk0.g2.delta0.{file_format}",
+            f"chunk0.g2.{file_format}",
+        ]
+        assert entry["deltas"][0]["rows"] == 5
+
+    expected = data.copy()
+    expected.loc[update.index[:5], "close"] = 1.0
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), expected)
+
+
+def test_rewrite_retires_previous_generation(pipeline, store_path, file_format):
+    data = ohlcv(10)
+    asyncio.run(pipeline._save_data(data))
+    corrected = data.iloc[[2]].copy()
+    corrected["close"] = -1.0
+    asyncio.run(pipeline._save_data(corrected))
+
+    manifest = read_manifest(store_path)
+    assert manifest["generation"] == 2
+    assert stored_files(store_path) == [f"chunk0.g2.{file_format}"]
+    assert manifest["chunks"]["0"]["file"] == f"chunk0.g2.{file_format}"
+
+
+def test_correction_replaces_stored_values(pipeline, file_format):
+    data = ohlcv(10)
+    asyncio.run(pipeline._save_data(data))
+    corrected = data.iloc[3:5].copy()
+    corrected["close"] = [1.0, 2.0]
+    asyncio.run(pipeline._save_data(corrected))
+
+    expected = data.copy()
+    expected.loc[corrected.index, "close"] = [1.0, 2.0]
+    stored = asyncio.run(pipeline.get_data_range())
+    assert len(stored) == 10
+    assert_same_rows(stored, expected)
+
+
+def test_unchanged_save_keeps_generation(pipeline, store_path):
+    data = ohlcv(10)
+    asyncio.run(pipeline._save_data(data))
+    before = stored_files(store_path)
+
+    asyncio.run(pipeline._save_data(data.iloc[2:6]))
+
+    assert read_manifest(store_path)["generation"] == 1
+    assert stored_files(store_path) == before
+
+
+def test_rows_older_than_stored_data_are_ignored_by_save_new_data(pipeline, store_path):
+    data = ohlcv(10)
+    asyncio.run(pipeline._save_new_data(data.iloc[5:]))
+    asyncio.run(pipeline._save_new_data(data.iloc[:5]))
+
+    assert read_manifest(store_path)["generation"] == 1
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data.iloc[5:])
+
+
+def test_chunks_roll_over_at_chunk_size(pipeline, store_path, file_format):
+    data = ohlcv(250)
+    asyncio.run(pipeline._save_new_data(data.iloc[:150]))
+    asyncio.run(pipeline._save_new_data(data.iloc[150:]))
+
+    chunks = read_manifest(store_path)["chunks"]
+    assert [chunks[n]["rows"] for n in sorted(chunks, key=int)] == [100, 100, 50]
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+
+
+@pytest.mark.parametrize(
+    "start, end, rows",
+    [
+        ("2024-01-02 14:40", "2024-01-02 14:49", slice(10, 20)),
+        (None, "2024-01-02 14:34", slice(0, 5)),
+        ("2024-01-02 18:00", None, slice(210, 250)),
+        ("2024-01-02 16:10", "2024-01-02 16:20", slice(100, 111)),
+    ],
+)
+def test_get_data_range_reads_across_chunks(pipeline, start, end, rows):
+    data = ohlcv(250)
+    asyncio.run(pipeline._save_new_data(data))
+
+    start = pd.Timestamp(start, tz="UTC") if start else None
+    end = pd.Timestamp(end, tz="UTC") if end else None
+    assert_same_rows(asyncio.run(pipeline.get_data_range(start, end)), data.iloc[rows])
+
+
+@pytest.mark.parametrize("read", ["get_data_range", "get_all_data"])
+def test_flat_bars_with_identical_values_are_all_read(pipeline, read):
+    # 거래가 없는 분봉은 OHLCV 가 모두 같지만 시각이 다르므로 각자 남는다.
+    data = ohlcv(5)
+    data[["open", "high", "low", "close"]] = 100.0
+    data["volume"] = 0
+    asyncio.run(pipeline._save_new_data(data))
+
+    assert_same_rows(asyncio.run(getattr(pipeline, read)()), data)
+
+
+def test_read_snapshot_sees_only_published_bytes(store_path):
+    # manifest 에 기록되기 전에 파일 뒤에 붙은 row 는 읽지 않는다.
+    pipeline = ProviderDataPipeline(None, str(store_path), chunk_cache=None)
+    data = ohlcv(12)
+    asyncio.run(pipeline._save_new_data(data.iloc[:10]))
+    with open(store_path / "chunk0.g1.csv", "ab") as f:
+        f.write(encode_chunk(data.iloc[10:], "csv", header=False))
+
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data.iloc[:10])
+
+
+def test_legacy_csv_chunks_are_read_and_extended(store_path):
+    data = ohlcv(30)
+    store_path.mkdir()
+    for chunk_num in range(2):
+        rows = data.iloc[chunk_num * 10 : (chunk_num + 1) * 10]
+        (store_path / f"chunk{chunk_num}.csv").write_bytes(encode_chunk(rows, "csv"))
+    pipeline = ProviderDataPipeline(
+        None, str(store_path), chunk_size=10, chunk_cache=None
+    )
+
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data.iloc[:20])
+    manifest = read_manifest(store_path)
+    assert [manifest["chunks"][n]["file"] for n in ("0", "1")] == [
+        "chunk0.csv",
+        "chunk1.csv",
+    ]
+
+    asyncio.run(pipeline._save_new_data(data.iloc[20:]))
+    asyncio.run(pipeline._save_data(data.iloc[[0]].assign(close=0.0)))
+
+    # manifest 생성(g1), append(g2), chunk0 수정(g3). chunk1 은 그대로 남는다.
+    assert stored_files(store_path) == ["chunk0.g3.csv", "chunk1.csv", "chunk2.g2.csv"]
+    expected = data.copy()
+    expected.iloc[0, expected.columns.get_loc("close")] = 0.0
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), expected)
+
+
+def test_compact_pipelines_survives_a_failing_store(store_path):
+    stores = [
+        ProviderDataPipeline(None, str(store_path / symbol), chunk_cache=None)
+        for symbol in ("AAPL", "MSFT")
+    ]
+    asyncio.run(stores[1]._save_new_data(ohlcv(10)))
+    calls = []
+
+    async def fail(**kwargs):
+        calls.append("AAPL")
+        raise OSError("disk full")
+
+    stores[0].compact = fail
+
+    async def main():
+        stop_event = asyncio.Event()
+        compact = stores[1].compact
+
+        async def compact_then_stop(**kwargs):
+            calls.append("MSFT")
+            stop_event.set()
+            return await compact(**kwargs)
+
+        stores[1].compact = compact_then_stop
+        await asyncio.wait_for(
+            compact_pipelines(stores, stop_event, interval=3600), timeout=5
+        )
+
+    asyncio.run(main())
+
+    assert calls == ["AAPL", "MSFT"]
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import subprocess
+import sys
+import httpx
+import pytest
+import modules.data.disk_cache as disk_cache
+import modules.data.gcs_client as gcs_client
+from modules.data.disk_cache import EVICTION_LOCK, DiskCache
+from modules.data.storage import GCSStorage
+from tests.data.fake_gcs import FakeGCS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+needs_flock = pytest.mark.skipif(disk_cache.fcntl is None, reason="no fcntl")
+
+# 같은 디렉토리를 쓰는 다른 프로세스: key 마다 100 byte entry 를 쓴다.
+WRITER = """
+import asyncio, sys
+from modules.data.disk_cache import DiskCache
+
+async def main():
+    cache = DiskCache(sys.argv[1], int(sys.argv[2]))
+    for i in range(int(sys.argv[4])):
+        key = f"{sys.argv[3]}{i}"
+        await cache.put(key, "1", key.encode().ljust(100, b"."))
+
+asyncio.run(main())
+"""
+
+
+def content_of(key: str) -> bytes:
+    return key.encode().ljust(100, b".")
+
+
+def entries(directory) -> dict:
+    """
+    Cache files below directory, path -> size
+    """
+    return {
+        os.path.join(root, name): os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name != EVICTION_LOCK
+    }
+
+
+def put(cache: DiskCache, key: str, version: str = "1", mtime: float = None):
+    asyncio.run(cache.put(key, version, content_of(key)))
+    if mtime is not None:
+        path = cache._path(key, version)
+        os.utime(path, (mtime, mtime))
+
+
+def get(cache: DiskCache, key: str, version: str = "1"):
+    return asyncio.run(cache.get(key, version))
+
+
+def test_entries_are_read_by_version(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    put(cache, "a", "1")
+
+    assert get(cache, "a", "1") == content_of("a")
+    assert get(cache, "a", "2") is None
+    put(cache, "a", "2")
+
+    # 새 version 이 들어오면 이전 version 은 지운다.
+    assert list(entries(tmp_path)) == [cache._path("a", "2")]
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_least_recently_used_entries_go_over_the_byte_budget(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=300)
+    for i, key in enumerate(["a", "b", "c"]):
+        put(cache, key, mtime=1000 + i)
+    # 읽으면 가장 최근에 쓴 entry 가 된다.
+    assert get(cache, "a") is not None
+
+    put(cache, "d")
+
+    assert get(cache, "b") is None
+    assert all(get(cache, key) is not None for key in ["a", "c", "d"])
+    assert sum(entries(tmp_path).values()) == 300
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 300
+
+
+def test_entry_larger_than_the_budget_is_not_kept(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=50)
+
+    put(cache, "a")
+
+    assert get(cache, "a") is None
+    assert entries(tmp_path) == {}
+
+
+@needs_flock
+def test_eviction_is_left_to_the_process_holding_the_lock(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=200)
+    put(cache, "a", mtime=1000)
+    put(cache, "b", mtime=1001)
+    fd = os.open(str(tmp_path / EVICTION_LOCK), os.O_RDWR | os.O_CREAT)
+    disk_cache.fcntl.flock(fd, disk_cache.fcntl.LOCK_EX)
+    try:
+        put(cache, "c", mtime=1002)
+        assert len(entries(tmp_path)) == 3
+    finally:
+        disk_cache.fcntl.flock(fd, disk_cache.fcntl.LOCK_UN)
+        os.close(fd)
+
+    put(cache, "d")
+
+    assert [get(cache, key) is not None for key in "abcd"] == [False, False, True, True]
+
+
+def test_processes_share_one_directory(tmp_path):
+    def writer(prefix: str, n: int, max_bytes: int) -> subprocess.Popen:
+        args = [str(tmp_path), str(max_bytes), prefix, str(n)]
+        return subprocess.Popen([sys.executable, "-c", WRITER, *args], cwd=ROOT)
+
+    assert writer("x", 3, 10_000).wait(timeout=30) == 0
+    cache = DiskCache(str(tmp_path), max_bytes=10_000)
+    # 다른 프로세스가 쓴 entry 를 내려받지 않고 읽는다.
+    assert [get(cache, f"x{i}") for i in range(3)] == [
+        content_of(f"x{i}") for i in range(3)
+    ]
+    assert cache.stats()["misses"] == 0
+
+    processes = [writer(prefix, 200, 5_000) for prefix in ("p", "q")]
+    assert [process.wait(timeout=60) for process in processes] == [0, 0]
+
+    files = entries(tmp_path)
+    assert not any(path.endswith(".tmp") for path in files)
+    # 남은 entry 는 모두 자기 key 의 내용을 온전히 담고 있다.
+    keys = [f"{prefix}{i}" for prefix in "xpq" for i in range(200)]
+    expected = {cache._path(key, "1"): content_of(key) for key in keys}
+    for path in files:
+        with open(path, "rb") as f:
+            assert f.read() == expected[path]
+    # 다른 프로세스가 쓴 만큼은 다음 scan 때 정리된다.
+    fresh = DiskCache(str(tmp_path), max_bytes=5_000)
+    put(fresh, "z")
+    assert sum(entries(tmp_path).values()) <= 5_000
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    # emulator 주소를 쓰면 인증 없이 만들어진다.
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", "localhost:4443")
+    monkeypatch.setattr(gcs_client, "_clients", {})
+    return FakeGCS()
+
+
+@pytest.fixture
+def run(bucket):
+    """
+    Run a coroutine with the shared client's connection pool routed to the fake
+    """
+
+    def run(coroutine):
+        async def main():
+            client = gcs_client.shared_gcs_client("bucket")
+            client._clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=httpx.MockTransport(bucket)
+            )
+            try:
+                return await coroutine
+            finally:
+                await client.aclose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def cached(bucket, tmp_path) -> GCSStorage:
+    return GCSStorage("bucket", DiskCache(str(tmp_path / "cache")))
+
+
+CHUNK = "AAPL/chunk0.g1.parquet"
+
+
+def test_gcs_reads_go_through_the_disk_cache(bucket, run, cached):
+    generation = run(GCSStorage("bucket").write_bytes_if(CHUNK, b"v1", "x", "0"))
+
+    assert run(cached.read_bytes(CHUNK)) == b"v1"
+    assert run(cached.read_bytes(CHUNK)) == b"v1"
+    assert run(cached.read_bytes(CHUNK, generation)) == b"v1"
+
+    # 첫 읽기만 내려받고, 이후는 metadata (또는 아무 요청 없이) cache 에서 읽는다.
+    assert bucket.downloads == [CHUNK]
+
+
+def test_replaced_object_is_read_under_its_new_generation(
+    bucket, run, cached, tmp_path
+):
+    writer = GCSStorage("bucket")
+    run(writer.write_bytes(CHUNK, b"v1", "x"))
+    assert run(cached.read_bytes(CHUNK)) == b"v1"
+
+    # 다른 host 가 같은 이름의 object 를 다시 올린다 (예: crash 뒤 재시도).
+    run(writer.write_bytes(CHUNK, b"v2", "x"))
+
+    assert run(cached.read_bytes(CHUNK)) == b"v2"
+    key = cached.cache_key(CHUNK)
+    generation = run(cached.version(CHUNK))
+    path = cached.disk_cache._path(key, generation)
+    assert list(entries(tmp_path / "cache")) == [path]
+
+
+def test_own_writes_and_deletes_update_the_cache(bucket, run, cached, tmp_path):
+    run(cached.write_bytes(CHUNK, b"v1", "x"))
+
+    assert run(cached.read_bytes(CHUNK)) == b"v1"
+    assert bucket.downloads == []
+
+    run(cached.delete(CHUNK))
+
+    assert entries(tmp_path / "cache") == {}
+    assert run(cached.read_bytes(CHUNK)) is None
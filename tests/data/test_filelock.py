@@ -0,0 +1,316 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import modules.data.filelock as filelock
+from modules.data.filelock import AsyncRWLock, FileLockRegistry
+from modules.data.pipeline import ProviderDataPipeline
+from tests.data.helpers import ohlcv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+needs_flock = pytest.mark.skipif(filelock.fcntl is None, reason="no fcntl")
+
+# 다른 프로세스에서 lock 을 잡고 stdin 이 닫힐 때까지 쥐고 있는다.
+HOLDER = """
+import asyncio, sys
+from modules.data.filelock import FileLockRegistry
+
+async def main():
+    shared = sys.argv[2] == "shared"
+    async with FileLockRegistry().acquire(sys.argv[1], shared=shared, timeout=None):
+        print("locked", flush=True)
+        sys.stdin.readline()
+
+asyncio.run(main())
+"""
+
+
+@pytest.fixture
+def lock_file(tmp_path) -> str:
+    return str(tmp_path / "chunk0.csv.lock")
+
+
+@pytest.fixture
+def holder(lock_file):
+    """
+    Start a process holding lock_file; release() lets it go
+    """
+    processes = []
+
+    class Holder:
+        def __init__(self, shared: bool):
+            self.process = subprocess.Popen(
+                [sys.executable, "-c", HOLDER, lock_file, "shared" if shared else "x"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                cwd=ROOT,
+                text=True,
+            )
+            processes.append(self.process)
+            assert self.process.stdout.readline().strip() == "locked"
+
+        def release(self):
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+
+    yield Holder
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def can_lock_elsewhere(lock_file: str, shared: bool = False) -> bool:
+    """
+    Whether another process could take the lock right now
+    """
+    mode = "LOCK_SH" if shared else "LOCK_EX"
+    script = (
+        "import fcntl, os, sys\n"
+        "fd = os.open(sys.argv[1], os.O_RDWR | os.O_CREAT)\n"
+        "try:\n"
+        f"    fcntl.flock(fd, fcntl.{mode} | fcntl.LOCK_NB)\n"
+        "except BlockingIOError:\n"
+        "    sys.exit(1)\n"
+    )
+    return subprocess.run([sys.executable, "-c", script, lock_file]).returncode == 0
+
+
+def open_fds(path: str) -> int:
+    """
+    File descriptors of this process open on path
+    """
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            count += os.readlink(f"/proc/self/fd/{fd}") == path
+        except OSError:
+            continue
+    return count
+
+
+async def overlap(registry, lock_file, shared: bool, n: int) -> int:
+    """
+    Run n holders at once and return how many were inside together at most
+    """
+    state = {"inside": 0, "max": 0}
+
+    async def hold():
+        async with registry.acquire(lock_file, shared=shared, timeout=5):
+            state["inside"] += 1
+            state["max"] = max(state["max"], state["inside"])
+            await asyncio.sleep(0.01)
+            state["inside"] -= 1
+
+    await asyncio.gather(*(hold() for _ in range(n)))
+    return state["max"]
+
+
+def test_writers_exclude_each_other(lock_file):
+    assert asyncio.run(overlap(FileLockRegistry(), lock_file, False, 5)) == 1
+
+
+def test_readers_hold_the_lock_together(lock_file):
+    assert asyncio.run(overlap(FileLockRegistry(), lock_file, True, 5)) == 5
+
+
+def test_lock_entries_are_dropped_after_use(lock_file):
+    registry = FileLockRegistry()
+
+    async def main():
+        await overlap(registry, lock_file, False, 3)
+        return dict(registry._locks[asyncio.get_running_loop()])
+
+    assert asyncio.run(main()) == {}
+
+
+def test_waiting_writer_goes_before_later_readers():
+    lock = AsyncRWLock()
+    order = []
+
+    async def write():
+        await lock.acquire_write()
+        order.append("write")
+        await lock.release_write()
+
+    async def read():
+        await lock.acquire_read()
+        order.append("read")
+        await lock.release_read()
+
+    async def main():
+        await lock.acquire_read()
+        writer = asyncio.create_task(write())
+        while lock._waiting_writers == 0:
+            await asyncio.sleep(0)
+        reader = asyncio.create_task(read())
+        await asyncio.sleep(0.01)
+        # 기다리는 writer 가 있으면 새 reader 는 들어오지 못한다.
+        assert order == []
+        await lock.release_read()
+        await asyncio.wait_for(asyncio.gather(writer, reader), timeout=5)
+
+    asyncio.run(main())
+
+    assert order == ["write", "read"]
+
+
+def test_timed_out_writer_does_not_block_readers(lock_file):
+    registry = FileLockRegistry()
+
+    async def main():
+        async with registry.acquire(lock_file, shared=True):
+            with pytest.raises(TimeoutError):
+                async with registry.acquire(lock_file, timeout=0.05):
+                    pass
+            # 포기한 writer 가 대기열에 남아 있으면 여기서 멈춘다.
+            async with registry.acquire(lock_file, shared=True, timeout=1):
+                pass
+
+    asyncio.run(main())
+
+
+@needs_flock
+def test_event_loops_in_threads_exclude_each_other(lock_file):
+    # loop 마다 AsyncRWLock 이 따로라서 flock 만이 둘을 가른다.
+    registry = FileLockRegistry()
+    inside, spans = threading.Lock(), []
+
+    def run():
+        async def hold():
+            async with registry.acquire(lock_file, timeout=5):
+                start = time.monotonic()
+                await asyncio.sleep(0.05)
+                with inside:
+                    spans.append((start, time.monotonic()))
+
+        asyncio.run(hold())
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    spans.sort()
+    assert len(spans) == 3
+    assert all(end <= start for (_, end), (start, _) in zip(spans, spans[1:]))
+
+
+@needs_flock
+def test_lock_held_by_another_process(lock_file, holder):
+    other = holder(shared=False)
+    registry = FileLockRegistry()
+
+    async def acquire(shared: bool, timeout: float):
+        async with registry.acquire(lock_file, shared=shared, timeout=timeout):
+            pass
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(acquire(False, 0.1))
+    with pytest.raises(TimeoutError):
+        asyncio.run(acquire(True, 0.1))
+
+    other.release()
+    asyncio.run(acquire(False, 5))
+
+
+@needs_flock
+def test_readers_in_different_processes_share(lock_file, holder):
+    holder(shared=True)
+
+    async def main():
+        async with FileLockRegistry().acquire(lock_file, shared=True, timeout=1):
+            return can_lock_elsewhere(lock_file, shared=True)
+
+    assert asyncio.run(main())
+    assert not can_lock_elsewhere(lock_file)
+
+
+@needs_flock
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="no /proc")
+def test_abandoned_wait_releases_the_lock_once_granted(lock_file, holder):
+    other = holder(shared=False)
+
+    async def acquire():
+        async with FileLockRegistry().acquire(lock_file, timeout=0.1):
+            pass
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(acquire())
+    other.release()
+
+    # 대기 thread 는 lock 을 받자마자 풀고 fd 를 닫아야 한다.
+    deadline = time.monotonic() + 5
+    while open_fds(lock_file) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert open_fds(lock_file) == 0
+    assert can_lock_elsewhere(lock_file)
+
+
+@needs_flock
+def test_cleanup_removes_only_unheld_lock_files(tmp_path, lock_file):
+    held = str(tmp_path / "chunk1.csv.lock")
+    open(lock_file, "w").close()
+    registry = FileLockRegistry()
+
+    async def main():
+        async with registry.acquire(held):
+            return FileLockRegistry.cleanup_stale_locks(str(tmp_path))
+
+    assert asyncio.run(main()) == 1
+    assert not os.path.exists(lock_file) and os.path.exists(held)
+
+
+@needs_flock
+def test_lock_on_a_file_removed_by_cleanup_is_retaken(lock_file, monkeypatch):
+    # open 과 flock 사이에 cleanup_stale_locks 가 파일을 지운 경우
+    real_open = os.open
+    opened = []
+
+    def open_then_remove(path, *args):
+        fd = real_open(path, *args)
+        opened.append(path)
+        if len(opened) == 1:
+            os.remove(path)
+        return fd
+
+    monkeypatch.setattr(filelock.os, "open", open_then_remove)
+
+    async def main():
+        async with FileLockRegistry().acquire(lock_file, timeout=1):
+            monkeypatch.undo()
+            # 지워진 inode 가 아니라 지금 경로에 있는 파일을 잡고 있어야 한다.
+            return os.path.exists(lock_file), can_lock_elsewhere(lock_file)
+
+    assert asyncio.run(main()) == (True, False)
+    assert len(opened) == 2
+
+
+def test_pipelines_sharing_the_registry_write_the_same_store(store_path):
+    data = ohlcv(40)
+    pipelines = [
+        ProviderDataPipeline(None, str(store_path), chunk_size=100, chunk_cache=None)
+        for _ in range(4)
+    ]
+
+    async def main():
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    pipeline._save_data(data.iloc[i * 10 : (i + 1) * 10])
+                    for i, pipeline in enumerate(pipelines)
+                )
+            ),
+            timeout=30,
+        )
+
+    asyncio.run(main())
+
+    stored = asyncio.run(pipelines[0].get_data_range())
+    assert len(stored) == 40
+    assert not any(filelock.file_lock_registry._locks.values())
@@ -0,0 +1,153 @@
+import asyncio
+import gzip
+import json
+import httpx
+import pytest
+import modules.data.gcs_client as gcs_client
+from modules.data.gcs_client import AsyncGCSClient, PreconditionFailedError
+from tests.data.fake_gcs import FakeGCS
+
+
+@pytest.fixture
+def fake_gcs():
+    return FakeGCS()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # emulator 주소를 쓰면 인증 없이 만들어진다.
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", "localhost:4443")
+    return AsyncGCSClient("bucket")
+
+
+@pytest.fixture
+def run(client, fake_gcs):
+    """
+    Run a coroutine with the client's connection pool routed to the fake
+    """
+
+    def run(coroutine):
+        async def main():
+            transport = httpx.MockTransport(fake_gcs)
+            client._clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=transport
+            )
+            try:
+                return await coroutine
+            finally:
+                await client.aclose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+async def collect(pieces) -> list:
+    return [piece async for piece in pieces]
+
+
+@pytest.mark.parametrize("size, lengths", [(0, []), (10, [10]), (25, [10, 10, 5])])
+def test_upload_body_is_streamed_in_pieces(monkeypatch, size, lengths):
+    monkeypatch.setattr(gcs_client, "UPLOAD_PIECE_BYTES", 10)
+    content = bytes(range(size))
+
+    pieces = asyncio.run(collect(AsyncGCSClient._pieces(content, None)))
+
+    assert [len(piece) for piece in pieces] == lengths
+    assert b"".join(pieces) == content
+
+
+def test_gzip_pieces_form_one_gzip_stream(monkeypatch):
+    monkeypatch.setattr(gcs_client, "UPLOAD_PIECE_BYTES", 10)
+    content = b"0123456789" * 50
+
+    pieces = asyncio.run(collect(AsyncGCSClient._pieces(content, "gzip")))
+
+    assert len(pieces) > 1
+    assert gzip.decompress(b"".join(pieces)) == content
+
+
+@pytest.mark.parametrize("size", [0, 10, 25])
+def test_upload_round_trips(client, fake_gcs, run, monkeypatch, size):
+    monkeypatch.setattr(gcs_client, "UPLOAD_PIECE_BYTES", 10)
+    content = bytes(range(size))
+
+    metadata = run(client.upload("a/chunk0.g1.parquet", content, "application/x"))
+
+    params, body = fake_gcs.uploads[-1]
+    assert params == {"uploadType": "media", "name": "a/chunk0.g1.parquet"}
+    assert body == content
+    assert metadata["size"] == str(size)
+    assert run(client.download("a/chunk0.g1.parquet")) == content
+    assert run(client.get_metadata("a/chunk0.g1.parquet"))["generation"] == "1"
+
+
+def test_gzip_upload_is_stored_compressed_and_read_inflated(
+    client, fake_gcs, run, monkeypatch
+):
+    monkeypatch.setattr(gcs_client, "UPLOAD_PIECE_BYTES", 64)
+    content = b"date,close\n" + b"".join(
+        f"2024-01-02T14:{i % 60:02d}:00+00:00,{i}\n".encode() for i in range(200)
+    )
+
+    run(client.upload("a/chunk0.g1.csv", content, "text/csv", "gzip"))
+
+    params, _ = fake_gcs.uploads[-1]
+    assert params["contentEncoding"] == "gzip"
+    stored, metadata = fake_gcs.objects["a/chunk0.g1.csv"]
+    assert metadata["contentEncoding"] == "gzip"
+    assert len(stored) < len(content)
+    assert gzip.decompress(stored) == content
+    assert run(client.download("a/chunk0.g1.csv")) == content
+
+
+def test_generation_precondition(client, fake_gcs, run):
+    def upload(content: bytes, generation: int):
+        return client.upload(
+            "a/_manifest.json",
+            content,
+            "application/json",
+            if_generation_match=generation,
+        )
+
+    assert run(upload(b"{}", 0))["generation"] == "1"
+    # 아직 없을 때만 (0) 쓰는 요청은 이미 있으므로 실패한다.
+    with pytest.raises(PreconditionFailedError):
+        run(upload(b"[]", 0))
+
+    assert run(upload(b'{"g": 2}', 1))["generation"] == "2"
+    with pytest.raises(PreconditionFailedError):
+        run(upload(b"{}", 1))
+
+    assert json.loads(run(client.download("a/_manifest.json"))) == {"g": 2}
+    assert [params["ifGenerationMatch"] for params, _ in fake_gcs.uploads] == [
+        "0",
+        "0",
+        "1",
+        "1",
+    ]
+
+
+@pytest.mark.parametrize("generation_header", [True, False])
+def test_download_with_generation(client, fake_gcs, run, generation_header):
+    fake_gcs.generation_header = generation_header
+    run(client.upload("a/_manifest.json", b"{}", "text/plain"))
+    run(client.upload("a/_manifest.json", b"[]", "text/plain"))
+
+    assert run(client.download_with_generation("a/_manifest.json")) == (b"[]", "2")
+    assert run(client.download_with_generation("a/missing.json")) is None
+
+
+def test_missing_objects(client, run):
+    assert run(client.download("a/missing.csv")) is None
+    assert run(client.get_metadata("a/missing.csv")) is None
+    assert run(client.delete("a/missing.csv")) is False
+
+
+def test_download_pins_generation(client, run):
+    run(client.upload("a/chunk0.csv", b"old", "text/plain"))
+    run(client.upload("a/chunk0.csv", b"new", "text/plain"))
+
+    assert run(client.download("a/chunk0.csv", generation="2")) == b"new"
+    # 이미 교체된 generation 은 없는 object 로 본다.
+    assert run(client.download("a/chunk0.csv", generation="1")) is None
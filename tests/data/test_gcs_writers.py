@@ -0,0 +1,170 @@
+import asyncio
+import gzip
+import json
+import httpx
+import pandas as pd
+import pytest
+import modules.data.core as core
+import modules.data.gcs_client as gcs_client
+from modules.data.gcs_client import PreconditionFailedError
+from modules.data.manifest import MANIFEST_FILE
+from modules.data.pipeline import ProviderDataPipeline
+from tests.data.fake_gcs import FakeGCS
+from tests.data.helpers import ohlcv
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    # emulator 주소를 쓰면 인증 없이 만들어진다.
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", "localhost:4443")
+    monkeypatch.setattr(gcs_client, "_clients", {})
+    return FakeGCS()
+
+
+@pytest.fixture
+def run(bucket):
+    """
+    Run a coroutine with the shared client's connection pool routed to the fake
+    """
+
+    def run(coroutine):
+        async def main():
+            client = gcs_client.shared_gcs_client("bucket")
+            client._clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=httpx.MockTransport(bucket)
+            )
+            try:
+                return await coroutine
+            finally:
+                await client.aclose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def writer(bucket, file_format):
+    """
+    Pipelines on the same bucket prefix, as on two hosts: each has its own
+    manifest lock and there is no file lock on GCS
+    """
+
+    def writer() -> ProviderDataPipeline:
+        return ProviderDataPipeline(
+            None,
+            "AAPL",
+            chunk_size=100,
+            storage_type="gcs",
+            bucket_name="bucket",
+            file_format=file_format,
+            chunk_cache=None,
+        )
+
+    return writer
+
+
+def interleave(pipeline, other_write, times: int = 1):
+    """
+    Let other_write() commit right before pipeline swaps its manifest
+    """
+    store = pipeline._store_manifest
+    pending = [times]
+
+    async def store_after_other(manifest):
+        if pending[0] > 0:
+            pending[0] -= 1
+            await other_write()
+        await store(manifest)
+
+    pipeline._store_manifest = store_after_other
+
+
+def manifest_of(bucket) -> dict:
+    # manifest 는 gzip 으로 저장된다.
+    return json.loads(gzip.decompress(bucket.objects[f"AAPL/{MANIFEST_FILE}"][0]))
+
+
+def referenced(manifest: dict) -> list:
+    files = []
+    for entry in manifest["chunks"].values():
+        files.append(entry["file"])
+        files.extend(delta["file"] for delta in entry.get("deltas", []))
+    return sorted(f"AAPL/{name}" for name in files)
+
+
+def test_racing_writers_keep_each_others_rows(bucket, run, writer):
+    data = ohlcv(30)
+    first, second = writer(), writer()
+    run(first._save_data(data.iloc[:10]))
+    # second 가 manifest 를 교체하기 직전에 first 가 끼어든다.
+    interleave(second, lambda: first._save_data(data.iloc[10:20]))
+
+    run(second._save_data(data.iloc[20:]))
+
+    stored = run(writer().get_data_range())
+    pd.testing.assert_frame_equal(stored, data, check_freq=False)
+    manifest = manifest_of(bucket)
+    assert manifest["chunks"]["0"]["rows"] == 30
+    # 실패한 시도가 쓴 파일은 남지 않는다.
+    assert bucket.names("AAPL/") == sorted(
+        referenced(manifest) + [f"AAPL/{MANIFEST_FILE}"]
+    )
+
+
+def test_manifest_is_written_with_its_generation_precondition(bucket, run, writer):
+    pipeline = writer()
+    run(pipeline._save_data(ohlcv(5)))
+    run(pipeline._save_data(ohlcv(10).iloc[5:]))
+
+    manifest_uploads = [
+        params.get("ifGenerationMatch")
+        for params, _ in bucket.uploads
+        if params["name"].endswith(MANIFEST_FILE)
+    ]
+    first = manifest_uploads[0]
+    assert first == "0"
+    assert all(generation not in (None, "0") for generation in manifest_uploads[1:])
+    # 데이터 object 는 아직 없는 이름에만 쓴다.
+    assert all(
+        params.get("ifGenerationMatch") == "0"
+        for params, _ in bucket.uploads
+        if not params["name"].endswith(MANIFEST_FILE)
+    )
+
+
+def test_update_gives_up_after_the_retries(bucket, run, writer, monkeypatch):
+    monkeypatch.setattr(core, "MANIFEST_RETRIES", 2)
+    data = ohlcv(20)
+    first, second = writer(), writer()
+    run(first._save_data(data.iloc[:5]))
+    rows = iter(range(5, 20))
+
+    async def other_write():
+        i = next(rows)
+        await first._save_data(data.iloc[i : i + 1])
+
+    interleave(second, other_write, times=3)
+
+    with pytest.raises(PreconditionFailedError):
+        run(second.clean_old_data(0))
+
+    assert len(run(writer().get_data_range())) == 8
+
+
+def test_remove_orphans_keeps_files_of_unpublished_writes(bucket, run, writer):
+    pipeline = writer()
+    run(pipeline._save_data(ohlcv(5)))
+    generation = manifest_of(bucket)["generation"]
+    extension = pipeline.file_format
+    crashed = f"AAPL/chunk0.g{generation}.delta5.{extension}"
+    in_flight = f"AAPL/chunk0.g{generation + 1}.{extension}"
+
+    async def put(name: str):
+        await pipeline.storage.write_bytes(name, b"x", "application/octet-stream")
+
+    run(put(crashed))
+    run(put(in_flight))
+
+    assert run(pipeline.remove_orphans()) == 1
+    assert crashed not in bucket.names() and in_flight in bucket.names()
@@ -0,0 +1,144 @@
+import asyncio
+import pandas as pd
+import pytest
+from datetime import date, datetime, time
+import modules.data.market_calendar as market_calendar
+from modules.data.market_calendar import (
+    KRX,
+    NYSE,
+    KRXCalendar,
+    find_gaps,
+    get_calendar,
+)
+
+
+def utc(value: str) -> pd.Timestamp:
+    return pd.Timestamp(value, tz="UTC")
+
+
+@pytest.mark.parametrize(
+    "calendar, day",
+    [
+        (KRX, "2024-09-17"),  # 추석
+        (KRX, "2025-06-03"),  # 대통령 선거
+        (KRX, "2024-12-31"),  # 연말 휴장일
+        (KRX, "2024-05-01"),  # 근로자의 날
+        (NYSE, "2024-07-04"),
+        (NYSE, "2024-03-29"),  # Good Friday
+        (NYSE, "2025-01-09"),  # 임시 휴장
+    ],
+)
+def test_known_holidays_are_no_sessions(calendar, day):
+    assert not calendar.is_session(day)
+    assert calendar.session_window(day) is None
+
+
+@pytest.mark.parametrize(
+    "calendar, day, open_, close",
+    [
+        (NYSE, "2024-11-29", "2024-11-29 14:30", "2024-11-29 18:00"),  # 13:00 ET
+        (NYSE, "2024-07-03", "2024-07-03 13:30", "2024-07-03 17:00"),
+        (KRX, "2024-11-14", "2024-11-14 01:00", "2024-11-14 07:30"),  # 수능일
+        (KRX, "2025-01-02", "2025-01-02 01:00", "2025-01-02 06:30"),  # 첫 거래일
+        (KRX, "2024-11-15", "2024-11-15 00:00", "2024-11-15 06:30"),
+    ],
+)
+def test_sessions_with_special_hours(calendar, day, open_, close):
+    schedule = calendar.schedule(day, day)
+    assert list(schedule["open"]) == [utc(open_)]
+    assert list(schedule["close"]) == [utc(close)]
+    assert calendar.is_open_at(utc(close).to_pydatetime())
+    after_close = utc(close) + pd.Timedelta(1, "min")
+    assert not calendar.is_open_at(after_close.to_pydatetime())
+
+
+def test_years_beyond_the_table_use_the_holidays_package():
+    calendar = KRXCalendar()
+    # 2027 설날 대체 휴일, 추석
+    assert not calendar.is_session("2027-02-09")
+    assert not calendar.is_session("2027-09-15")
+    assert calendar.is_session("2027-02-10")
+
+
+def test_years_beyond_the_table_fail_without_the_holidays_package(monkeypatch):
+    monkeypatch.setattr(market_calendar, "public_holidays", None)
+    calendar = KRXCalendar()
+
+    with pytest.raises(ValueError, match="2027"):
+        calendar.is_session("2027-02-09")
+    # 표에 있는 해는 그대로 동작한다.
+    assert not calendar.is_session("2026-02-17")
+    assert calendar.is_session("2026-02-19")
+
+
+def test_session_closes_and_daily_bar_timestamps():
+    dates = pd.DatetimeIndex(["2024-11-27", "2024-11-29", "2024-11-30"])
+    assert list(NYSE.session_closes(dates)) == [
+        utc("2024-11-27 21:00"),
+        utc("2024-11-29 18:00"),
+        utc("2024-11-30 21:00"),  # session 이 아닌 날은 정규 마감 시각
+    ]
+
+    now = datetime(2024, 11, 27, 15, 0, tzinfo=market_calendar.pytz.UTC)
+    stamps = NYSE.daily_bar_timestamps(dates[:1], now)
+    assert list(stamps) == [utc("2024-11-27 15:00")]
+
+
+@pytest.mark.parametrize(
+    "calendar, day, expected",
+    [
+        (NYSE, "2024-11-29", "2024-11-29 21:00"),  # 13:00 에 끝나는 half-day
+        (KRX, "2024-11-14", "2024-11-14 06:30"),  # 16:30 에 끝나는 수능일
+        (KRX, "2024-01-02", "2024-01-02 06:30"),  # 10:00 에 여는 새해 첫 거래일
+    ],
+)
+def test_daily_bars_keep_the_regular_close_on_special_days(calendar, day, expected):
+    # 예전부터 저장된 일봉과 같은 시각이어야 backfill 이 중복 bar 를 만들지 않는다.
+    now = datetime(2025, 1, 6, tzinfo=market_calendar.pytz.UTC)
+    stamps = calendar.daily_bar_timestamps(pd.DatetimeIndex([day]), now)
+    assert list(stamps) == [utc(expected)]
+
+
+def test_backfill_over_stored_daily_bars_adds_no_rows(pipeline):
+    days = pd.DatetimeIndex(["2024-11-27", "2024-11-29", "2024-12-02"])
+    stored = pd.DataFrame(
+        {"close": [1.0, 2.0, 3.0]},
+        index=pd.DatetimeIndex(
+            [utc(f"{day.date()} 21:00") for day in days], name="date"
+        ),
+    )
+    asyncio.run(pipeline._save_data(stored))
+
+    now = datetime(2024, 12, 3, tzinfo=market_calendar.pytz.UTC)
+    refetched = stored.set_axis(NYSE.daily_bar_timestamps(days, now)) + 10
+    asyncio.run(pipeline._save_data(refetched.rename_axis("date")))
+
+    data = asyncio.run(pipeline.get_data_range())
+    assert list(data["close"]) == [11.0, 12.0, 13.0]
+
+
+def test_next_open_skips_holidays():
+    # 금요일 장 마감 뒤 -> 추석 연휴 (9/16~18) 다음 날인 19일 (목)
+    now = utc("2024-09-13 07:00").to_pydatetime()
+    assert KRX.next_open(now) == utc("2024-09-19 00:00").to_pydatetime()
+
+
+def test_find_gaps_ignores_closed_hours_and_holidays():
+    # 7/3 half-day, 7/4 휴장, 7/5 정규장
+    index = pd.date_range("2024-07-03 13:30", "2024-07-05 19:55", freq="5min", tz="UTC")
+    index = index[NYSE.is_open(index)]
+    stored = index.drop(index[5:8])
+
+    assert list(find_gaps(stored, NYSE, "5m")) == list(index[5:8])
+
+
+def test_get_calendar():
+    assert get_calendar("kosdaq") is KRX
+    assert get_calendar("NASDAQ") is NYSE
+    assert get_calendar(None) is None
+    assert get_calendar("LSE") is None
+
+
+def test_krx_extended_hours():
+    assert KRX.session_window("2024-11-15", prepost=True)[0].time() == time(8, 30)
+    assert KRX.holidays(2024) >= {date(2024, 9, 16), date(2024, 9, 17)}
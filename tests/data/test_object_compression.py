@@ -0,0 +1,104 @@
+import asyncio
+import pandas as pd
+import pytest
+from modules.data.compression import compress_object, decode_object, detect_compression
+from modules.data.manifest import MANIFEST_FILE
+from modules.data.pipeline import ProviderDataPipeline
+from tests.data.helpers import ohlcv, stored_files
+
+
+@pytest.fixture(params=["gzip", "zstd"])
+def compression(request) -> str:
+    return request.param
+
+
+def open_pipeline(store_path, file_format, compression=None, **kwargs):
+    return ProviderDataPipeline(
+        None,
+        str(store_path),
+        chunk_size=100,
+        file_format=file_format,
+        chunk_cache=None,
+        object_compression=compression,
+        **kwargs,
+    )
+
+
+def compressions(store_path) -> dict:
+    """
+    Compression of every stored object, None for plain ones
+    """
+    names = stored_files(store_path) + [MANIFEST_FILE]
+    return {
+        name: detect_compression((store_path / name).read_bytes()) for name in names
+    }
+
+
+def assert_same_rows(actual: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        actual, expected, check_dtype=False, check_freq=False
+    )
+
+
+@pytest.mark.parametrize("content", [b"", b"date,close\n", bytes(range(256)) * 1000])
+def test_objects_round_trip(compression, content):
+    compressed = compress_object(content, compression)
+
+    assert detect_compression(compressed) == compression
+    assert decode_object(compressed) == content
+    # 압축하지 않은 예전 object 는 그대로 돌려준다.
+    assert decode_object(content) == content
+
+
+def test_compressed_chunks_through_append_delta_and_compact(
+    store_path, file_format, compression
+):
+    pipeline = open_pipeline(store_path, file_format, compression, max_deltas=3)
+    data = ohlcv(260)
+
+    asyncio.run(pipeline._save_new_data(data.iloc[:50]))
+    # 압축된 object 뒤에는 이어 쓸 수 없으므로 csv 도 delta 로 붙는다.
+    asyncio.run(pipeline._save_new_data(data.iloc[50:60]))
+    assert any(".delta0." in name for name in stored_files(store_path))
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data.iloc[:60])
+
+    for start in range(60, 260, 20):
+        asyncio.run(pipeline._save_new_data(data.iloc[start : start + 20]))
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+
+    asyncio.run(pipeline.compact_deltas())
+    assert not any(".delta" in name for name in stored_files(store_path))
+    # 작은 chunk 3 개를 압축된 chunk 하나로 합친다.
+    asyncio.run(pipeline.compact())
+    assert len(stored_files(store_path)) == 1
+
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+    assert set(compressions(store_path).values()) == {compression}
+
+
+def test_reads_survive_a_change_of_the_compression_setting(
+    store_path, file_format, compression
+):
+    data = ohlcv(90)
+    plain = open_pipeline(store_path, file_format)
+    asyncio.run(plain._save_new_data(data.iloc[:30]))
+
+    # 압축을 켜면 예전 object 와 새 object 가 함께 읽힌다.
+    compressed = open_pipeline(store_path, file_format, compression)
+    assert_same_rows(asyncio.run(compressed.get_data_range()), data.iloc[:30])
+    asyncio.run(compressed._save_new_data(data.iloc[30:60]))
+    assert set(compressions(store_path).values()) == {None, compression}
+    assert_same_rows(asyncio.run(compressed.get_data_range()), data.iloc[:60])
+    asyncio.run(compressed.compact_deltas())
+
+    # 다시 끄면 압축된 chunk 뒤에 평문을 이어 쓰지 않고 delta 로 붙인다.
+    plain = open_pipeline(store_path, file_format)
+    asyncio.run(plain._save_new_data(data.iloc[60:]))
+    assert set(compressions(store_path).values()) == {None, compression}
+    assert_same_rows(asyncio.run(plain.get_data_range()), data)
+    assert_same_rows(asyncio.run(plain.get_all_data()), data)
+
+    asyncio.run(plain.compact_deltas())
+
+    assert_same_rows(asyncio.run(plain.get_data_range()), data)
+    assert set(compressions(store_path).values()) == {None}
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+from modules.data.formats import decode_chunk
+from modules.data.manifest import MANIFEST_FILE
+from modules.data.panel import PanelPipeline, panel_column, to_wide
+from tests.data.helpers import ohlcv, stored_files
+
+
+@pytest.fixture(params=["parquet", "feather"])
+def panel(request, tmp_path):
+    return PanelPipeline(
+        str(tmp_path / "_panel"),
+        chunk_size=100,
+        file_format=request.param,
+        write_buffer_rows=0,
+        chunk_cache=None,
+    )
+
+
+def panel_path(panel) -> Path:
+    return Path(panel.base_path)
+
+
+def chunk_entry(panel, chunk_num: int = 0) -> dict:
+    manifest = json.loads((panel_path(panel) / MANIFEST_FILE).read_text())
+    return manifest["chunks"][str(chunk_num)]
+
+
+@pytest.mark.parametrize(
+    "existing, rows, expected",
+    [
+        # 다른 symbol 의 컬럼은 그대로 두고 들어온 컬럼만 채운다.
+        (
+            {"A|close": [1.0, 2.0]},
+            {"B|close": [3.0, 4.0]},
+            {"A|close": [1.0, 2.0], "B|close": [3.0, 4.0]},
+        ),
+        # 들어온 값이 있는 곳만 덮어쓴다.
+        (
+            {"A|close": [1.0, 2.0], "B|close": [3.0, 4.0]},
+            {"A|close": [9.0, np.nan]},
+            {"A|close": [9.0, 2.0], "B|close": [3.0, 4.0]},
+        ),
+    ],
+)
+def test_merge_rows_touches_only_incoming_columns(existing, rows, expected):
+    index = pd.date_range("2024-01-02", periods=2, freq="1min", tz="UTC")
+    merged = PanelPipeline._merge_rows(
+        pd.DataFrame(existing, index=index), pd.DataFrame(rows, index=index)
+    )
+    pd.testing.assert_frame_equal(
+        merged[sorted(merged.columns)], pd.DataFrame(expected, index=index)
+    )
+
+
+def test_merge_rows_adds_new_timestamps():
+    index = pd.date_range("2024-01-02", periods=3, freq="1min", tz="UTC")
+    existing = pd.DataFrame({"A|close": [1.0, 2.0]}, index=index[:2])
+    rows = pd.DataFrame({"B|close": [5.0, 6.0]}, index=index[1:])
+
+    merged = PanelPipeline._merge_rows(existing, rows)
+
+    assert merged.index.equals(index)
+    assert merged["A|close"].tolist()[:2] == [1.0, 2.0]
+    assert np.isnan(merged["A|close"].iloc[2])
+    assert merged["B|close"].tolist()[1:] == [5.0, 6.0]
+
+
+def test_second_symbol_is_written_as_its_own_delta(panel):
+    aapl, msft = ohlcv(10, seed=1), ohlcv(10, seed=2)
+    asyncio.run(panel.write("AAPL", aapl))
+    base = chunk_entry(panel)
+    base_bytes = (panel_path(panel) / base["file"]).read_bytes()
+
+    asyncio.run(panel.write("MSFT", msft))
+
+    entry = chunk_entry(panel)
+    assert entry["file"] == base["file"]
+    assert (panel_path(panel) / base["file"]).read_bytes() == base_bytes
+    assert entry["rows"] == 10
+    assert len(entry["deltas"]) == 1
+    delta = decode_chunk(
+        (panel_path(panel) / entry["deltas"][0]["file"]).read_bytes(),
+        panel.file_format,
+    )
+    assert set(delta.columns) == {
+        panel_column("MSFT", field) for field in msft.columns
+    }
+
+    stored = asyncio.run(panel.get_panel())
+    pd.testing.assert_series_equal(
+        stored[("close", "AAPL")], aapl["close"], check_names=False, check_freq=False
+    )
+    pd.testing.assert_series_equal(
+        stored[("close", "MSFT")], msft["close"], check_names=False, check_freq=False
+    )
+
+
+def test_correction_of_one_symbol_keeps_the_others(panel):
+    aapl, msft = ohlcv(10, seed=1), ohlcv(10, seed=2)
+    asyncio.run(panel.save_symbols({"AAPL": aapl, "MSFT": msft}))
+    corrected = aapl.iloc[3:5].assign(close=[1.0, 2.0])
+
+    asyncio.run(panel.write("AAPL", corrected))
+
+    stored = asyncio.run(panel.get_panel())
+    expected = aapl["close"].copy()
+    expected.iloc[3:5] = [1.0, 2.0]
+    assert stored[("close", "AAPL")].tolist() == expected.tolist()
+    assert stored[("close", "MSFT")].tolist() == msft["close"].tolist()
+
+
+def test_unchanged_rows_write_nothing(panel):
+    aapl = ohlcv(10, seed=1)
+    asyncio.run(panel.save_symbols({"AAPL": aapl, "MSFT": ohlcv(10, seed=2)}))
+    before = stored_files(panel_path(panel))
+
+    asyncio.run(panel.write("AAPL", aapl.iloc[2:4]))
+
+    assert stored_files(panel_path(panel)) == before
+
+
+def test_compaction_folds_symbol_deltas(panel):
+    frames = {symbol: ohlcv(10, seed=seed) for seed, symbol in enumerate("ABCD")}
+    for symbol, data in frames.items():
+        asyncio.run(panel.write(symbol, data))
+    assert len(chunk_entry(panel)["deltas"]) == 3
+
+    asyncio.run(panel.compact_deltas())
+
+    entry = chunk_entry(panel)
+    assert "deltas" not in entry
+    assert entry["rows"] == 10
+    assert stored_files(panel_path(panel)) == [entry["file"]]
+    stored = asyncio.run(panel._load_date_range(None, None))
+    expected = to_wide(frames)
+    pd.testing.assert_frame_equal(
+        stored[sorted(stored.columns)],
+        expected[sorted(expected.columns)],
+        check_dtype=False,
+        check_freq=False,
+    )
+
+
+def test_rows_before_the_chunk_are_merged_by_rewrite(panel):
+    data = ohlcv(20, seed=1)
+    asyncio.run(panel.write("AAPL", data.iloc[10:]))
+
+    asyncio.run(panel.write("MSFT", ohlcv(20, seed=2).iloc[:15]))
+
+    entry = chunk_entry(panel)
+    assert "deltas" not in entry
+    assert entry["rows"] == 20
+    stored = asyncio.run(panel.get_panel())
+    assert stored[("close", "AAPL")].iloc[10:].tolist() == data["close"][10:].tolist()
+    assert stored[("close", "MSFT")].notna().sum() == 15
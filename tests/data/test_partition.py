@@ -0,0 +1,144 @@
+import asyncio
+import pandas as pd
+import pytest
+from modules.data.partition import (
+    expired_prefix,
+    partition_bounds,
+    partition_from_name,
+    partition_keys,
+    partition_name,
+    prefix_end,
+)
+from modules.data.pipeline import ProviderDataPipeline
+from tests.data.helpers import ohlcv, stored_files
+
+# 윤년 2 월, 연말을 지나는 timestamp
+TIMESTAMPS = pd.DatetimeIndex(
+    [
+        "2023-12-31 23:59",
+        "2024-01-01 00:00",
+        "2024-01-05 14:30",
+        "2024-02-29 12:00",
+        "2024-12-31 20:00",
+    ],
+    tz="UTC",
+)
+
+
+@pytest.mark.parametrize(
+    "partition, keys, names",
+    [
+        ("year", [2023, 2024, 2024, 2024, 2024], ["2023", "2024"]),
+        (
+            "month",
+            [202312, 202401, 202401, 202402, 202412],
+            ["2023/12", "2024/01", "2024/02", "2024/12"],
+        ),
+        (
+            "day",
+            [20231231, 20240101, 20240105, 20240229, 20241231],
+            ["2023/12/31", "2024/01/01", "2024/01/05", "2024/02/29", "2024/12/31"],
+        ),
+    ],
+)
+def test_keys_and_names_round_trip(partition, keys, names):
+    assert list(partition_keys(TIMESTAMPS, partition)) == keys
+    assert sorted({partition_name(key, partition) for key in keys}) == names
+
+    for key, ts in zip(keys, TIMESTAMPS):
+        start, end = partition_bounds(key, partition)
+        assert start <= ts < end
+        name = partition_name(key, partition)
+        assert partition_from_name(f"{name}.g12.parquet", partition) == (key, 12, None)
+        assert partition_from_name(f"{name}.g13.delta0.csv", partition) == (key, 13, 0)
+
+
+@pytest.mark.parametrize(
+    "file_name, partition, parsed",
+    [
+        # generation 이 없는 예전 이름은 generation 0
+        ("2024.parquet", "year", (2024, 0, None)),
+        ("2024/01.csv", "month", (202401, 0, None)),
+        ("2024/01/05.feather", "day", (20240105, 0, None)),
+        ("2024/01.delta2.csv", "month", (202401, 0, 2)),
+        # 다른 partition 방식이나 row chunk 의 파일
+        ("2024.parquet", "month", None),
+        ("2024/01/05.parquet", "month", None),
+        ("2024/01.parquet", "day", None),
+        ("chunk0.g1.csv", "month", None),
+        ("_manifest.json", "year", None),
+    ],
+)
+def test_partition_from_name(file_name, partition, parsed):
+    assert partition_from_name(file_name, partition) == parsed
+
+
+@pytest.mark.parametrize(
+    "key, partition, cutoff, prefix",
+    [
+        (2023, "year", "2030-01-01", None),
+        (202401, "month", "2025-01-01", "2024"),
+        (202401, "month", "2024-12-31 23:59", None),
+        (202412, "month", "2025-01-01", "2024"),
+        (20240105, "day", "2025-01-01", "2024"),
+        (20240105, "day", "2024-02-01", "2024/01"),
+        (20240105, "day", "2024-01-31 23:59", None),
+    ],
+)
+def test_expired_prefix(key, partition, cutoff, prefix):
+    assert expired_prefix(key, partition, pd.Timestamp(cutoff, tz="UTC")) == prefix
+
+
+@pytest.mark.parametrize("partition", ["month", "day"])
+def test_expired_prefix_never_reaches_past_the_cutoff(partition):
+    days = pd.date_range("2023-01-01", "2025-12-31", freq="SMS", tz="UTC")
+    keys = sorted(set(partition_keys(days, partition)))
+    cutoffs = pd.DatetimeIndex(
+        ["2024-01-01", "2024-01-01 00:01", "2024-02-15", "2024-03-01", "2025-01-01"],
+        tz="UTC",
+    )
+    for cutoff in cutoffs:
+        for key in keys:
+            prefix = expired_prefix(key, partition, cutoff)
+            if prefix is None:
+                continue
+            # prefix 안의 모든 partition 이 cutoff 전에 끝나야 한번에 지울 수 있다.
+            assert prefix_end(prefix) <= cutoff
+            assert partition_name(key, partition).startswith(f"{prefix}/")
+
+
+def partitioned(store_path, partition: str) -> ProviderDataPipeline:
+    return ProviderDataPipeline(
+        None, str(store_path), partition=partition, chunk_cache=None
+    )
+
+
+def test_retention_deletes_whole_years_and_keeps_the_current_partition(store_path):
+    pipeline = partitioned(store_path, "month")
+    data = ohlcv(60, start="2023-12-20", freq="2D")
+    asyncio.run(pipeline._save_new_data(data))
+    cutoff = pd.Timestamp("2024-02-15", tz="UTC")
+
+    asyncio.run(pipeline._clean_old_partitions(cutoff))
+
+    names = stored_files(store_path)
+    assert not any(name.startswith(("2023", "2024/01.")) for name in names)
+    # cutoff 가 걸친 2 월 partition 은 cutoff 전 row 까지 그대로 남는다.
+    assert any(name.startswith("2024/02.") for name in names)
+    expected = data[data.index >= "2024-02-01"]
+    stored = asyncio.run(pipeline.get_data_range())
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=False, check_freq=False)
+
+
+def test_retention_keeps_the_directory_of_the_current_day(store_path):
+    pipeline = partitioned(store_path, "day")
+    data = ohlcv(40, start="2024-01-30", freq="6h")
+    asyncio.run(pipeline._save_new_data(data))
+    cutoff = pd.Timestamp("2024-02-02 12:00", tz="UTC")
+
+    asyncio.run(pipeline._clean_old_partitions(cutoff))
+
+    # 1 월은 디렉토리째, 2/1 은 파일만 지워지고 cutoff 가 걸친 2/2 는 남는다.
+    assert not (store_path / "2024" / "01").exists()
+    days = sorted(name.split(".")[0] for name in stored_files(store_path / "2024"))
+    assert days == [f"02/0{day}" for day in range(2, 9)]
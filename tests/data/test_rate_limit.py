@@ -0,0 +1,179 @@
+import asyncio
+import pytest
+import modules.data.rate_limit as rate_limit
+from modules.data.rate_limit import RateLimiter
+
+# fixture 가 asyncio.sleep 을 바꿔 두므로 loop 에 차례를 넘길 때는 이것을 쓴다.
+real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    """
+    time.monotonic that only moves when the test moves it
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    Delays the limiter asked to sleep, returned at once without moving the
+    clock so the schedule of concurrent callers is visible
+    """
+    delays = []
+
+    async def sleep(delay):
+        delays.append(round(delay, 6))
+        await real_sleep(0)
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", sleep)
+    return delays
+
+
+@pytest.fixture
+def limiter(clock, sleeps):
+    # 2 req/s, 3 개까지 몰아서
+    return RateLimiter("test", rate=2, burst=3, max_concurrent=2)
+
+
+async def call(limiter: RateLimiter, cost: int = 1):
+    async with limiter.limit(cost):
+        pass
+
+
+def calls(limiter: RateLimiter, n: int, cost: int = 1):
+    async def main():
+        await asyncio.gather(*(call(limiter, cost) for _ in range(n)))
+
+    asyncio.run(main())
+
+
+def test_burst_goes_out_at_once_then_spaced_by_rate(limiter, sleeps):
+    calls(limiter, 6)
+
+    # 처음 3 개는 바로, 나머지는 0.5 초 간격으로 줄을 선다.
+    assert sleeps == [0.5, 1.0, 1.5]
+    stats = limiter.stats()
+    assert stats["requests"] == 6 and stats["in_flight"] == 0
+
+
+@pytest.mark.parametrize(
+    "elapsed, free, delay",
+    [
+        (0.25, 0, 0.25),  # 반 개 찼으니 나머지 반 개를 기다린다.
+        (0.5, 1, 0.5),
+        (1.0, 2, 0.5),
+        (100.0, 3, 0.5),  # 최대 burst 까지만 쌓인다.
+    ],
+)
+def test_tokens_refill_at_rate_up_to_burst(
+    limiter, clock, sleeps, elapsed, free, delay
+):
+    calls(limiter, 3)
+    clock.now += elapsed
+    sleeps.clear()
+
+    calls(limiter, free + 1)
+
+    assert len(sleeps) == 1
+    assert sleeps == [delay]
+
+
+def test_cost_takes_several_tokens(limiter, sleeps):
+    calls(limiter, 1, cost=3)
+    calls(limiter, 1, cost=2)
+
+    assert sleeps == [1.0]
+
+
+def test_unlimited_rate_never_sleeps(clock, sleeps):
+    limiter = RateLimiter("test")
+
+    calls(limiter, 50)
+
+    assert sleeps == []
+    assert limiter.stats()["requests"] == 50
+
+
+def test_cancelled_wait_gives_its_tokens_back(limiter, clock, monkeypatch):
+    async def sleep_forever(delay):
+        await asyncio.Event().wait()
+
+    async def main():
+        await asyncio.gather(*(call(limiter) for _ in range(3)))
+        task = asyncio.create_task(call(limiter))
+        await real_sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", sleep_forever)
+    asyncio.run(main())
+
+    # 취소된 호출이 빌려 간 token 이 돌아왔으므로 0.5 초 뒤에 하나가 찬다.
+    assert limiter._reserve(1) == 0.5
+
+
+def test_slot_is_released_when_the_body_raises(clock, sleeps):
+    limiter = RateLimiter("test", max_concurrent=1)
+
+    async def fail():
+        async with limiter.limit():
+            raise RuntimeError("upstream 500")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(fail())
+
+    assert limiter.stats()["in_flight"] == 0
+    calls(limiter, 1)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_waiter_gets_the_slot_of_a_failed_call(clock, sleeps):
+    limiter = RateLimiter("test", max_concurrent=1)
+    order = []
+
+    async def fail(entered: asyncio.Event, release: asyncio.Event):
+        async with limiter.limit():
+            order.append("fail")
+            entered.set()
+            await release.wait()
+            raise RuntimeError("upstream 500")
+
+    async def wait():
+        async with limiter.limit():
+            order.append("wait")
+            assert limiter.stats()["in_flight"] == 1
+
+    async def main():
+        entered, release = asyncio.Event(), asyncio.Event()
+        failing = asyncio.create_task(fail(entered, release))
+        await entered.wait()
+        waiting = asyncio.create_task(wait())
+        while not limiter._waiters:
+            await real_sleep(0)
+        assert limiter.stats()["queued"] == 1
+        release.set()
+        # slot 이 돌아오지 않으면 waiter 는 영영 기다리므로 시간을 정해 둔다.
+        results = await asyncio.wait_for(
+            asyncio.gather(failing, waiting, return_exceptions=True), timeout=5
+        )
+        assert isinstance(results[0], RuntimeError) and results[1] is None
+
+    asyncio.run(main())
+
+    assert order == ["fail", "wait"]
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.stats()["queued"] == 0
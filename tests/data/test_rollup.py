@@ -0,0 +1,223 @@
+import asyncio
+import json
+import pandas as pd
+import pytest
+from modules.data.core import DataProvider
+from modules.data.manifest import MANIFEST_FILE
+from modules.data.market_calendar import KRX, NYSE
+from modules.data.pipeline import ProviderDataPipeline
+from modules.data.rollup import ROLLUP_DIR, aggregate, bucket_end, bucket_start
+from modules.data.utils import prepare_data, prepare_pipeline_data
+from tests.data.helpers import ohlcv
+
+
+class StubProvider(DataProvider):
+    market = "NYSE"
+    prepost = True
+    symbol = "AAPL"
+    interval = "1m"
+
+    async def get_data(self) -> pd.DataFrame:
+        return pd.DataFrame()
+
+    async def ping(self) -> bool:
+        return True
+
+
+def utc(value: str) -> pd.Timestamp:
+    return pd.Timestamp(value, tz="UTC")
+
+
+@pytest.mark.parametrize(
+    "calendar, ts, start, end",
+    [
+        # 20:30 ET 의 after-hours bar 는 UTC 로 다음 날이지만 같은 session 이다.
+        (NYSE, "2024-01-03 01:30", "2024-01-02 05:00", "2024-01-03 05:00"),
+        (NYSE, "2024-07-02 23:30", "2024-07-02 04:00", "2024-07-03 04:00"),
+        (KRX, "2024-01-01 23:30", "2024-01-01 15:00", "2024-01-02 15:00"),
+        (None, "2024-01-03 01:30", "2024-01-03 00:00", "2024-01-04 00:00"),
+    ],
+)
+def test_daily_buckets_follow_exchange_dates(calendar, ts, start, end):
+    assert bucket_start(utc(ts), "1D", calendar) == utc(start)
+    assert bucket_end(utc(ts), "1D", calendar) == utc(end)
+
+
+def test_intraday_buckets_ignore_the_calendar():
+    ts = utc("2024-01-03 01:32")
+    assert bucket_start(ts, "5min", NYSE) == utc("2024-01-03 01:30")
+    assert bucket_end(ts, "1h", NYSE) == utc("2024-01-03 02:00")
+
+
+def test_extended_hours_bars_roll_up_into_their_session():
+    # 04:00 ET ~ 19:59 ET (09:00 UTC ~ 00:59 UTC 다음 날)
+    data = ohlcv(16 * 60, start="2024-01-02 09:00")
+
+    bars = aggregate(data, "1D", NYSE)
+
+    assert list(bars.index) == [utc("2024-01-02 21:00")]
+    assert bars["open"].iloc[0] == data["open"].iloc[0]
+    assert bars["close"].iloc[0] == data["close"].iloc[-1]
+    assert bars["volume"].iloc[0] == data["volume"].sum()
+    # calendar 가 없으면 UTC 자정에서 나뉜다.
+    assert len(aggregate(data, "1D")) == 2
+
+
+@pytest.mark.parametrize(
+    "calendar, start, label",
+    [
+        (NYSE, "2024-07-03 13:30", "2024-07-03 17:00"),  # half-day 13:00 ET
+        (NYSE, "2024-01-05 14:30", "2024-01-05 21:00"),
+        (KRX, "2024-01-03 00:00", "2024-01-03 06:30"),
+    ],
+)
+def test_daily_bars_are_stamped_with_the_session_close(calendar, start, label):
+    bars = aggregate(ohlcv(60, start=start), "1D", calendar)
+    assert list(bars.index) == [utc(label)]
+    assert bars.index.equals(calendar.session_closes(bars.index))
+
+
+@pytest.fixture
+def rollup_pipeline(store_path, file_format):
+    return ProviderDataPipeline(
+        StubProvider(),
+        str(store_path),
+        file_format=file_format,
+        chunk_cache=None,
+        rollups=["5min", "1D"],
+        market_hours=False,
+    )
+
+
+def rollup_objects(store_path, freq: str) -> dict:
+    path = store_path / ROLLUP_DIR / freq
+    return {
+        p.name: p.read_bytes()
+        for p in path.iterdir()
+        if p.name != MANIFEST_FILE and not p.name.endswith(".lock")
+    }
+
+
+def rollup_entry(store_path, freq: str) -> dict:
+    manifest = json.loads((store_path / ROLLUP_DIR / freq / MANIFEST_FILE).read_text())
+    return manifest["chunks"]["0"]
+
+
+@pytest.mark.parametrize("freq", ["5min", "1D"])
+def test_save_into_open_bucket_touches_only_a_delta(
+    rollup_pipeline, store_path, file_format, freq
+):
+    data = ohlcv(13, start="2024-01-02 14:30")
+    asyncio.run(rollup_pipeline._save_new_data(data.iloc[:12]))
+    before = rollup_objects(store_path, freq)
+    entry = rollup_entry(store_path, freq)
+
+    # 14:42 는 마지막 5min bucket (14:40) 과 같은 날에 들어간다.
+    asyncio.run(rollup_pipeline._save_new_data(data.iloc[12:]))
+
+    after = rollup_objects(store_path, freq)
+    assert {name: after[name] for name in before} == before
+    added = sorted(set(after) - set(before))
+    assert len(added) == 1
+    assert added[0].startswith("chunk0.g") and f".delta0.{file_format}" in added[0]
+    assert rollup_entry(store_path, freq)["file"] == entry["file"]
+    assert rollup_entry(store_path, freq)["rows"] == entry["rows"]
+
+    stored = asyncio.run(rollup_pipeline.get_rollup(freq))
+    pd.testing.assert_frame_equal(
+        stored, aggregate(data, freq, NYSE), check_dtype=False, check_freq=False
+    )
+
+
+def test_rollups_stay_exact_over_many_saves(store_path, file_format):
+    pipeline = ProviderDataPipeline(
+        StubProvider(),
+        str(store_path),
+        file_format=file_format,
+        chunk_cache=None,
+        max_deltas=4,
+        rollups=["5min", "1D"],
+        market_hours=False,
+    )
+    # after-hours 를 지나 UTC 자정을 넘기는 bar 까지
+    data = ohlcv(40, start="2024-01-02 23:40")
+    for i in range(0, 40, 3):
+        asyncio.run(pipeline._save_new_data(data.iloc[i : i + 3]))
+
+    for freq in ("5min", "1D"):
+        stored = asyncio.run(pipeline.get_rollup(freq))
+        pd.testing.assert_frame_equal(
+            stored, aggregate(data, freq, NYSE), check_dtype=False, check_freq=False
+        )
+        assert len(rollup_entry(store_path, freq).get("deltas", [])) < 4
+    assert len(asyncio.run(pipeline.get_rollup("1D"))) == 1
+
+
+def test_corrected_old_bars_rewrite_the_rollup(rollup_pipeline):
+    data = ohlcv(30, start="2024-01-02 14:30")
+    asyncio.run(rollup_pipeline._save_new_data(data))
+    corrected = data.iloc[[2]].assign(high=1000.0)
+
+    asyncio.run(rollup_pipeline._save_data(corrected))
+
+    expected = data.copy()
+    expected.iloc[2, expected.columns.get_loc("high")] = 1000.0
+    stored = asyncio.run(rollup_pipeline.get_rollup("5min"))
+    assert stored["high"].iloc[0] == 1000.0
+    pd.testing.assert_frame_equal(
+        stored, aggregate(expected, "5min"), check_dtype=False, check_freq=False
+    )
+
+
+def test_rebuild_matches_incremental_rollups(rollup_pipeline):
+    data = ohlcv(600, start="2024-01-02 20:00")
+    for i in range(0, 600, 100):
+        asyncio.run(rollup_pipeline._save_new_data(data.iloc[i : i + 100]))
+    incremental = asyncio.run(rollup_pipeline.get_rollup("1D"))
+
+    assert asyncio.run(rollup_pipeline.rebuild_rollups())["1D"] == 2
+    rebuilt = asyncio.run(rollup_pipeline.get_rollup("1D"))
+    pd.testing.assert_frame_equal(rebuilt, incremental)
+    assert list(rebuilt.index) == [utc("2024-01-02 21:00"), utc("2024-01-03 21:00")]
+
+
+def test_prepare_data_is_served_from_the_daily_rollup(store_path, file_format):
+    pipelines, frames = [], {}
+    for seed, symbol in enumerate(["AAPL", "MSFT"]):
+        provider = StubProvider()
+        provider.symbol = symbol
+        pipeline = ProviderDataPipeline(
+            provider,
+            str(store_path / symbol),
+            file_format=file_format,
+            chunk_cache=None,
+            rollups=["1D"],
+            market_hours=False,
+        )
+        frames[symbol] = ohlcv(1500, start="2024-01-02 14:30", seed=seed)
+        asyncio.run(pipeline._save_new_data(frames[symbol]))
+        pipelines.append(pipeline)
+
+    async def full_history(*args, **kwargs):
+        raise AssertionError("1m history read")
+
+    for pipeline in pipelines:
+        pipeline.get_data_range = pipeline.get_all_data = full_history
+
+    prepared = asyncio.run(prepare_pipeline_data(pipelines, "1D"))
+
+    # rollup bar 는 resample 없이 session 마감 시각 그대로 나온다.
+    expected = pd.DataFrame(
+        {symbol: aggregate(frames[symbol], "1D", NYSE)["close"] for symbol in frames}
+    )
+    pd.testing.assert_frame_equal(prepared, expected, check_freq=False, check_like=True)
+    assert list(prepared.index) == [utc("2024-01-02 21:00"), utc("2024-01-03 21:00")]
+
+
+def test_prepare_data_still_resamples_minute_bars():
+    data = ohlcv(1500, start="2024-01-02 14:30")
+
+    prepared = prepare_data([{"AAPL": data}, {"MSFT": data}], "1D")
+
+    assert list(prepared.index) == [utc("2024-01-02"), utc("2024-01-03")]
+    assert list(prepared["AAPL"]) == list(data["close"].resample("1D").last())
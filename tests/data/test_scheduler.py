@@ -0,0 +1,172 @@
+import asyncio
+import pytest
+import pytz
+from datetime import datetime, timedelta
+import modules.data.scheduler as scheduler
+from modules.data.market_calendar import KRX, NYSE
+from modules.data.scheduler import FetchScheduler, wait_for_stop
+
+ET = pytz.timezone("America/New_York")
+KST = pytz.timezone("Asia/Seoul")
+
+
+def et(value: str) -> datetime:
+    return ET.localize(datetime.fromisoformat(value))
+
+
+def kst(value: str) -> datetime:
+    return KST.localize(datetime.fromisoformat(value))
+
+
+def minute_bars(calendar=NYSE, **kwargs) -> FetchScheduler:
+    return FetchScheduler(calendar, "1m", 60, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        # 장 시작 전: 첫 bar 가 닫힌 뒤
+        ("2024-07-01 08:00:00", "2024-07-01 09:31:05"),
+        ("2024-07-01 09:30:00", "2024-07-01 09:31:05"),
+        # 장 중: open 에 맞춘 다음 bar 마감 + settle
+        ("2024-07-01 10:15:20", "2024-07-01 10:16:05"),
+        ("2024-07-01 10:16:04", "2024-07-01 10:16:05"),
+        ("2024-07-01 10:16:05", "2024-07-01 10:17:05"),
+        # 마감 직전 마지막 bar, 그 다음은 다음 거래일
+        ("2024-07-01 15:59:30", "2024-07-01 16:00:05"),
+        ("2024-07-01 16:00:04", "2024-07-01 16:00:05"),
+        ("2024-07-01 16:00:05", "2024-07-02 09:31:05"),
+        # 금요일 장 마감 뒤와 주말은 월요일로
+        ("2024-07-12 17:00:00", "2024-07-15 09:31:05"),
+        ("2024-07-13 12:00:00", "2024-07-15 09:31:05"),
+        # 7/3 은 13:00 에 끝나는 half-day, 7/4 는 휴장
+        ("2024-07-03 12:59:30", "2024-07-03 13:00:05"),
+        ("2024-07-03 13:00:05", "2024-07-05 09:31:05"),
+        ("2024-07-04 10:00:00", "2024-07-05 09:31:05"),
+    ],
+)
+def test_minute_bars_on_nyse(now, expected):
+    assert minute_bars().next_fetch(et(now)) == et(expected)
+
+
+def test_result_is_utc_and_naive_now_is_utc():
+    fetch = minute_bars().next_fetch(datetime(2024, 7, 1, 14, 15, 20))
+
+    assert fetch == et("2024-07-01 10:16:05")
+    assert fetch.tzinfo == pytz.UTC
+
+
+@pytest.mark.parametrize(
+    "interval, fetch_interval, now, expected",
+    [
+        ("5m", 60, "2024-07-01 10:17:00", "2024-07-01 10:20:05"),
+        # fetch_interval 이 bar 보다 길면 그 간격으로, 역시 open 기준
+        ("1m", 300, "2024-07-01 10:17:00", "2024-07-01 10:20:05"),
+        # 마지막 1h bar 는 16:00 에 잘린다.
+        ("1h", 60, "2024-07-01 15:45:00", "2024-07-01 16:00:05"),
+        ("1h", 60, "2024-07-03 12:40:00", "2024-07-03 13:00:05"),
+    ],
+)
+def test_bars_longer_than_a_minute(interval, fetch_interval, now, expected):
+    fetch_scheduler = FetchScheduler(NYSE, interval, fetch_interval)
+    assert fetch_scheduler.next_fetch(et(now)) == et(expected)
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        ("2024-07-01 03:00:00", "2024-07-01 04:01:05"),
+        ("2024-07-01 19:59:30", "2024-07-01 20:00:05"),
+        ("2024-07-01 20:00:05", "2024-07-02 04:01:05"),
+    ],
+)
+def test_extended_hours(now, expected):
+    assert minute_bars(prepost=True).next_fetch(et(now)) == et(expected)
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        ("2024-07-01 10:00:00", "2024-07-01 16:10:00"),
+        ("2024-07-01 16:09:59", "2024-07-01 16:10:00"),
+        ("2024-07-01 16:10:00", "2024-07-02 16:10:00"),
+        # half-day 의 마감은 calendar 에서 가져온다.
+        ("2024-07-03 10:00:00", "2024-07-03 13:10:00"),
+        ("2024-07-03 13:10:00", "2024-07-05 16:10:00"),
+        ("2024-07-12 16:30:00", "2024-07-15 16:10:00"),
+    ],
+)
+def test_daily_bars_are_fetched_after_the_close(now, expected):
+    daily = FetchScheduler(NYSE, "1d", 60)
+    assert daily.next_fetch(et(now)) == et(expected)
+
+
+@pytest.mark.parametrize(
+    "interval, now, expected",
+    [
+        ("1m", "2024-07-01 08:00:00", "2024-07-01 09:01:05"),
+        ("1m", "2024-07-01 15:30:05", "2024-07-02 09:01:05"),
+        # 새해 첫 거래일은 10:00 개장
+        ("1m", "2023-12-29 16:00:00", "2024-01-02 10:01:05"),
+        # 수능일은 10:00 ~ 16:30
+        ("1m", "2024-11-14 09:30:00", "2024-11-14 10:01:05"),
+        ("1m", "2024-11-14 16:29:30", "2024-11-14 16:30:05"),
+        ("1d", "2024-11-14 15:40:00", "2024-11-14 16:40:00"),
+        # 추석 연휴 (9/16 ~ 9/18) 를 건너뛴다.
+        ("1d", "2024-09-13 16:00:00", "2024-09-19 15:40:00"),
+    ],
+)
+def test_krx_sessions(interval, now, expected):
+    fetch_scheduler = FetchScheduler(KRX, interval, 60)
+    assert fetch_scheduler.next_fetch(kst(now)) == kst(expected)
+
+
+def test_no_calendar_falls_back_to_the_fetch_interval():
+    fetch_scheduler = FetchScheduler(None, "1m", 90)
+    now = et("2024-07-13 12:00:00")
+
+    assert fetch_scheduler.next_fetch(now) == now + timedelta(seconds=90)
+    assert fetch_scheduler.seconds_until_next(now) == 90
+
+
+def test_for_provider_reads_market_interval_and_prepost():
+    class Provider:
+        market = "nasdaq"
+        interval = "1m"
+        prepost = True
+
+    class Unknown:
+        interval = "1m"
+
+    fetch_scheduler = FetchScheduler.for_provider(Provider(), 60)
+    assert fetch_scheduler.calendar is NYSE and fetch_scheduler.prepost
+    assert FetchScheduler.for_provider(Unknown(), 60).calendar is None
+    assert FetchScheduler.for_provider(None, 60).calendar is None
+
+
+def test_seconds_until_next_on_a_fixed_clock(monkeypatch):
+    now = et("2024-07-01 10:15:20")
+
+    class FixedClock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.astimezone(tz)
+
+    monkeypatch.setattr(scheduler, "datetime", FixedClock)
+
+    assert minute_bars().seconds_until_next() == 45
+    # 금요일 마감 뒤에는 월요일 첫 bar 까지 잔다.
+    now = et("2024-07-12 16:00:05")
+    assert minute_bars().seconds_until_next() == (
+        et("2024-07-15 09:31:05") - now
+    ).total_seconds()
+
+
+def test_wait_for_stop():
+    async def main():
+        stop_event = asyncio.Event()
+        assert not await wait_for_stop(stop_event, 0.01)
+        asyncio.get_running_loop().call_later(0.01, stop_event.set)
+        return await wait_for_stop(stop_event, 5)
+
+    assert asyncio.run(main())
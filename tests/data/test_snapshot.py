@@ -0,0 +1,87 @@
+import asyncio
+import pandas as pd
+import pytest
+from modules.data.core import SNAPSHOT_RETRIES
+from modules.data.manifest import StaleManifestError
+from modules.data.pipeline import ProviderDataPipeline
+from tests.data.helpers import ohlcv
+
+
+@pytest.fixture
+def open_store(store_path, file_format):
+    def open_store() -> ProviderDataPipeline:
+        # reader 와 writer 는 같은 경로를 쓰는 별개의 pipeline (다른 process 처럼)
+        return ProviderDataPipeline(
+            None,
+            str(store_path),
+            chunk_size=10,
+            file_format=file_format,
+            chunk_cache=None,
+            max_concurrent_reads=1,
+        )
+
+    return open_store
+
+
+def rewrite_all(data: pd.DataFrame, generation: int) -> pd.DataFrame:
+    # 모든 row 를 바꾸므로 모든 chunk 가 새 generation 으로 다시 쓰인다.
+    return data.assign(close=float(generation))
+
+
+def commit_mid_read(reader, writer, data, commits: int):
+    """
+    Let writer commit a new generation of every chunk whenever the reader
+    opens the last chunk of its snapshot, for the first `commits` attempts.
+    """
+    original = reader._read_chunk
+    state = {"attempts": 0, "generation": 0}
+
+    async def read_chunk(file_path, *args, **kwargs):
+        if file_path.rsplit("/", 1)[-1].startswith("chunk1."):
+            state["attempts"] += 1
+            if state["generation"] < commits:
+                state["generation"] += 1
+                await writer._save_data(rewrite_all(data, state["generation"]))
+        return await original(file_path, *args, **kwargs)
+
+    reader._read_chunk = read_chunk
+    return state
+
+
+def test_reader_retries_on_a_generation_committed_mid_read(open_store):
+    data = ohlcv(20)
+    reader, writer = open_store(), open_store()
+    asyncio.run(writer._save_data(data))
+    state = commit_mid_read(reader, writer, data, commits=1)
+
+    stored = asyncio.run(reader.get_data_range())
+
+    # chunk0 은 이전 snapshot 에서 읽었지만 섞이지 않고 새 snapshot 으로 다시 읽는다.
+    assert state["attempts"] == 2
+    assert len(stored) == 20
+    assert (stored["close"] == 1.0).all()
+
+
+def test_reader_gives_up_after_the_retries(open_store):
+    data = ohlcv(20)
+    reader, writer = open_store(), open_store()
+    asyncio.run(writer._save_data(data))
+    state = commit_mid_read(reader, writer, data, commits=SNAPSHOT_RETRIES + 1)
+
+    with pytest.raises(StaleManifestError):
+        asyncio.run(reader._load_date_range(None, None))
+    assert state["attempts"] == SNAPSHOT_RETRIES + 1
+
+
+def test_snapshot_without_concurrent_writer_is_read_once(open_store):
+    data = ohlcv(20)
+    reader, writer = open_store(), open_store()
+    asyncio.run(writer._save_data(data))
+    state = commit_mid_read(reader, writer, data, commits=0)
+
+    stored = asyncio.run(reader.get_data_range())
+
+    assert state["attempts"] == 1
+    pd.testing.assert_series_equal(
+        stored["close"], data["close"], check_freq=False, check_dtype=False
+    )
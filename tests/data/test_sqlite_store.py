@@ -0,0 +1,94 @@
+import asyncio
+import pandas as pd
+import pytest
+from modules.data.sqlite_store import SQLiteDatabase, SQLiteStore
+from tests.data.helpers import ohlcv
+
+
+class FailingConnection:
+    """
+    Connection whose executemany (the row insert) fails after the ALTER ran
+    """
+
+    def __init__(self, conn, fail):
+        self._conn = conn
+        self.executemany = fail
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return str(tmp_path / "ohlcv.sqlite")
+
+
+@pytest.fixture
+def connect(database_path):
+    """
+    Stores on their own connection, as two processes sharing the file would
+    have (open_database() shares one connection within a process)
+    """
+    databases = []
+
+    def connect(key: str) -> SQLiteStore:
+        store = SQLiteStore(database_path, key)
+        store.database = SQLiteDatabase(database_path)
+        databases.append(store.database)
+        return store
+
+    yield connect
+    for database in databases:
+        database.close()
+
+
+def test_column_added_by_another_connection(connect):
+    first, second = connect("AAPL"), connect("MSFT")
+    # 두 connection 모두 컬럼이 없는 상태를 읽어 둔다.
+    asyncio.run(first.count())
+    asyncio.run(second.count())
+
+    data = ohlcv(5)
+    asyncio.run(first.upsert(data[["open", "close"]]))
+    assert asyncio.run(second.upsert(data[["close", "volume"]])) == 5
+
+    stored = asyncio.run(second.query())
+    assert list(stored.columns) == ["close", "volume"]
+    assert stored["volume"].tolist() == data["volume"].tolist()
+
+
+def test_series_columns_added_by_another_connection_are_kept(connect):
+    first, second = connect("AAPL"), connect("AAPL")
+    data = ohlcv(5)
+    asyncio.run(first.upsert(data[["open"]]))
+    # second 는 open 만 있는 series 를 기억하고 있다.
+    asyncio.run(second.query())
+    asyncio.run(first.upsert(data[["close"]]))
+
+    asyncio.run(second.upsert(data[["volume"]]))
+
+    stored = asyncio.run(connect("AAPL").query())
+    assert sorted(stored.columns) == ["close", "open", "volume"]
+    pd.testing.assert_frame_equal(
+        stored[["open", "close", "volume"]],
+        data[["open", "close", "volume"]],
+        check_freq=False,
+    )
+
+
+def test_failed_write_rolls_back_added_columns(connect, monkeypatch):
+    store = connect("AAPL")
+    data = ohlcv(3)
+    asyncio.run(store.upsert(data[["open"]]))
+
+    def fail(*args):
+        raise RuntimeError("disk I/O error")
+
+    conn = store.database._conn
+    monkeypatch.setattr(store.database, "_conn", FailingConnection(conn, fail))
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.upsert(data[["open", "close"]]))
+    monkeypatch.setattr(store.database, "_conn", conn)
+
+    assert asyncio.run(store.upsert(data[["open", "close"]])) == 3
+    assert list(asyncio.run(store.query()).columns) == ["open", "close"]
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import stat
+import pytest
+from modules.data.storage import LocalStorage
+
+
+@pytest.fixture
+def storage():
+    return LocalStorage()
+
+
+@pytest.fixture
+def sync_calls(monkeypatch):
+    """
+    Record fsync / replace in call order ("fsync-file", "replace", "fsync-dir")
+    """
+    calls = []
+    fsync, replace = os.fsync, os.replace
+
+    def record_fsync(fd):
+        kind = "dir" if stat.S_ISDIR(os.fstat(fd).st_mode) else "file"
+        calls.append(f"fsync-{kind}")
+        fsync(fd)
+
+    def record_replace(src, dst):
+        calls.append("replace")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "fsync", record_fsync)
+    monkeypatch.setattr(os, "replace", record_replace)
+    return calls
+
+
+def test_write_bytes_replaces_content_without_leftovers(storage, tmp_path):
+    path = str(tmp_path / "a" / "chunk0.g1.csv")
+    asyncio.run(storage.write_bytes(path, b"old", "text/csv"))
+    asyncio.run(storage.write_bytes(path, b"new content", "text/csv"))
+
+    assert asyncio.run(storage.read_bytes(path)) == b"new content"
+    assert os.listdir(tmp_path / "a") == ["chunk0.g1.csv"]
+
+
+def test_write_bytes_syncs_file_before_rename_and_directory_after(
+    storage, tmp_path, sync_calls
+):
+    asyncio.run(storage.write_bytes(str(tmp_path / "x.parquet"), b"data", "x"))
+
+    assert sync_calls == ["fsync-file", "replace", "fsync-dir"]
+
+
+def test_failed_replace_keeps_previous_file(storage, tmp_path, monkeypatch):
+    path = str(tmp_path / "chunk0.g1.csv")
+    asyncio.run(storage.write_bytes(path, b"old", "text/csv"))
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        asyncio.run(storage.write_bytes(path, b"new", "text/csv"))
+
+    assert asyncio.run(storage.read_bytes(path)) == b"old"
+    assert os.listdir(tmp_path) == ["chunk0.g1.csv"]
+
+
+def test_append_bytes_cuts_unpublished_tail_and_syncs(storage, tmp_path, sync_calls):
+    path = str(tmp_path / "chunk0.g1.csv")
+    with open(path, "wb") as f:
+        f.write(b"header\nrow1\nhalf-written")
+    sync_calls.clear()
+
+    asyncio.run(storage.append_bytes(path, b"row2\n", offset=len(b"header\nrow1\n")))
+
+    assert asyncio.run(storage.read_bytes(path)) == b"header\nrow1\nrow2\n"
+    assert sync_calls == ["fsync-file"]
+
+
+def test_read_bytes_is_limited_to_published_size(storage, tmp_path):
+    path = str(tmp_path / "chunk0.g1.csv")
+    asyncio.run(storage.write_bytes(path, b"0123456789", "text/csv"))
+
+    assert asyncio.run(storage.read_bytes(path, size=4)) == b"0123"
+    assert asyncio.run(storage.read_bytes(str(tmp_path / "missing"))) is None
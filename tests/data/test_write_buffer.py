@@ -0,0 +1,185 @@
+import asyncio
+import pandas as pd
+import pytest
+import modules.data.buffer as buffer
+from modules.data.buffer import WriteBuffer
+from modules.data.pipeline import ProviderDataPipeline
+from tests.data.helpers import ohlcv, stored_files
+
+
+class FakeClock:
+    """
+    time.monotonic that only moves when the test moves it
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(buffer, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def pipeline(store_path, file_format, clock):
+    # 설정 파일의 기본값처럼 10 row / 10 분
+    return ProviderDataPipeline(
+        None,
+        str(store_path),
+        chunk_size=100,
+        file_format=file_format,
+        chunk_cache=None,
+        write_buffer_rows=10,
+        write_buffer_seconds=600,
+        market_hours=False,
+    )
+
+
+def assert_same_rows(actual: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        actual, expected, check_dtype=False, check_freq=False
+    )
+
+
+def test_due_by_row_count(clock):
+    write_buffer = WriteBuffer(max_rows=5, max_seconds=600)
+    assert not write_buffer.is_due()
+
+    write_buffer.add(ohlcv(4))
+    assert not write_buffer.is_due()
+    # 같은 시각의 row 는 한 row 로 센다.
+    write_buffer.add(ohlcv(4).iloc[2:])
+    assert not write_buffer.is_due()
+    write_buffer.add(ohlcv(5))
+    assert write_buffer.is_due()
+
+
+def test_due_by_age_of_the_oldest_row(clock):
+    write_buffer = WriteBuffer(max_rows=100, max_seconds=600)
+    write_buffer.add(ohlcv(1))
+    clock.now += 599
+    write_buffer.add(ohlcv(2))
+    assert not write_buffer.is_due()
+
+    clock.now += 1
+    assert write_buffer.is_due()
+
+
+def test_discard_keeps_rows_added_or_changed_during_the_flush(clock):
+    write_buffer = WriteBuffer(max_rows=100)
+    data = ohlcv(5)
+    write_buffer.add(data.iloc[:3])
+    pending = write_buffer.snapshot()
+
+    # flush 가 저장하는 동안 새 row 와 수정된 row 가 들어온다.
+    corrected = data.iloc[2:4].copy()
+    corrected["close"] += 1
+    write_buffer.add(corrected)
+    write_buffer.discard(pending)
+
+    assert_same_rows(write_buffer.snapshot(), corrected)
+    assert write_buffer.stats()["flushed_rows"] == 3
+
+
+def test_reads_see_buffered_rows(pipeline, store_path):
+    data = ohlcv(8)
+    asyncio.run(pipeline._save_new_data(data.iloc[:5]))
+
+    asyncio.run(pipeline.buffer_new_data(data.iloc[5:]))
+
+    assert len(pipeline.write_buffer) == 3
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+    assert_same_rows(asyncio.run(pipeline.get_all_data()), data)
+    start = pd.Timestamp("2024-01-02 14:34", tz="UTC")
+    end = pd.Timestamp("2024-01-02 14:36", tz="UTC")
+    assert_same_rows(asyncio.run(pipeline.get_data_range(start, end)), data.iloc[4:7])
+    assert asyncio.run(pipeline.get_latest_datetime()) == data.index[-1]
+
+
+def test_flush_once_max_rows_are_buffered(pipeline, store_path):
+    data = ohlcv(12)
+    asyncio.run(pipeline.buffer_new_data(data.iloc[:9]))
+    assert stored_files(store_path) == []
+
+    asyncio.run(pipeline.buffer_new_data(data.iloc[9:]))
+
+    assert len(pipeline.write_buffer) == 0
+    pipeline.write_buffer = None
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+
+
+def test_flush_once_the_oldest_row_is_old_enough(pipeline, store_path, clock):
+    data = ohlcv(3)
+    asyncio.run(pipeline.buffer_new_data(data.iloc[:2]))
+    clock.now += 300
+    asyncio.run(pipeline.buffer_new_data(data.iloc[2:]))
+    assert stored_files(store_path) == []
+
+    clock.now += 300
+    asyncio.run(pipeline.flush_if_due())
+
+    assert len(pipeline.write_buffer) == 0
+    assert stored_files(store_path) != []
+
+
+def test_failed_flush_keeps_the_rows(pipeline, store_path, monkeypatch):
+    data = ohlcv(12)
+    save = pipeline._save_data
+
+    async def fail(new_data):
+        raise ConnectionError("storage unavailable")
+
+    monkeypatch.setattr(pipeline, "_save_data", fail)
+    asyncio.run(pipeline.buffer_new_data(data.iloc[:10]))
+
+    # 실패는 log 로만 남고 row 는 buffer 에 그대로 있다.
+    assert len(pipeline.write_buffer) == 10
+    assert stored_files(store_path) == []
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data.iloc[:10])
+
+    monkeypatch.setattr(pipeline, "_save_data", save)
+    asyncio.run(pipeline.buffer_new_data(data.iloc[10:]))
+
+    assert len(pipeline.write_buffer) == 0
+    pipeline.write_buffer = None
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+
+
+def test_stop_flushes_the_buffer(pipeline, store_path, monkeypatch):
+    data = ohlcv(3)
+
+    async def update_to_latest():
+        await pipeline.buffer_new_data(data)
+
+    monkeypatch.setattr(pipeline, "update_to_latest", update_to_latest)
+
+    async def main():
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(pipeline.fetch_and_save_realtime(stop_event))
+        while len(pipeline.write_buffer) == 0:
+            await asyncio.sleep(0)
+        assert stored_files(store_path) == []
+        stop_event.set()
+        await asyncio.wait_for(task, timeout=5)
+
+    asyncio.run(main())
+
+    assert len(pipeline.write_buffer) == 0
+    pipeline.write_buffer = None
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)
+
+
+def test_close_flushes_the_buffer(pipeline):
+    data = ohlcv(3)
+    asyncio.run(pipeline.buffer_new_data(data))
+
+    asyncio.run(pipeline.close())
+
+    pipeline.write_buffer = None
+    assert_same_rows(asyncio.run(pipeline.get_data_range()), data)